@@ -0,0 +1,327 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/bdd.py
+
+"""Reduced ordered binary decision diagrams of propositional formulae."""
+
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from syntax import *
+
+# The default number of entries of the computed table of a `BDD` manager,
+# which caches the results of `BDD.ite`.
+BDD_COMPUTED_SIZE = 1 << 16
+
+class BDD:
+    """A manager of reduced ordered binary decision diagrams (ROBDDs) over an
+    ordered set of variables.
+
+    Every node of every diagram is identified by an integer, where ``0`` and
+    ``1`` are the terminal nodes `FALSE` and `TRUE`. The nodes are kept unique,
+    so two diagrams of the same manager represent the same Boolean function
+    exactly when their nodes are equal.
+
+    The results of `ite` are cached in a computed table of a fixed number of
+    entries, each result replacing the one in the entry that its operands hash
+    to, so that the table stays bounded however many operations are applied.
+
+    Attributes:
+        variables (`~typing.List`\\[`str`]): the variables of the manager, from
+            the one tested closest to the roots to the one tested closest to
+            the terminals.
+        computed_size (`int`): the number of entries of the computed table.
+    """
+
+    FALSE = 0
+    TRUE = 1
+
+    def __init__(self, variables: Sequence[str] = (),
+                 computed_size: int = BDD_COMPUTED_SIZE) -> None:
+        """Initializes a `BDD` manager with no nodes beyond the terminals.
+
+        Parameters:
+            variables: the initial variable order. Other variables are added
+                after these ones when first used.
+            computed_size: the number of entries of the computed table.
+        """
+        assert computed_size > 0
+        self.variables = []
+        self._levels = {}
+        # The level of the variable tested by each node, and its low (False)
+        # and high (True) children. Terminals are at the level after all
+        # variables, which is represented by a level larger than any other.
+        self._node_levels = [1 << 30, 1 << 30]
+        self._lows = [0, 1]
+        self._highs = [0, 1]
+        self._unique = {}
+        self.computed_size = computed_size
+        # The operands and result of the last call to `ite` cached in each
+        # entry of the computed table, or None for an empty entry.
+        self._computed = [None] * computed_size
+        for variable in variables:
+            self.variable(variable)
+
+    def __len__(self) -> int:
+        """Counts the nodes of the manager.
+
+        Returns:
+            The number of nodes created so far, including the terminals.
+        """
+        return len(self._lows)
+
+    def variable(self, name: str) -> int:
+        """Computes the diagram of the given variable, adding the variable to
+        the order if it is new.
+
+        Parameters:
+            name: variable to compute the diagram of.
+
+        Returns:
+            The node of the function that is the value of the given variable.
+        """
+        assert is_variable(name)
+        if name not in self._levels:
+            self._levels[name] = len(self.variables)
+            self.variables.append(name)
+        return self._node(self._levels[name], self.FALSE, self.TRUE)
+
+    def ite(self, condition: int, then: int, otherwise: int) -> int:
+        """Computes the if-then-else combination of the given diagrams.
+
+        Parameters:
+            condition: node of the condition.
+            then: node of the value where the condition holds.
+            otherwise: node of the value where the condition does not hold.
+
+        Returns:
+            The node of the function that equals `then` where `condition`
+            holds, and `otherwise` elsewhere.
+        """
+        if condition == self.TRUE or then == otherwise:
+            return then
+        if condition == self.FALSE:
+            return otherwise
+        if then == self.TRUE and otherwise == self.FALSE:
+            return condition
+        key = (condition, then, otherwise)
+        slot = hash(key) % self.computed_size
+        entry = self._computed[slot]
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        levels = self._node_levels
+        level = min(levels[condition], levels[then], levels[otherwise])
+        condition_low, condition_high = self._cofactors(condition, level)
+        then_low, then_high = self._cofactors(then, level)
+        otherwise_low, otherwise_high = self._cofactors(otherwise, level)
+        node = self._node(level,
+                          self.ite(condition_low, then_low, otherwise_low),
+                          self.ite(condition_high, then_high, otherwise_high))
+        self._computed[slot] = (key, node)
+        return node
+
+    def apply(self, operator: str, first: int, second: int = FALSE) -> int:
+        """Applies the given operator to the given diagrams.
+
+        Parameters:
+            operator: a unary or binary operator.
+            first: node of the first operand.
+            second: node of the second operand, if the operator is binary.
+
+        Returns:
+            The node of the result of the given operator on the given operands.
+        """
+        if is_unary(operator):
+            return self.ite(first, self.FALSE, self.TRUE)
+        assert is_binary(operator)
+        if operator == '&':
+            return self.ite(first, second, self.FALSE)
+        if operator == '|':
+            return self.ite(first, self.TRUE, second)
+        if operator == '->':
+            return self.ite(first, second, self.TRUE)
+        if operator == '-&':
+            return self.ite(first, self.apply('~', second), self.TRUE)
+        if operator == '-|':
+            return self.ite(first, self.FALSE, self.apply('~', second))
+        negated = self.apply('~', second)
+        if operator == '+':
+            return self.ite(first, negated, second)
+        assert operator == '<->'
+        return self.ite(first, second, negated)
+
+    def from_formula(self, formula: Formula) -> int:
+        """Computes the diagram of the given formula.
+
+        Parameters:
+            formula: formula to compute the diagram of.
+
+        Returns:
+            The node of the Boolean function of the given formula.
+        """
+        nodes = []
+        for root, first, second in formula_nodes(formula):
+            if is_variable(root):
+                nodes.append(self.variable(root))
+            elif is_constant(root):
+                nodes.append(self.TRUE if root == 'T' else self.FALSE)
+            elif is_unary(root):
+                nodes.append(self.apply(root, nodes[first]))
+            else:
+                nodes.append(self.apply(root, nodes[first], nodes[second]))
+        return nodes[-1]
+
+    def to_formula(self, node: int) -> Formula:
+        """Converts the given diagram back to a formula, by Shannon expansion
+        of every node. Formulae of shared nodes are shared as objects.
+
+        Parameters:
+            node: node to convert.
+
+        Returns:
+            A formula whose Boolean function is that of the given node.
+        """
+        formulae = {self.FALSE: Formula('F'), self.TRUE: Formula('T')}
+
+        def convert(node: int) -> Formula:
+            if node in formulae:
+                return formulae[node]
+            variable = Formula(self.variables[self._node_levels[node]])
+            low, high = self._lows[node], self._highs[node]
+            if low == self.FALSE and high == self.TRUE:
+                formula = variable
+            elif low == self.TRUE and high == self.FALSE:
+                formula = Formula('~', variable)
+            elif low == self.FALSE:
+                formula = Formula('&', variable, convert(high))
+            elif high == self.TRUE:
+                formula = Formula('|', variable, convert(low))
+            elif high == self.FALSE:
+                formula = Formula('&', Formula('~', variable), convert(low))
+            elif low == self.TRUE:
+                formula = Formula('->', variable, convert(high))
+            else:
+                formula = Formula('|',
+                                  Formula('&', variable, convert(high)),
+                                  Formula('&', Formula('~', variable),
+                                          convert(low)))
+            formulae[node] = formula
+            return formula
+
+        return convert(node)
+
+    def restrict(self, node: int, values: Mapping[str, bool]) -> int:
+        """Fixes the values of some variables in the given diagram.
+
+        Parameters:
+            node: node to restrict.
+            values: the values of the variables to fix.
+
+        Returns:
+            The node of the function of the given node when the given variables
+            have the given values.
+        """
+        fixed = {self._levels[variable]: value
+                 for variable, value in values.items()
+                 if variable in self._levels}
+        restricted = {}
+
+        def restrict(node: int) -> int:
+            if node <= self.TRUE:
+                return node
+            if node in restricted:
+                return restricted[node]
+            level = self._node_levels[node]
+            if level in fixed:
+                result = restrict(self._highs[node] if fixed[level] else
+                                  self._lows[node])
+            else:
+                result = self._node(level, restrict(self._lows[node]),
+                                    restrict(self._highs[node]))
+            restricted[node] = result
+            return result
+
+        return restrict(node)
+
+    def compose(self, node: int, variable: str, substitute: int) -> int:
+        """Substitutes a diagram for a variable in the given diagram.
+
+        Parameters:
+            node: node to substitute in.
+            variable: variable to substitute for.
+            substitute: node to substitute.
+
+        Returns:
+            The node of the function of the given node when the given variable
+            takes the value of the given substitute.
+        """
+        return self.ite(substitute, self.restrict(node, {variable: True}),
+                        self.restrict(node, {variable: False}))
+
+    def exists(self, node: int, variables: Iterable[str]) -> int:
+        """Existentially quantifies the given variables in the given diagram.
+
+        Parameters:
+            node: node to quantify.
+            variables: variables to quantify.
+
+        Returns:
+            The node of the function that holds wherever the given node holds
+            for some values of the given variables.
+        """
+        for variable in variables:
+            node = self.apply('|', self.restrict(node, {variable: False}),
+                              self.restrict(node, {variable: True}))
+        return node
+
+    def forall(self, node: int, variables: Iterable[str]) -> int:
+        """Universally quantifies the given variables in the given diagram.
+
+        Parameters:
+            node: node to quantify.
+            variables: variables to quantify.
+
+        Returns:
+            The node of the function that holds wherever the given node holds
+            for all values of the given variables.
+        """
+        for variable in variables:
+            node = self.apply('&', self.restrict(node, {variable: False}),
+                              self.restrict(node, {variable: True}))
+        return node
+
+    def model(self, node: int) -> Optional[Dict[str, bool]]:
+        """Finds a model of the given diagram.
+
+        Parameters:
+            node: node to find a model of.
+
+        Returns:
+            ``None`` if the given node is `FALSE`, otherwise a model over the
+            variables tested on some path from the node to `TRUE`, in which the
+            function of the node holds.
+        """
+        if node == self.FALSE:
+            return None
+        model = {}
+        while node != self.TRUE:
+            variable = self.variables[self._node_levels[node]]
+            model[variable] = self._lows[node] == self.FALSE
+            node = self._highs[node] if model[variable] else self._lows[node]
+        return model
+
+    def _node(self, level: int, low: int, high: int) -> int:
+        if low == high:
+            return low
+        key = (level, low, high)
+        if key not in self._unique:
+            self._unique[key] = len(self._lows)
+            self._node_levels.append(level)
+            self._lows.append(low)
+            self._highs.append(high)
+        return self._unique[key]
+
+    def _cofactors(self, node: int, level: int) -> Tuple[int, int]:
+        if self._node_levels[node] != level:
+            return node, node
+        return self._lows[node], self._highs[node]
@@ -0,0 +1,292 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/incremental.py
+
+"""Incremental re-evaluation of propositional formulae in models that change a
+few variables at a time."""
+
+from heapq import heapify, heappop, heappush
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, \
+                   Optional, Sequence, Tuple
+
+from syntax import *
+from semantics import *
+
+def node_parents(nodes: Sequence[FormulaNode]) -> List[List[int]]:
+    """Indexes the nodes of a formula DAG by their operands.
+
+    Parameters:
+        nodes: the nodes of the DAG, as returned by `~syntax.formula_nodes`.
+
+    Returns:
+        A list whose `i`-th element is the list of the positions of the
+        distinct nodes that have the `i`-th node as an operand, in increasing
+        order.
+
+    Examples:
+        >>> node_parents(formula_nodes(Formula.parse('((p&q)|~p)')))
+        [[2, 3], [2], [4], [4], []]
+    """
+    parents = [[] for _ in nodes]
+    for position, (root, first, second) in enumerate(nodes):
+        if first >= 0:
+            parents[first].append(position)
+        if second >= 0 and second != first:
+            parents[second].append(position)
+    return parents
+
+def node_values(nodes: Sequence[FormulaNode], model: Model) -> List[bool]:
+    """Calculates the truth values of all nodes of a formula DAG in a model.
+
+    Parameters:
+        nodes: the nodes of the DAG, as returned by `~syntax.formula_nodes`.
+        model: model over (possibly a superset of) the variables of the DAG.
+
+    Returns:
+        A list whose `i`-th element is the truth value of the `i`-th node in
+        the given model.
+    """
+    values = []
+    for root, first, second in nodes:
+        if is_variable(root):
+            values.append(model[root])
+        elif is_constant(root):
+            values.append(root == 'T')
+        else:
+            values.append(OPERATOR_FUNCTIONS[root](
+                values[first], values[second] if second >= 0 else None, True))
+    return values
+
+def propagate_changes(nodes: Sequence[FormulaNode],
+                      parents: Sequence[List[int]], values: List[bool],
+                      changed: Iterable[int],
+                      report: Optional[Callable[[int], None]] = None) -> int:
+    """Re-evaluates the nodes of a formula DAG whose truth values may change
+    after the truth values of some of its nodes have changed.
+
+    Only the nodes on paths from the changed nodes to the roots of the DAG are
+    re-evaluated, each at most once and in the order of the DAG, and the
+    propagation stops at every node whose truth value does not change, so the
+    cost is proportional to the part of the cones of the changed nodes that
+    actually changes, regardless of the size of the DAG.
+
+    Parameters:
+        nodes: the nodes of the DAG, as returned by `~syntax.formula_nodes`.
+        parents: the operand index of the DAG, as returned by `node_parents`.
+        values: the current truth values of the nodes, already updated at the
+            changed nodes, which are updated in place.
+        changed: the positions of the nodes whose truth values have changed.
+        report: function to call with the position of every re-evaluated node
+            whose truth value changes, or ``None``.
+
+    Returns:
+        The number of nodes that were re-evaluated.
+    """
+    pending = []
+    queued = set()
+    for position in changed:
+        for parent in parents[position]:
+            if parent not in queued:
+                queued.add(parent)
+                pending.append(parent)
+    heapify(pending)
+    evaluated = 0
+    while len(pending) > 0:
+        current = heappop(pending)
+        root, first, second = nodes[current]
+        value = OPERATOR_FUNCTIONS[root](
+            values[first], values[second] if second >= 0 else None, True)
+        evaluated += 1
+        if value != values[current]:
+            values[current] = value
+            if report is not None:
+                report(current)
+            for parent in parents[current]:
+                if parent not in queued:
+                    queued.add(parent)
+                    heappush(pending, parent)
+    return evaluated
+
+def propagate_flip(nodes: Sequence[FormulaNode], parents: Sequence[List[int]],
+                   values: List[bool], position: int) -> int:
+    """Negates the truth value of a variable node of a formula DAG, and
+    re-evaluates the nodes whose truth values may change as a result, by
+    `propagate_changes`.
+
+    Parameters:
+        nodes: the nodes of the DAG, as returned by `~syntax.formula_nodes`.
+        parents: the operand index of the DAG, as returned by `node_parents`.
+        values: the current truth values of the nodes, as returned by
+            `node_values`, which are updated in place.
+        position: the position of the variable node whose value to negate.
+
+    Returns:
+        The number of nodes that were re-evaluated.
+    """
+    assert is_variable(nodes[position][0])
+    values[position] = not values[position]
+    return propagate_changes(nodes, parents, values, [position])
+
+class IncrementalEvaluator:
+    """Spreadsheet-style evaluator of a fixed sequence of formulae in a model
+    that changes a few variables at a time.
+
+    The formulae are flattened into a single DAG by `~syntax.formulae_nodes`,
+    so that subformulae common to several of them are evaluated once. The
+    evaluator holds the truth value of every node and the parents of every
+    node, and propagates each update through the affected nodes only, by
+    `propagate_changes`.
+
+    Attributes:
+        formulae (`~typing.Tuple`\\[`~syntax.Formula`, ...]): the evaluated
+            formulae.
+        nodes (`~typing.List`\\[`~syntax.FormulaNode`]): the nodes of the DAG
+            of the formulae.
+        roots (`~typing.List`\\[`int`]): the position of each formula in the
+            DAG.
+        model (`~typing.Dict`\\[`str`, `bool`]): the current model, over the
+            variables of the formulae.
+        evaluations (`int`): the number of nodes re-evaluated by updates so
+            far.
+    """
+    formulae: Tuple[Formula, ...]
+    nodes: List[FormulaNode]
+    roots: List[int]
+    model: Dict[str, bool]
+    evaluations: int
+
+    def __init__(self, formulae: Sequence[Formula],
+                 model: Optional[Model] = None) -> None:
+        """Initializes an `IncrementalEvaluator` by evaluating the given
+        formulae in full.
+
+        Parameters:
+            formulae: the formulae to evaluate.
+            model: the initial model, over (possibly a superset of) the
+                variables of the given formulae, or ``None`` to initially
+                assign ``False`` to all of them.
+        """
+        self.formulae = tuple(formulae)
+        self.nodes, self.roots = formulae_nodes(self.formulae)
+        self._parents = node_parents(self.nodes)
+        self._positions = {root: position for position, (root, _, _)
+                           in enumerate(self.nodes) if is_variable(root)}
+        # The indices of the formulae rooted at each position of the DAG.
+        self._formulae_at = {}
+        for index, root in enumerate(self.roots):
+            self._formulae_at.setdefault(root, []).append(index)
+        if model is None:
+            self.model = dict.fromkeys(self._positions, False)
+        else:
+            self.model = {variable: model[variable]
+                          for variable in self._positions}
+        self._values = node_values(self.nodes, self.model)
+        self.evaluations = 0
+
+    def __len__(self) -> int:
+        """Counts the evaluated formulae.
+
+        Returns:
+            The number of evaluated formulae.
+        """
+        return len(self.formulae)
+
+    def value(self, index: int) -> bool:
+        """Finds the current truth value of an evaluated formula.
+
+        Parameters:
+            index: the index of the formula among the evaluated formulae.
+
+        Returns:
+            The truth value of the formula in the current model.
+        """
+        return self._values[self.roots[index]]
+
+    def truth_values(self) -> List[bool]:
+        """Finds the current truth values of all evaluated formulae.
+
+        Returns:
+            The truth values of the evaluated formulae in the current model,
+            in their order.
+        """
+        return [self._values[root] for root in self.roots]
+
+    def update(self, changes: Mapping[str, bool]) -> List[int]:
+        """Assigns new values to some variables of the current model, and
+        propagates the changes through the affected nodes.
+
+        Parameters:
+            changes: mapping from some variables to their new values. Variables
+                that do not appear in the evaluated formulae are ignored.
+
+        Returns:
+            The indices, in increasing order, of the evaluated formulae whose
+            truth values changed.
+
+        Examples:
+            >>> evaluator = IncrementalEvaluator(
+            ...     [Formula.parse('(p&q)'), Formula.parse('(p|r)'),
+            ...      Formula.parse('~r')])
+            >>> evaluator.update({'p': True})
+            [1]
+            >>> evaluator.update({'q': True, 'r': True})
+            [0, 2]
+        """
+        changed = []
+        for variable, value in changes.items():
+            assert is_variable(variable)
+            position = self._positions.get(variable)
+            if position is not None and self._values[position] != value:
+                self.model[variable] = value
+                self._values[position] = value
+                changed.append(position)
+        flipped = [index for position in changed
+                   for index in self._formulae_at.get(position, [])]
+        self.evaluations += propagate_changes(
+            self.nodes, self._parents, self._values, changed,
+            lambda position: flipped.extend(self._formulae_at.get(position,
+                                                                  [])))
+        return sorted(flipped)
+
+def gray_code_truth_values(formula: Formula,
+                           variables: Optional[Sequence[str]] = None) -> \
+        Iterator[bool]:
+    """Calculates the truth values of the given formula in all models in
+    reflected Gray-code order, by flipping a single variable between
+    consecutive models and re-evaluating only the affected nodes by
+    `propagate_flip`.
+
+    Parameters:
+        formula: formula to calculate the truth values of.
+        variables: the variables (a superset of those of the given formula)
+            over which to enumerate the models, in their order for
+            `~semantics.all_models`. Defaults to the variables of the formula,
+            sorted alphabetically.
+
+    Returns:
+        An iterator over the truth values of the given formula in the models
+        returned by `~semantics.all_models`\\ ``(``\\ `variables`\\ ``,
+        gray=True)``, in that order.
+
+    Examples:
+        >>> list(gray_code_truth_values(Formula.parse('(p->q)')))
+        [True, True, True, False]
+    """
+    if variables is None:
+        variables = sorted(formula.variables())
+    assert formula.variables().issubset(variables)
+    nodes = formula_nodes(formula)
+    parents = node_parents(nodes)
+    positions = {root: position for position, (root, _, _) in enumerate(nodes)
+                 if is_variable(root)}
+    values = node_values(nodes, dict.fromkeys(positions, False))
+    yield values[-1]
+    count = len(variables)
+    for index in range(1, 1 << count):
+        # The model of Gray code index ^ (index >> 1) differs from the
+        # previous one in the bit of the lowest bit set in index.
+        variable = variables[count - (index & -index).bit_length()]
+        if variable in positions:
+            propagate_flip(nodes, parents, values, positions[variable])
+        yield values[-1]
@@ -0,0 +1,955 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/sat.py
+
+"""Satisfiability checking of propositional formulae via clause form."""
+
+from heapq import heapify, heappop, heappush
+from time import perf_counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, \
+                   Tuple, Union
+
+from syntax import *
+
+# A clause is a disjunction of literals, where the literal `v` stands for the
+# solver variable number `v` (counting from 1), and `-v` for its negation.
+Clause = Tuple[int, ...]
+
+# The gate by which the clause form defines each binary operator, and whether
+# the operator is the negation of that gate.
+GATES = {'&': ('&', False), '-&': ('&', True),
+         '|': ('|', False), '-|': ('|', True),
+         '->': ('->', False),
+         '+': ('+', False), '<->': ('+', True)}
+
+def gate_clauses(gate: str, x: int, a: int, b: int) -> List[Clause]:
+    """Computes the clauses defining a solver variable as the output of a gate.
+
+    Parameters:
+        gate: the gate, one of ``'&'``, ``'|'``, ``'->'`` and ``'+'``.
+        x: the solver variable to define.
+        a: the literal of the first input of the gate.
+        b: the literal of the second input of the gate.
+
+    Returns:
+        Clauses that hold exactly when `x` is the output of the given gate on
+        the given inputs.
+    """
+    if gate == '&':
+        return [(-x, a), (-x, b), (x, -a, -b)]
+    if gate == '|':
+        return [(-x, a, b), (x, -a), (x, -b)]
+    if gate == '->':
+        return [(-x, -a, b), (x, a), (x, -b)]
+    assert gate == '+'
+    return [(-x, a, b), (-x, -a, -b), (x, -a, b), (x, a, -b)]
+
+def to_cnf(formula: Formula) -> Tuple[List[Clause], Dict[str, int]]:
+    """Converts the given formula into an equisatisfiable formula in
+    conjunctive normal form, by introducing an auxiliary solver variable for
+    every distinct compound subformula (the Tseitin transformation).
+
+    Parameters:
+        formula: formula to convert.
+
+    Returns:
+        A pair of the clauses of the converted formula, and a mapping from each
+        variable of the given formula to its solver variable number. Every
+        model of the given formula extends uniquely to a model of the clauses,
+        so their models correspond one to one.
+
+    Examples:
+        >>> to_cnf(Formula.parse('(p|~q)'))
+        ([(-3, 1, -2), (3, -1), (3, 2), (3,)], {'p': 1, 'q': 2})
+    """
+    nodes = formula_nodes(formula)
+    numbers = {}
+    for root, first, second in nodes:
+        if is_variable(root):
+            numbers[root] = len(numbers) + 1
+    # Auxiliary variables are numbered after all variables of the formula, so
+    # that the solver variables of the formula are exactly 1..len(numbers).
+    count = len(numbers)
+    clauses = []
+    literals = []
+    for root, first, second in nodes:
+        if is_variable(root):
+            literals.append(numbers[root])
+            continue
+        if is_unary(root):
+            literals.append(-literals[first])
+            continue
+        count += 1
+        x = count
+        if is_constant(root):
+            clauses.append((x,) if root == 'T' else (-x,))
+            literals.append(x)
+            continue
+        gate, negated = GATES[root]
+        clauses += gate_clauses(gate, x, literals[first], literals[second])
+        literals.append(-x if negated else x)
+    clauses.append((literals[-1],))
+    return clauses, numbers
+
+def dpll(clauses: Sequence[Clause], count: int) -> Optional[List[bool]]:
+    """Decides the satisfiability of the given clauses by the
+    Davis-Putnam-Logemann-Loveland procedure, with unit propagation and
+    pure-literal elimination.
+
+    Parameters:
+        clauses: clauses to satisfy.
+        count: the number of solver variables, which are numbered from ``1``
+            to `count`.
+
+    Returns:
+        ``None`` if the given clauses are unsatisfiable, otherwise a list whose
+        `v`-th entry is the value of the solver variable number `v` in a model
+        of the clauses (the ``0``-th entry is unused).
+    """
+    values = [0] * (count + 1)
+    occurrences = {literal: [] for v in range(1, count + 1)
+                   for literal in (v, -v)}
+    for index, clause in enumerate(clauses):
+        if len(clause) == 0:
+            return None
+        for literal in clause:
+            occurrences[literal].append(index)
+    trail = []
+    # For every decision: the trail length before it, its literal, and
+    # whether it is already the second branch of that decision.
+    decisions = []
+
+    def assign(literal: int) -> None:
+        values[abs(literal)] = 1 if literal > 0 else -1
+        trail.append(literal)
+
+    def value(literal: int) -> int:
+        return values[literal] if literal > 0 else -values[-literal]
+
+    def propagate(start: int) -> bool:
+        while start < len(trail):
+            falsified = -trail[start]
+            start += 1
+            for index in occurrences[falsified]:
+                unassigned = None
+                for literal in clauses[index]:
+                    current = value(literal)
+                    if current == 1:
+                        break
+                    if current == 0:
+                        if unassigned is not None:
+                            break
+                        unassigned = literal
+                else:
+                    if unassigned is None:
+                        return False
+                    assign(unassigned)
+        return True
+
+    for clause in clauses:
+        if len(clause) == 1 and value(clause[0]) != 1:
+            if value(clause[0]) == -1:
+                return None
+            assign(clause[0])
+    start = 0
+    while True:
+        if propagate(start):
+            start = len(trail)
+            polarities = {}
+            branch = None
+            for clause in clauses:
+                unassigned = []
+                for literal in clause:
+                    current = value(literal)
+                    if current == 1:
+                        break
+                    if current == 0:
+                        unassigned.append(literal)
+                else:
+                    for literal in unassigned:
+                        polarities[abs(literal)] = \
+                            polarities.get(abs(literal), 0) | \
+                            (1 if literal > 0 else 2)
+                    if branch is None or len(unassigned) < len(branch):
+                        branch = unassigned
+            if branch is None:
+                return [v > 0 for v in values]
+            pure = [v if polarity == 1 else -v
+                    for v, polarity in polarities.items() if polarity != 3]
+            if len(pure) > 0:
+                for literal in pure:
+                    assign(literal)
+                continue
+            decisions.append((len(trail), branch[0], False))
+            assign(branch[0])
+            continue
+        while len(decisions) > 0:
+            length, literal, flipped = decisions.pop()
+            for undone in trail[length:]:
+                values[abs(undone)] = 0
+            del trail[length:]
+            if not flipped:
+                decisions.append((length, -literal, True))
+                assign(-literal)
+                break
+        else:
+            return None
+        start = len(trail) - 1
+
+def dpll_model(formula: Formula) -> Optional[Dict[str, bool]]:
+    """Searches for a model of the given formula via `dpll`.
+
+    Parameters:
+        formula: formula to find a model for.
+
+    Returns:
+        A model over the variables of the given formula in which it holds, or
+        ``None`` if the formula is unsatisfiable.
+    """
+    clauses, numbers = to_cnf(formula)
+    count = max([abs(literal) for clause in clauses for literal in clause] +
+                [len(numbers)])
+    solution = dpll(clauses, count)
+    if solution is None:
+        return None
+    return {variable: solution[number]
+            for variable, number in sorted(numbers.items())}
+
+def count_solutions(clauses: Iterable[Clause], count: int,
+                    branching: Optional[int] = None) -> int:
+    """Counts the models of the given clauses, by a DPLL-style search that
+    splits the clauses into independent components and caches the count of
+    every component it meets.
+
+    Parameters:
+        clauses: clauses to count the models of.
+        count: the number of solver variables, which are numbered from ``1``
+            to `count`.
+        branching: if given, only the solver variables numbered from ``1`` to
+            `branching` are branched on before others. For clauses produced by
+            `to_cnf`, all other variables are then implied by unit propagation.
+
+    Returns:
+        The number of assignments to all solver variables that satisfy all the
+        given clauses.
+    """
+    cache = {}
+    if branching is None:
+        branching = count
+
+    def assign(clauses: Iterable[Clause], literal: int) -> \
+            Optional[List[Clause]]:
+        assigned = []
+        for clause in clauses:
+            if literal in clause:
+                continue
+            if -literal in clause:
+                clause = tuple(other for other in clause if other != -literal)
+                if len(clause) == 0:
+                    return None
+            assigned.append(clause)
+        return assigned
+
+    def propagate(clauses: List[Clause]) -> \
+            Optional[Tuple[List[Clause], int]]:
+        # Assigns all unit literals, finding the clauses that each assignment
+        # may make unit or falsify through the occurrences of its negation.
+        units = [clause[0] for clause in clauses if len(clause) == 1]
+        if len(units) == 0:
+            return clauses, 0
+        true = set()
+        occurrences = {}
+        for index, clause in enumerate(clauses):
+            for literal in clause:
+                occurrences.setdefault(literal, []).append(index)
+        position = 0
+        while position < len(units):
+            unit = units[position]
+            position += 1
+            if unit in true:
+                continue
+            if -unit in true:
+                return None
+            true.add(unit)
+            for index in occurrences.get(-unit, []):
+                unassigned = []
+                for literal in clauses[index]:
+                    if literal in true:
+                        break
+                    if -literal not in true:
+                        unassigned.append(literal)
+                else:
+                    if len(unassigned) == 0:
+                        return None
+                    if len(unassigned) == 1:
+                        units.append(unassigned[0])
+        return [tuple(literal for literal in clause if -literal not in true)
+                for clause in clauses if true.isdisjoint(clause)], len(true)
+
+    def count_all(clauses: List[Clause], variables: int) -> \
+            Union[int, List[Any]]:
+        # The number of models over the given number of variables, which
+        # include those occurring in the clauses, or a frame that multiplies
+        # the counts of their independent components.
+        propagated = propagate(clauses)
+        if propagated is None:
+            return 0
+        clauses, units = propagated
+        occurrences = {}
+        for index, clause in enumerate(clauses):
+            for literal in clause:
+                occurrences.setdefault(abs(literal), []).append(index)
+        result = 1 << (variables - units - len(occurrences))
+        # The components are found by a search from each clause through the
+        # clauses that share its variables, each variable being crossed once.
+        groups = []
+        reached = set()
+        for start in range(len(clauses)):
+            if len(occurrences) == 0:
+                break
+            if start in reached:
+                continue
+            reached.add(start)
+            pending = [start]
+            group = []
+            while len(pending) > 0:
+                index = pending.pop()
+                group.append(index)
+                for literal in clauses[index]:
+                    for other in occurrences.pop(abs(literal), ()):
+                        if other not in reached:
+                            reached.add(other)
+                            pending.append(other)
+            if len(group) == len(clauses):
+                groups.append(clauses)
+            else:
+                groups.append([clauses[index] for index in sorted(group)])
+        if len(groups) == 0:
+            return result
+        return ['product', result, groups, 0]
+
+    def count_component(clauses: List[Clause]) -> Union[int, List[Any]]:
+        # The number of models of a component if it is cached, otherwise a
+        # frame that sums the counts of both branches on its chosen variable.
+        key = tuple(clauses)
+        if key in cache:
+            return cache[key]
+        occurrences = {}
+        for clause in clauses:
+            for literal in clause:
+                variable = abs(literal)
+                occurrences[variable] = occurrences.get(variable, 0) + 1
+        variable = max(occurrences, key=lambda variable: (
+            variable <= branching, occurrences[variable]))
+        return ['sum', 0, [variable, -variable], 0, key, clauses,
+                len(occurrences)]
+
+    clauses = [tuple(set(clause)) for clause in clauses]
+    if any(len(clause) == 0 for clause in clauses):
+        return 0
+    clauses = [clause for clause in clauses
+               if not any(-literal in clause for literal in clause)]
+    # The search keeps an explicit stack of frames, each waiting for the
+    # counts of its subproblems: a product over the components of a set of
+    # clauses, or a sum over the two branches of a component. The result of
+    # the last finished subproblem is passed to the frame below it.
+    result = count_all(clauses, count)
+    stack = []
+    while True:
+        if isinstance(result, list):
+            stack.append(result)
+            result = None
+        if len(stack) == 0:
+            return result
+        frame = stack[-1]
+        if frame[0] == 'product':
+            if result is not None:
+                frame[1] *= result
+                frame[3] += 1
+            if frame[1] == 0 or frame[3] == len(frame[2]):
+                stack.pop()
+                result = frame[1]
+            else:
+                result = count_component(frame[2][frame[3]])
+        else:
+            _, total, literals, index, key, component, variables = frame
+            if result is not None:
+                total += result
+                index += 1
+            assigned = None
+            while index < len(literals):
+                assigned = assign(component, literals[index])
+                if assigned is not None:
+                    break
+                index += 1
+            frame[1], frame[3] = total, index
+            if index == len(literals):
+                stack.pop()
+                cache[key] = total
+                result = total
+            else:
+                result = count_all(assigned, variables - 1)
+
+def luby(index: int) -> int:
+    """Computes an element of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, ...
+
+    Parameters:
+        index: the position of the element to compute, counting from ``0``.
+
+    Returns:
+        The element of the Luby sequence at the given position.
+    """
+    size, exponent = 1, 0
+    while size < index + 1:
+        exponent += 1
+        size = 2 * size + 1
+    while size - 1 != index:
+        size = (size - 1) // 2
+        exponent -= 1
+        index %= size
+    return 1 << exponent
+
+class CDCLSolver:
+    """A conflict-driven clause-learning SAT solver, with two-watched-literal
+    propagation, first-UIP clause learning, VSIDS decision activities, phase
+    saving, Luby restarts and deletion of inactive learned clauses.
+
+    Internally, the literals of the solver variable `v` are numbered ``2*v``
+    (positive) and ``2*v+1`` (negative), and all clauses are stored one after
+    the other in a single flat list of such literals. The first two literals of
+    every clause are the watched ones, and the literal implied by a clause is
+    always its first one.
+
+    Attributes:
+        count (`int`): the number of solver variables.
+        model (`~typing.List`\\[`bool`]): if the last call to `solve` returned
+            ``True``, a list whose `v`-th entry is the value of the solver
+            variable number `v` in the model found (the ``0``-th entry is
+            unused).
+        conflicts (`int`): the number of conflicts encountered so far.
+        decisions (`int`): the number of decisions made so far.
+        propagations (`int`): the number of literals assigned so far.
+        restarts (`int`): the number of restarts made so far.
+        deleted (`int`): the number of learned clauses deleted so far.
+        solve_time (`float`): the total number of seconds spent in `solve`.
+    """
+
+    #: Number of conflicts per unit of the Luby restart sequence.
+    RESTART_UNIT = 100
+    #: Decay factor of the variable activities.
+    VARIABLE_DECAY = 0.95
+    #: Decay factor of the learned-clause activities.
+    CLAUSE_DECAY = 0.999
+    #: Number of learned clauses kept before the first deletion.
+    LEARNED_LIMIT = 2000
+    #: Growth factor of the number of learned clauses kept after a deletion.
+    LEARNED_GROWTH = 1.1
+
+    def __init__(self, clauses: Iterable[Clause] = (), count: int = 0) -> \
+            None:
+        """Initializes a `CDCLSolver` from its initial clauses.
+
+        Parameters:
+            clauses: clauses to satisfy.
+            count: the number of solver variables, which are numbered from
+                ``1`` to `count`. More can be added via `new_variable`.
+        """
+        self.count = 0
+        self.model = []
+        self.conflicts = self.decisions = self.propagations = 0
+        self.restarts = self.deleted = 0
+        self.solve_time = 0.0
+        self._values = [0, 0]
+        self._levels = [0]
+        self._reasons = [-1]
+        self._activities = [0.0]
+        self._phases = [False]
+        self._seen = [False]
+        self._watches = [[], []]
+        self._literals = []
+        self._starts = []
+        self._sizes = []
+        self._learned = []
+        self._clause_activities = []
+        self._trail = []
+        self._trail_limits = []
+        self._head = 0
+        self._heap = []
+        self._variable_increment = 1.0
+        self._clause_increment = 1.0
+        self._learned_limit = self.LEARNED_LIMIT
+        self._unsatisfiable = False
+        for index in range(count):
+            self.new_variable()
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def new_variable(self) -> int:
+        """Adds a fresh solver variable.
+
+        Returns:
+            The number of the added solver variable.
+        """
+        self.count += 1
+        self._values += [0, 0]
+        self._levels.append(0)
+        self._reasons.append(-1)
+        self._activities.append(0.0)
+        self._phases.append(False)
+        self._seen.append(False)
+        self._watches += [[], []]
+        heappush(self._heap, (0.0, self.count))
+        return self.count
+
+    def add_clause(self, clause: Clause) -> bool:
+        """Adds the given clause to the clauses to satisfy.
+
+        Parameters:
+            clause: clause to add, over existing solver variables.
+
+        Returns:
+            ``False`` if the clauses added so far are now known to be
+            unsatisfiable, ``True`` otherwise.
+        """
+        self._cancel_until(0)
+        if self._unsatisfiable:
+            return False
+        literals = []
+        for literal in clause:
+            assert 0 < abs(literal) <= self.count
+            internal = 2 * literal if literal > 0 else -2 * literal + 1
+            if self._values[internal] == 1 or internal ^ 1 in literals:
+                return True
+            if self._values[internal] == 0 and internal not in literals:
+                literals.append(internal)
+        if len(literals) == 0:
+            self._unsatisfiable = True
+        elif len(literals) == 1:
+            self._enqueue(literals[0], -1)
+            self._unsatisfiable = self._propagate() != -1
+        else:
+            self._store(literals, False)
+        return not self._unsatisfiable
+
+    def solve(self, assumptions: Sequence[int] = ()) -> bool:
+        """Decides whether the clauses added so far are satisfiable, together
+        with the given assumed literals. Clauses learned while solving remain
+        valid without the assumptions, so they are kept for later calls.
+
+        Parameters:
+            assumptions: literals to assume only for this call.
+
+        Returns:
+            ``True`` if the clauses and assumptions are satisfiable, in which
+            case `model` is set to a model of them, ``False`` otherwise.
+        """
+        started = perf_counter()
+        try:
+            return self._search([2 * literal if literal > 0 else
+                                 -2 * literal + 1 for literal in assumptions])
+        finally:
+            self.solve_time += perf_counter() - started
+
+    def statistics(self) -> Dict[str, float]:
+        """Summarizes the work done by the solver so far.
+
+        Returns:
+            A mapping from the names of the counters of the solver to their
+            values, including the number of propagations per second spent in
+            `solve`.
+        """
+        return {'variables': self.count,
+                'clauses': len(self._starts) - len(self._learned) -
+                           self.deleted,
+                'learned': len(self._learned),
+                'conflicts': self.conflicts,
+                'decisions': self.decisions,
+                'propagations': self.propagations,
+                'restarts': self.restarts,
+                'deleted': self.deleted,
+                'solve_time': self.solve_time,
+                'propagations_per_second':
+                    self.propagations / self.solve_time
+                    if self.solve_time > 0 else 0.0}
+
+    def _search(self, assumptions: List[int]) -> bool:
+        if self._unsatisfiable:
+            return False
+        self._cancel_until(0)
+        if self._propagate() != -1:
+            self._unsatisfiable = True
+            return False
+        restart_conflicts = luby(self.restarts) * self.RESTART_UNIT
+        while True:
+            conflict = self._propagate()
+            if conflict != -1:
+                self.conflicts += 1
+                restart_conflicts -= 1
+                if len(self._trail_limits) == 0:
+                    self._unsatisfiable = True
+                    return False
+                learned, level = self._analyze(conflict)
+                self._cancel_until(level)
+                if len(learned) == 1:
+                    self._enqueue(learned[0], -1)
+                else:
+                    self._enqueue(learned[0], self._store(learned, True))
+                self._variable_increment /= self.VARIABLE_DECAY
+                self._clause_increment /= self.CLAUSE_DECAY
+                continue
+            if restart_conflicts <= 0:
+                self.restarts += 1
+                restart_conflicts = luby(self.restarts) * self.RESTART_UNIT
+                self._cancel_until(0)
+                self._heap = [(-self._activities[v], v)
+                              for v in range(1, self.count + 1)
+                              if self._values[2 * v] == 0]
+                heapify(self._heap)
+            if len(self._learned) - len(self._trail) >= self._learned_limit:
+                self._reduce()
+            literal = -1
+            # Each assumption is decided at its own level before any other
+            # decision, with an empty level for those that already hold.
+            while len(self._trail_limits) < len(assumptions):
+                assumption = assumptions[len(self._trail_limits)]
+                if self._values[assumption] == 1:
+                    self._trail_limits.append(len(self._trail))
+                elif self._values[assumption] == -1:
+                    return False
+                else:
+                    literal = assumption
+                    break
+            if literal == -1:
+                literal = self._decide()
+            if literal == -1:
+                self.model = [self._values[2 * v] == 1
+                              for v in range(self.count + 1)]
+                return True
+            self.decisions += 1
+            self._trail_limits.append(len(self._trail))
+            self._enqueue(literal, -1)
+
+    def _store(self, literals: List[int], learned: bool) -> int:
+        clause = len(self._starts)
+        self._starts.append(len(self._literals))
+        self._sizes.append(len(literals))
+        self._clause_activities.append(0.0)
+        self._literals += literals
+        self._watches[literals[0]].append(clause)
+        self._watches[literals[1]].append(clause)
+        if learned:
+            self._learned.append(clause)
+        return clause
+
+    def _enqueue(self, literal: int, reason: int) -> None:
+        values = self._values
+        values[literal] = 1
+        values[literal ^ 1] = -1
+        self._levels[literal >> 1] = len(self._trail_limits)
+        self._reasons[literal >> 1] = reason
+        self._trail.append(literal)
+        self.propagations += 1
+
+    def _propagate(self) -> int:
+        values, literals = self._values, self._literals
+        starts, sizes, watches = self._starts, self._sizes, self._watches
+        trail = self._trail
+        while self._head < len(trail):
+            false_literal = trail[self._head] ^ 1
+            self._head += 1
+            watching = watches[false_literal]
+            kept = 0
+            index = 0
+            while index < len(watching):
+                clause = watching[index]
+                index += 1
+                start = starts[clause]
+                first = literals[start]
+                if first == false_literal:
+                    first = literals[start + 1]
+                    literals[start] = first
+                    literals[start + 1] = false_literal
+                if values[first] == 1:
+                    watching[kept] = clause
+                    kept += 1
+                    continue
+                for position in range(start + 2, start + sizes[clause]):
+                    other = literals[position]
+                    if values[other] != -1:
+                        literals[start + 1] = other
+                        literals[position] = false_literal
+                        watches[other].append(clause)
+                        break
+                else:
+                    watching[kept] = clause
+                    kept += 1
+                    if values[first] == -1:
+                        while index < len(watching):
+                            watching[kept] = watching[index]
+                            kept += 1
+                            index += 1
+                        del watching[kept:]
+                        return clause
+                    self._enqueue(first, clause)
+            del watching[kept:]
+        return -1
+
+    def _analyze(self, conflict: int) -> Tuple[List[int], int]:
+        literals, starts, sizes = self._literals, self._starts, self._sizes
+        levels, seen, trail = self._levels, self._seen, self._trail
+        level = len(self._trail_limits)
+        learned = [-1]
+        pending = 0
+        literal = -1
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            self._bump_clause(clause)
+            start = starts[clause]
+            skip = 0 if literal == -1 else 1
+            for position in range(start + skip, start + sizes[clause]):
+                other = literals[position]
+                variable = other >> 1
+                if not seen[variable] and levels[variable] > 0:
+                    seen[variable] = True
+                    self._bump_variable(variable)
+                    if levels[variable] == level:
+                        pending += 1
+                    else:
+                        learned.append(other)
+            while not seen[trail[index] >> 1]:
+                index -= 1
+            literal = trail[index]
+            index -= 1
+            clause = self._reasons[literal >> 1]
+            seen[literal >> 1] = False
+            pending -= 1
+            if pending == 0:
+                break
+        learned[0] = literal ^ 1
+        for other in learned[1:]:
+            seen[other >> 1] = False
+        back = 0
+        if len(learned) > 1:
+            deepest = max(range(1, len(learned)),
+                          key=lambda position: levels[learned[position] >> 1])
+            learned[1], learned[deepest] = learned[deepest], learned[1]
+            back = levels[learned[1] >> 1]
+        return learned, back
+
+    def _bump_variable(self, variable: int) -> None:
+        self._activities[variable] += self._variable_increment
+        if self._activities[variable] > 1e100:
+            self._activities = [activity * 1e-100
+                                for activity in self._activities]
+            self._variable_increment *= 1e-100
+            self._heap = [(-self._activities[v], v)
+                          for v in range(1, self.count + 1)
+                          if self._values[2 * v] == 0]
+            heapify(self._heap)
+        heappush(self._heap, (-self._activities[variable], variable))
+
+    def _bump_clause(self, clause: int) -> None:
+        self._clause_activities[clause] += self._clause_increment
+        if self._clause_activities[clause] > 1e20:
+            self._clause_activities = [activity * 1e-20 for activity in
+                                       self._clause_activities]
+            self._clause_increment *= 1e-20
+
+    def _decide(self) -> int:
+        while len(self._heap) > 0:
+            variable = heappop(self._heap)[1]
+            if self._values[2 * variable] == 0:
+                return 2 * variable + (0 if self._phases[variable] else 1)
+        return -1
+
+    def _cancel_until(self, level: int) -> None:
+        if len(self._trail_limits) <= level:
+            return
+        values, phases = self._values, self._phases
+        length = self._trail_limits[level]
+        for literal in self._trail[length:]:
+            values[literal] = values[literal ^ 1] = 0
+            phases[literal >> 1] = literal & 1 == 0
+            heappush(self._heap, (-self._activities[literal >> 1],
+                                  literal >> 1))
+        del self._trail[length:]
+        del self._trail_limits[level:]
+        self._head = length
+
+    def _reduce(self) -> None:
+        locked = {self._reasons[literal >> 1] for literal in self._trail}
+        candidates = [clause for clause in self._learned
+                      if self._sizes[clause] > 2 and clause not in locked]
+        candidates.sort(key=lambda clause: self._clause_activities[clause])
+        for clause in candidates[:len(candidates) // 2]:
+            self._sizes[clause] = 0
+            self.deleted += 1
+        self._learned = [clause for clause in self._learned
+                         if self._sizes[clause] > 0]
+        self._learned_limit *= self.LEARNED_GROWTH
+        for watching in self._watches:
+            watching[:] = [clause for clause in watching
+                           if self._sizes[clause] > 0]
+        literals = []
+        for clause in range(len(self._starts)):
+            start = self._starts[clause]
+            self._starts[clause] = len(literals)
+            literals += self._literals[start:start + self._sizes[clause]]
+        self._literals = literals
+
+# The statistics of the solver of the last search by `cdcl_model`, as returned
+# by `CDCLSolver.statistics`, which the search updates in place, so that they
+# can be read after checks that run it, such as those of the ``'cdcl'`` engine
+# of `~semantics.is_satisfiable` and its relatives.
+CDCL_STATISTICS = {}
+
+def cdcl_model(formula: Formula) -> Optional[Dict[str, bool]]:
+    """Searches for a model of the given formula via `CDCLSolver`, recording
+    the statistics of the search in `CDCL_STATISTICS`.
+
+    Parameters:
+        formula: formula to find a model for.
+
+    Returns:
+        A model over the variables of the given formula in which it holds, or
+        ``None`` if the formula is unsatisfiable.
+    """
+    clauses, numbers = to_cnf(formula)
+    count = max([abs(literal) for clause in clauses for literal in clause] +
+                [len(numbers)])
+    solver = CDCLSolver(clauses, count)
+    satisfiable = solver.solve()
+    CDCL_STATISTICS.clear()
+    CDCL_STATISTICS.update(solver.statistics())
+    if not satisfiable:
+        return None
+    return {variable: solver.model[number]
+            for variable, number in sorted(numbers.items())}
+
+class SolverSession:
+    """An incremental satisfiability-checking session over formulae. Formulae
+    are added once, and their conjunction can then be checked repeatedly,
+    under temporary assumptions or within nested scopes, while the clauses
+    learned by the underlying solver are kept between checks.
+
+    Every distinct subformula is converted to clause form only once per
+    session, so formulae that share subformulae with those already added or
+    checked are cheap to add or check.
+
+    Attributes:
+        solver (`CDCLSolver`): the underlying solver.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty `SolverSession`."""
+        self.solver = CDCLSolver()
+        self._numbers = {}
+        self._gates = {}
+        self._true = 0
+        self._scopes = []
+
+    def literal(self, formula: Formula) -> int:
+        """Converts the given formula to clause form within the session.
+
+        Parameters:
+            formula: formula to convert.
+
+        Returns:
+            The solver literal whose value equals that of the given formula in
+            every model of the clauses of the session.
+        """
+        literals = []
+        for root, first, second in formula_nodes(formula):
+            if is_variable(root):
+                if root not in self._numbers:
+                    self._numbers[root] = self.solver.new_variable()
+                literals.append(self._numbers[root])
+            elif is_constant(root):
+                if self._true == 0:
+                    self._true = self.solver.new_variable()
+                    self.solver.add_clause((self._true,))
+                literals.append(self._true if root == 'T' else -self._true)
+            elif is_unary(root):
+                literals.append(-literals[first])
+            else:
+                gate, negated = GATES[root]
+                a, b = literals[first], literals[second]
+                if gate != '->' and a > b:
+                    a, b = b, a
+                if (gate, a, b) not in self._gates:
+                    x = self.solver.new_variable()
+                    for clause in gate_clauses(gate, x, a, b):
+                        self.solver.add_clause(clause)
+                    self._gates[(gate, a, b)] = x
+                x = self._gates[(gate, a, b)]
+                literals.append(-x if negated else x)
+        return literals[-1]
+
+    def add(self, formula: Formula) -> bool:
+        """Adds the given formula to the formulae of the current scope.
+
+        Parameters:
+            formula: formula to add.
+
+        Returns:
+            ``False`` if the formulae of the session are now known to be
+            unsatisfiable regardless of scopes, ``True`` otherwise.
+        """
+        literal = self.literal(formula)
+        if len(self._scopes) == 0:
+            return self.solver.add_clause((literal,))
+        return self.solver.add_clause((-self._scopes[-1], literal))
+
+    def push(self) -> None:
+        """Opens a new scope, whose formulae are discarded by the matching call
+        to `pop`."""
+        activation = self.solver.new_variable()
+        if len(self._scopes) > 0:
+            self.solver.add_clause((-activation, self._scopes[-1]))
+        self._scopes.append(activation)
+
+    def pop(self) -> None:
+        """Closes the innermost scope, discarding the formulae added in it."""
+        assert len(self._scopes) > 0
+        self.solver.add_clause((-self._scopes.pop(),))
+
+    def check(self, assumptions: Iterable[Formula] = ()) -> bool:
+        """Checks whether the formulae of the open scopes are satisfiable,
+        together with the given assumptions.
+
+        Parameters:
+            assumptions: formulae to assume only for this check.
+
+        Returns:
+            ``True`` if the formulae and assumptions are satisfiable, in which
+            case `model` returns a model of them, ``False`` otherwise.
+        """
+        return self._solve([self.literal(formula) for formula in assumptions])
+
+    def entails(self, formula: Formula) -> bool:
+        """Checks whether the given formula holds in every model of the
+        formulae of the open scopes.
+
+        Parameters:
+            formula: formula to check.
+
+        Returns:
+            ``True`` if the given formula is entailed, ``False`` otherwise, in
+            which case `model` returns a model in which it does not hold.
+        """
+        return not self._solve([-self.literal(formula)])
+
+    def model(self) -> Dict[str, bool]:
+        """Reads the model found by the last successful check.
+
+        Returns:
+            The values, in that model, of all variables of the formulae added
+            or checked so far in the session.
+        """
+        return {variable: self.solver.model[number]
+                for variable, number in sorted(self._numbers.items())}
+
+    def _solve(self, literals: List[int]) -> bool:
+        return self.solver.solve(self._scopes[-1:] + literals)
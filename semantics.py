@@ -5,10 +5,28 @@
 
 """Semantic analysis of propositional-logic constructs."""
 
-from typing import AbstractSet, Iterable, Iterator, List, Mapping
+from collections import OrderedDict
+from functools import lru_cache
+from io import BufferedIOBase, RawIOBase
+from itertools import product
+from multiprocessing import cpu_count, get_context
+from multiprocessing.pool import Pool
+from multiprocessing.synchronize import Event
+from random import Random
+import sys
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Iterator, \
+                   List, Mapping, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 from syntax import *
 from proofs import *
+from sat import *
+from bdd import *
+from synthesis import *
 
 Model = Mapping[str, bool]
 
@@ -22,6 +40,8 @@ def is_model(model: Model) -> bool:
         ``True`` if the given dictionary is a model over some set of variables,
         ``False`` otherwise.
     """
+    if isinstance(model, BitModel):
+        return True
     for key in model:
         if not (is_variable(key) and type(model[key]) is bool):
             return False
@@ -39,6 +59,138 @@ def variables(model: Model) -> AbstractSet[str]:
     assert is_model(model)
     return model.keys()
 
+class BitModel(Mapping[str, bool]):
+    """An immutable model over a fixed sequence of variables, whose truth
+    values are packed into the bits of a single integer.
+
+    Attributes:
+        variables (`~typing.Tuple`\\[`str`, ...]): the variables over which the
+            model is defined, in order.
+        bits (`int`): the truth values of the variables, where the value of
+            the last variable is the least significant bit. The models returned
+            by `all_models` over the variables are thus ordered by their bits.
+        shifts (`~typing.Mapping`\\[`str`, `int`]): the bit position of each
+            variable, shared between all models over the same variables.
+    """
+    __slots__ = ('variables', 'bits', 'shifts')
+    variables: Tuple[str, ...]
+    bits: int
+    shifts: Mapping[str, int]
+
+    def __init__(self, variables: Tuple[str, ...], bits: int,
+                 shifts: Optional[Mapping[str, int]] = None) -> None:
+        """Initializes a `BitModel` from its variables and packed values.
+
+        Parameters:
+            variables: the variables for the model.
+            bits: the packed truth values for the model.
+            shifts: the bit position of each variable, as computed for another
+                model over the same variables, or ``None`` to compute it.
+        """
+        if shifts is None:
+            for v in variables:
+                assert is_variable(v)
+            shifts = {v: len(variables) - 1 - index
+                      for index, v in enumerate(variables)}
+            assert len(shifts) == len(variables)
+        assert 0 <= bits < 1 << len(variables)
+        # Bypasses the immutability of `__setattr__`, as `frozen` would, but
+        # without its bookkeeping, which dominates the construction time.
+        object.__setattr__(self, 'variables', variables)
+        object.__setattr__(self, 'bits', bits)
+        object.__setattr__(self, 'shifts', shifts)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise Exception("Cannot assign to field '" + name +
+                        "' of immutable class '" + type(self).__name__ + "'")
+
+    def __delattr__(self, name: str) -> None:
+        raise Exception("Cannot delete field '" + name +
+                        "' of immutable class '" + type(self).__name__ + "'")
+
+    def __getitem__(self, variable: str) -> bool:
+        return (self.bits >> self.shifts[variable]) & 1 == 1
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.variables)
+
+    def __len__(self) -> int:
+        return len(self.variables)
+
+    def __contains__(self, variable: object) -> bool:
+        return variable in self.shifts
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+@lru_cache(maxsize=1024)
+def model_layout(variables: Tuple[str, ...]) -> \
+        Tuple[Tuple[str, ...], Mapping[str, int]]:
+    """Computes the layout shared by all `FrozenModel` objects over the given
+    variables.
+
+    Parameters:
+        variables: the alphabetically sorted variables of the models.
+
+    Returns:
+        The given variables, and the bit position of each of them, as in
+        `BitModel.shifts`. Both are cached, so that all models over the same
+        variables share them.
+    """
+    return variables, {v: len(variables) - 1 - index
+                       for index, v in enumerate(variables)}
+
+class FrozenModel(BitModel):
+    """An immutable and hashable model, stored as the alphabetically sorted
+    tuple of its variables and a bitmask of their truth values.
+
+    The model is validated once, when it is constructed, so `is_model` and
+    `evaluate` accept it without checking its variables and values again. Its
+    hash is computed once as well, so it can be used as a dictionary key or as
+    an argument of a cached function. A frozen model equals every other model
+    (of any type) that assigns the same values to the same variables.
+
+    Examples:
+        >>> model = FrozenModel({'q': False, 'p': True})
+        >>> model
+        {'p': True, 'q': False}
+        >>> model.variables, model.bits
+        (('p', 'q'), 2)
+        >>> {model: 1}[FrozenModel({'p': True, 'q': False})]
+        1
+    """
+    __slots__ = ('_hash',)
+
+    def __init__(self, model: Optional[Model] = None) -> None:
+        """Initializes a `FrozenModel` from the given model.
+
+        Parameters:
+            model: model to freeze, or ``None`` for the empty model.
+        """
+        if model is None:
+            model = {}
+        if not isinstance(model, BitModel):
+            for v in model:
+                assert is_variable(v) and type(model[v]) is bool
+        variables, shifts = model_layout(tuple(sorted(model)))
+        bits = 0
+        for v in variables:
+            bits = bits << 1 | model[v]
+        super().__init__(variables, bits, shifts)
+        object.__setattr__(self, '_hash', hash((variables, bits)))
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, FrozenModel):
+            return self.bits == other.bits and \
+                   self.variables == other.variables
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
 def and_op(righty, lefty, model):
     righty = Formula.parse_prefix(righty[1:])[0]
     righty = evaluate(righty, model)
@@ -81,6 +233,8 @@ def evaluate(formula: Formula, model: Model) -> bool:
     """
     assert is_model(model)
     assert formula.variables().issubset(variables(model))
+    if isinstance(model, BitModel):
+        return compile_formula(formula, model.variables, True)(model.bits)
     # Task 2.1
     formula_string = str(formula)
     # dot1 constant T equivalent to True
@@ -121,31 +275,872 @@ def evaluate(formula: Formula, model: Model) -> bool:
         if righty[0] is '+':
             return xor_op(righty, lefty, model)
 
-def all_models(variables: List[str]) -> Iterable[Model]:
+# Python source templates for each operator, used by `compile_formula`. The
+# operands are substituted for the ``{0}`` and ``{1}`` placeholders.
+COMPILED_OPERATORS = {'~': '(not {0})',
+                      '&': '({0} and {1})',
+                      '|': '({0} or {1})',
+                      '->': '(not {0} or {1})',
+                      '+': '({0} != {1})',
+                      '<->': '({0} == {1})',
+                      '-&': '(not ({0} and {1}))',
+                      '-|': '(not ({0} or {1}))'}
+
+# The truth value of each operator as a bitwise Python expression over the
+# truth values of its operands, substituted for the ``{0}`` and ``{1}``
+# placeholders (unary operators ignore the second), and the value of truth,
+# substituted for the ``{ones}`` placeholder: ``True`` for single truth
+# values and for NumPy arrays of them, or the integer whose bits are set in
+# all models for packed truth tables. Unlike `COMPILED_OPERATORS`, it
+# evaluates both operands, so it is used by the evaluators that keep the
+# values of all nodes anyway, such as `packed_node_bits` and
+# `truth_values_batch`, through the `OPERATOR_FUNCTIONS` compiled from it.
+OPERATOR_EXPRESSIONS = {'~': '({ones} ^ {0})',
+                        '&': '({0} & {1})',
+                        '|': '({0} | {1})',
+                        '->': '(({ones} ^ {0}) | {1})',
+                        '+': '({0} ^ {1})',
+                        '<->': '({ones} ^ {0} ^ {1})',
+                        '-&': '({ones} ^ ({0} & {1}))',
+                        '-|': '({ones} ^ ({0} | {1}))'}
+
+# The function of the truth values of the two operands of each operator (the
+# second of which unary operators ignore) and of the value of truth, which
+# calculates the truth value of the operator by `OPERATOR_EXPRESSIONS`.
+OPERATOR_FUNCTIONS = {
+    operator: eval('lambda a, b, ones: ' + expression.format('a', 'b',
+                                                             ones='ones'))
+    for operator, expression in OPERATOR_EXPRESSIONS.items()}
+
+# Formulae deeper than this are compiled into closures rather than into Python
+# source, since the Python parser limits the nesting depth of expressions.
+MAX_COMPILED_SOURCE_DEPTH = 50
+
+def formula_depth(formula: Formula) -> int:
+    """Computes the depth of the tree of the given formula.
+
+    Parameters:
+        formula: formula to compute the depth of.
+
+    Returns:
+        The number of nodes on the longest path from the root of the given
+        formula to one of its leaves.
+    """
+    if is_unary(formula.root):
+        return 1 + formula_depth(formula.first)
+    if is_binary(formula.root):
+        return 1 + max(formula_depth(formula.first),
+                       formula_depth(formula.second))
+    return 1
+
+def formula_source(formula: Formula) -> str:
+    """Renders the given formula as a short-circuiting Python expression, in
+    which every variable appears as a local name of the same name.
+
+    Parameters:
+        formula: formula to render.
+
+    Returns:
+        A Python expression computing the truth value of the given formula.
+
+    Examples:
+        >>> formula_source(Formula.parse('(p->~q)'))
+        '(not p or (not q))'
+    """
+    if is_constant(formula.root):
+        return 'True' if formula.root == 'T' else 'False'
+    if is_variable(formula.root):
+        return formula.root
+    if is_unary(formula.root):
+        return COMPILED_OPERATORS[formula.root].format(
+            formula_source(formula.first))
+    return COMPILED_OPERATORS[formula.root].format(
+        formula_source(formula.first), formula_source(formula.second))
+
+def formula_closure(formula: Formula) -> Callable[[Mapping[str, bool]], bool]:
+    """Compiles the given formula into nested closures over a model, which
+    short-circuit like `formula_source`: an operand whose truth value cannot
+    change that of its parent is not evaluated, so its variables are not even
+    looked up in the model.
+
+    Parameters:
+        formula: formula to compile.
+
+    Returns:
+        A function that, given a model over (possibly a superset of) the
+        variables of the given formula, returns the truth value of the formula
+        in it.
+    """
+    root = formula.root
+    if is_constant(root):
+        value = root == 'T'
+        return lambda model: value
+    if is_variable(root):
+        return lambda model: model[root]
+    first = formula_closure(formula.first)
+    if is_unary(root):
+        return lambda model: not first(model)
+    second = formula_closure(formula.second)
+    if root == '&':
+        return lambda model: first(model) and second(model)
+    if root == '|':
+        return lambda model: first(model) or second(model)
+    if root == '->':
+        return lambda model: not first(model) or second(model)
+    if root == '+':
+        return lambda model: first(model) != second(model)
+    if root == '<->':
+        return lambda model: first(model) == second(model)
+    if root == '-&':
+        return lambda model: not (first(model) and second(model))
+    assert root == '-|'
+    return lambda model: not (first(model) or second(model))
+
+@lru_cache(maxsize=1024)
+def compile_formula(formula: Formula,
+                    variables: Optional[Tuple[str, ...]] = None,
+                    packed: bool = False) -> Callable[..., bool]:
+    """Compiles the given formula into a Python function that calculates its
+    truth value. Compiled functions are cached, so compiling the same formula
+    again is cheap. Evaluation short-circuits: the second operand of a
+    conjunction, disjunction or implication is only evaluated if the first
+    does not already determine the truth value of the operator.
+
+    Parameters:
+        formula: formula to compile.
+        variables: if given, the variables (a superset of those of the given
+            formula) in the order in which the compiled function expects their
+            truth values.
+        packed: whether the compiled function expects the truth values of the
+            given variables packed into an integer, as in `BitModel.bits`,
+            rather than as a tuple.
+
+    Returns:
+        If `variables` is ``None``, a function that given a model over
+        (possibly a superset of) the variables of the given formula, returns
+        the truth value of the formula in that model. Otherwise, a function
+        that given a tuple of truth values for the given variables, in their
+        given order, returns the truth value of the formula in the model that
+        assigns these values to these variables.
+
+    Examples:
+        >>> compile_formula(Formula.parse('(p->q)'))({'p': True, 'q': False})
+        False
+        >>> compile_formula(Formula.parse('(p->q)'), ('q', 'p'))((True, False))
+        True
+    """
+    if variables is not None:
+        for v in variables:
+            assert is_variable(v)
+        assert formula.variables().issubset(variables)
+    else:
+        assert not packed
+    if formula_depth(formula) > MAX_COMPILED_SOURCE_DEPTH:
+        evaluator = formula_closure(formula)
+        if variables is None:
+            return evaluator
+        if packed:
+            shifts = BitModel(variables, 0).shifts
+            return lambda bits: evaluator(BitModel(variables, bits, shifts))
+        return lambda values: evaluator(dict(zip(variables, values)))
+    names = sorted(formula.variables())
+    if variables is None:
+        header = 'def evaluator(model):\n'
+        header += ''.join('    ' + name + ' = model[' + repr(name) + ']\n'
+                          for name in names)
+    elif packed:
+        header = 'def evaluator(bits):\n'
+        header += ''.join('    ' + name + ' = (bits >> ' +
+                          str(len(variables) - 1 - variables.index(name)) +
+                          ') & 1 == 1\n' for name in names)
+    else:
+        header = 'def evaluator(values):\n'
+        if len(variables) > 0:
+            header += '    ' + ', '.join(variables) + ', = values\n'
+    namespace = {}
+    exec(header + '    return ' + formula_source(formula) + '\n', namespace)
+    return namespace['evaluator']
+
+class ModelCursor:
+    """A resumable position in the enumeration of all models over a sequence
+    of variables, as returned by `all_models`.
+
+    Iterating over a cursor enumerates the models from its position up to its
+    stop index, advancing the position past each model as it is returned, so
+    that an interrupted enumeration can be resumed from the `state` of its
+    cursor, even in another process or on another machine.
+
+    Attributes:
+        variables (`~typing.Tuple`\\[`str`, ...]): the variables of the models.
+        position (`int`): the index of the next model to enumerate, that is,
+            one past the index of the last model enumerated.
+        stop (`int`): the index one past the last model to enumerate.
+        packed (`bool`): whether the models are returned as `BitModel`
+            objects rather than as dictionaries.
+        gray (`bool`): whether the models are enumerated in reflected Gray-code
+            order rather than in lexicographic order.
+    """
+    variables: Tuple[str, ...]
+    position: int
+    stop: int
+    packed: bool
+    gray: bool
+
+    def __init__(self, variables: Sequence[str], start: int = 0,
+                 stop: Optional[int] = None, packed: bool = False,
+                 gray: bool = False) -> None:
+        """Initializes a `ModelCursor` over a range of model indices.
+
+        Parameters:
+            variables: the variables of the models.
+            start: the index of the first model to enumerate.
+            stop: the index one past the last model to enumerate, or ``None``
+                for the number of models over the given variables.
+            packed: whether to return the models as `BitModel` objects.
+            gray: whether to enumerate the models in Gray-code order.
+        """
+        for v in variables:
+            assert is_variable(v)
+        self.variables = tuple(variables)
+        total = 1 << len(self.variables)
+        self.stop = total if stop is None else stop
+        assert 0 <= start <= self.stop <= total
+        self.position = start
+        self.packed = packed
+        self.gray = gray
+
+    def __len__(self) -> int:
+        """Counts the models that remain to be enumerated.
+
+        Returns:
+            The number of models from the position of the current cursor to its
+            stop index.
+        """
+        return self.stop - self.position
+
+    def __iter__(self) -> Iterator[Model]:
+        """Enumerates the remaining models, advancing the position of the
+        current cursor.
+
+        Returns:
+            An iterator over the models from the position of the current cursor
+            to its stop index.
+        """
+        variables = self.variables
+        if self.packed or self.gray:
+            shifts = BitModel(variables, 0).shifts
+            while self.position < self.stop:
+                number = self.position
+                if self.gray:
+                    number ^= number >> 1
+                self.position += 1
+                model = BitModel(variables, number, shifts)
+                yield model if self.packed else dict(model)
+            return
+        # Enumerates blocks of models that share the values of all but the
+        # last few variables, whose values are taken from a shared list.
+        low_count = min(len(variables), 8)
+        lows = list(product((False, True), repeat=low_count))
+        while self.position < self.stop:
+            high = self.position >> low_count
+            highs = tuple(high >> (len(variables) - low_count - 1 - index) & 1
+                          == 1 for index in range(len(variables) - low_count))
+            end = min(self.stop, (high + 1) << low_count)
+            for low in lows[self.position - (high << low_count):
+                            end - (high << low_count)]:
+                self.position += 1
+                yield dict(zip(variables, highs + low))
+
+    def shard(self, index: int, count: int) -> 'ModelCursor':
+        """Splits the remaining models into contiguous shards of nearly equal
+        sizes.
+
+        Parameters:
+            index: the index of the shard to return, from ``0`` to
+                ``count - 1``.
+            count: the number of shards.
+
+        Returns:
+            A new cursor over the given shard of the remaining models of the
+            current cursor, with the same variables and ordering.
+
+        Examples:
+            >>> [len(all_models(['p', 'q', 'r']).shard(index, 3))
+            ...  for index in range(3)]
+            [2, 3, 3]
+        """
+        assert 0 <= index < count
+        size = len(self)
+        return ModelCursor(self.variables,
+                           self.position + size * index // count,
+                           self.position + size * (index + 1) // count,
+                           self.packed, self.gray)
+
+    def state(self) -> Dict[str, Any]:
+        """Serializes the current cursor.
+
+        Returns:
+            A dictionary of JSON-serializable values from which `from_state`
+            reconstructs a cursor at the current position.
+        """
+        return {'variables': list(self.variables), 'position': self.position,
+                'stop': self.stop, 'packed': self.packed, 'gray': self.gray}
+
+    @staticmethod
+    def from_state(state: Mapping[str, Any]) -> 'ModelCursor':
+        """Deserializes a cursor.
+
+        Parameters:
+            state: dictionary returned by `state`.
+
+        Returns:
+            A cursor at the position and with the parameters of the cursor
+            whose state was given.
+        """
+        return ModelCursor(state['variables'], state['position'],
+                           state['stop'], state['packed'], state['gray'])
+
+def all_models(variables: List[str], packed: bool = False,
+               gray: bool = False, start: int = 0,
+               stop: Optional[int] = None) -> ModelCursor:
     """Calculates all possible models over the given variables.
 
     Parameters:
         variables: list of variables over which to calculate the models.
+        packed: whether to return the models as `BitModel` objects, which
+            share their variables and hold their truth values in a single
+            integer, rather than as dictionaries.
+        gray: whether to order the models in reflected Gray-code order, where
+            consecutive models differ in the value of a single variable.
+        start: the index of the first model to return.
+        stop: the index one past the last model to return, or ``None`` to
+            return all models from the first one onwards.
 
     Returns:
-        An iterable over all possible models over the given variables. The order
-        of the models is lexicographic according to the order of the given
-        variables, where False precedes True.
+        A `ModelCursor` over all possible models over the given variables, or
+        over the given range of them, which may be sharded, serialized and
+        resumed. Unless `gray` is set, the order of the models is lexicographic
+        according to the order of the given variables, where False precedes
+        True.
 
     Examples:
         >>> list(all_models(['p', 'q']))
         [{'p': False, 'q': False}, {'p': False, 'q': True}, {'p': True, 'q': False}, {'p': True, 'q': True}]
+        >>> list(all_models(['p', 'q'], start=1, stop=3))
+        [{'p': False, 'q': True}, {'p': True, 'q': False}]
     """
-    for v in variables:
-        assert is_variable(v)
     # Task 2.2
-    size = len(variables)
-    for number in range(pow(2, size)):
-        binary_rep = f'{number:>b}'.zfill(size)
-        row = {}
-        for index, var in enumerate(variables):
-            row[var] = bool(int(binary_rep[index]))
-        yield(row)
+    return ModelCursor(variables, start, stop, packed, gray)
+
+# Formulae over more variables than this are not checked via bit-parallel
+# truth tables, since those take 2**n bits per subformula.
+MAX_BITWISE_VARIABLES = 24
+
+# Formulae over more variables than `MAX_BITWISE_VARIABLES` but not more than
+# this are decided via binary decision diagrams when no engine is requested,
+# since over so few variables the diagrams of most formulae stay small, and
+# over more variables by the CDCL solver.
+MAX_BDD_VARIABLES = 40
+
+def variable_bits(index: int, count: int) -> int:
+    """Computes the packed truth table of a single variable.
+
+    Parameters:
+        index: the position of the variable among the variables of the table.
+        count: the number of variables of the table.
+
+    Returns:
+        A ``2**count``-bit integer whose `i`-th bit is the value of the
+        variable in the `i`-th model returned by `all_models` over the
+        variables of the table.
+
+    Examples:
+        >>> bin(variable_bits(0, 2)), bin(variable_bits(1, 2))
+        ('0b1100', '0b1010')
+    """
+    assert 0 <= index < count
+    block = 1 << (count - 1 - index)
+    bits = ((1 << block) - 1) << block
+    period = 2 * block
+    while period < (1 << count):
+        bits |= bits << period
+        period *= 2
+    return bits
+
+def truth_table_bits(formula: Formula,
+                     variables: Optional[Sequence[str]] = None) -> int:
+    """Calculates the truth values of the given formula in all models at once,
+    by bitwise operations over packed truth tables.
+
+    Parameters:
+        formula: formula to calculate the truth values of.
+        variables: the variables (a superset of those of the given formula)
+            over which to calculate the truth table, in their order for
+            `all_models`. Defaults to the variables of the formula, sorted
+            alphabetically.
+
+    Returns:
+        A ``2**n``-bit integer, where `n` is the number of given variables,
+        whose `i`-th bit is the truth value of the given formula in the `i`-th
+        model returned by `all_models`\\ ``(``\\ `variables`\\ ``)``.
+
+    Examples:
+        >>> bin(truth_table_bits(Formula.parse('(p-&q)')))
+        '0b111'
+    """
+    if variables is None:
+        variables = sorted(formula.variables())
+    assert formula.variables().issubset(variables)
+    count = len(variables)
+    return packed_bits(formula, {variable: variable_bits(index, count)
+                                 for index, variable in enumerate(variables)},
+                       (1 << (1 << count)) - 1)
+
+def packed_bits(formula: Formula, leaves: Mapping[str, int], ones: int) -> int:
+    """Calculates the truth values of the given formula in many models at once,
+    by bitwise operations over the packed values of its variables.
+
+    Parameters:
+        formula: formula to calculate the truth values of.
+        leaves: mapping from each variable of the given formula to an integer
+            whose `i`-th bit is the value of the variable in the `i`-th model.
+        ones: the integer whose bits are set in all the models.
+
+    Returns:
+        An integer whose `i`-th bit is the truth value of the given formula in
+        the `i`-th model.
+
+    Examples:
+        >>> bin(packed_bits(Formula.parse('(p-&q)'), {'p': 0b10, 'q': 0b11},
+        ...                 0b11))
+        '0b1'
+    """
+    return packed_node_bits(formula_nodes(formula), leaves, ones)
+
+def packed_node_bits(nodes: Sequence[FormulaNode], leaves: Mapping[str, int],
+                     ones: int) -> int:
+    """Calculates the truth values of a formula in many models at once, by
+    bitwise operations over the packed values of its variables.
+
+    Parameters:
+        nodes: the nodes of the formula, as returned by
+            `~syntax.formula_nodes`.
+        leaves: mapping from each variable of the formula to an integer whose
+            `i`-th bit is the value of the variable in the `i`-th model.
+        ones: the integer whose bits are set in all the models.
+
+    Returns:
+        An integer whose `i`-th bit is the truth value of the formula in the
+        `i`-th model.
+    """
+    leaves = dict(leaves, T=ones, F=0)
+    # Each intermediate table is freed right after its last use, so that
+    # only the tables of the nodes still awaiting a parent are kept alive.
+    last_use = {}
+    for position, (root, first, second) in enumerate(nodes):
+        last_use[first] = last_use[second] = position
+    values = []
+    for position, (root, first, second) in enumerate(nodes):
+        if is_variable(root) or is_constant(root):
+            value = leaves[root]
+        else:
+            value = OPERATOR_FUNCTIONS[root](
+                values[first], values[second] if second >= 0 else None, ones)
+        values.append(value)
+        for operand in (first, second):
+            if operand >= 0 and last_use[operand] == position:
+                values[operand] = None
+    return values[-1]
+
+class TruthTableCache:
+    """A least-recently-used cache of the packed truth tables computed by
+    `truth_table_bits`, bounded by their total size in bytes. The tables are
+    keyed by the string representations of their formulae, which are counted
+    in this size, rather than by the formulae themselves, so that the cache
+    keeps no formula alive.
+
+    Attributes:
+        budget (`int`): the maximal total size, in bytes, of the cached truth
+            tables and their keys.
+        size (`int`): the current total size, in bytes, of the cached truth
+            tables and their keys.
+        hits (`int`): the number of lookups answered from the cache.
+        misses (`int`): the number of lookups that computed their truth table.
+        evictions (`int`): the number of truth tables evicted so far.
+    """
+
+    def __init__(self, budget: int = 64 << 20) -> None:
+        """Initializes an empty `TruthTableCache`.
+
+        Parameters:
+            budget: the maximal total size, in bytes, of the cached tables.
+        """
+        self.budget = budget
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+        self._tables = OrderedDict()
+
+    def __len__(self) -> int:
+        """Counts the cached truth tables.
+
+        Returns:
+            The number of truth tables currently cached.
+        """
+        return len(self._tables)
+
+    def lookup(self, formula: Formula, variables: Sequence[str]) -> int:
+        """Finds the packed truth table of the given formula, computing and
+        caching it if it is not cached.
+
+        Parameters:
+            formula: formula to find the truth table of.
+            variables: the variables over which to find the truth table, as
+                for `truth_table_bits`.
+
+        Returns:
+            The packed truth table of the given formula over the given
+            variables, as returned by `truth_table_bits`.
+        """
+        key = (str(formula), tuple(variables))
+        if key in self._tables:
+            self.hits += 1
+            self._tables.move_to_end(key)
+            return self._tables[key][0]
+        self.misses += 1
+        table = truth_table_bits(formula, variables)
+        size = sys.getsizeof(table) + sys.getsizeof(key[0])
+        if size <= self.budget:
+            self._tables[key] = table, size
+            self.size += size
+            self._evict()
+        return table
+
+    def resize(self, budget: int) -> None:
+        """Changes the budget of the cache, evicting tables as needed.
+
+        Parameters:
+            budget: the new maximal total size, in bytes, of the cached tables.
+        """
+        self.budget = budget
+        self._evict()
+
+    def clear(self) -> None:
+        """Evicts all cached truth tables and resets the statistics."""
+        self._tables.clear()
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def statistics(self) -> Dict[str, float]:
+        """Summarizes the use of the cache.
+
+        Returns:
+            A mapping from the names of the counters of the cache to their
+            values, including the fraction of lookups answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        return {'tables': len(self._tables), 'size': self.size,
+                'budget': self.budget, 'hits': self.hits,
+                'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups > 0 else 0.0}
+
+    def _evict(self) -> None:
+        while self.size > self.budget:
+            key, (table, size) = self._tables.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+
+# The process-wide cache of truth tables consulted by the semantic checks.
+TRUTH_TABLE_CACHE = TruthTableCache()
+
+class SimulationPrefilter:
+    """A fast-fail stage for the semantic checks, which evaluates formulae in
+    a sample of random models at once, by bitwise operations over packed
+    random values of their variables, before an exhaustive engine is run.
+
+    Attributes:
+        samples (`int`): the number of random models evaluated per check, or
+            ``0`` to disable the prefilter.
+        seed (`~typing.Optional`\\[`int`]): the seed from which the random
+            models of every check are drawn, so that checks are reproducible,
+            or ``None`` to draw different random models in every check.
+        runs (`int`): the number of checks made so far.
+        hits (`int`): the number of checks that found a model.
+        models (`int`): the total number of random models evaluated so far.
+    """
+
+    def __init__(self, samples: int = 4096, seed: Optional[int] = 0) -> \
+            None:
+        """Initializes a `SimulationPrefilter`.
+
+        Parameters:
+            samples: the number of random models evaluated per check.
+            seed: the seed of the random models, or ``None`` for none.
+        """
+        assert samples >= 0
+        self.samples = samples
+        self.seed = seed
+        self.runs = self.hits = self.models = 0
+
+    def applies(self, variable_count: int) -> bool:
+        """Checks if the prefilter is worth running before an exhaustive check.
+
+        Parameters:
+            variable_count: the number of variables of the checked formulae.
+
+        Returns:
+            ``True`` if the prefilter is enabled and there are more models
+            over the given number of variables than the prefilter samples,
+            ``False`` otherwise.
+        """
+        return self.samples > 0 and (1 << variable_count) > self.samples
+
+    def satisfying_model(self, formula: Formula) -> Optional[Model]:
+        """Searches for a model in which the given formula holds among random
+        models over its variables.
+
+        Parameters:
+            formula: formula to find a model for.
+
+        Returns:
+            A random model over the variables of the given formula in which it
+            holds, or ``None`` if it holds in none of the sampled models.
+
+        Examples:
+            >>> SimulationPrefilter(64, 1).satisfying_model(
+            ...     Formula.parse('(p&(q&r))'))
+            {'p': True, 'q': True, 'r': True}
+        """
+        names = sorted(formula.variables())
+        generator = Random(self.seed)
+        ones = (1 << self.samples) - 1
+        leaves = {name: generator.getrandbits(self.samples) for name in names}
+        bits = packed_bits(formula, leaves, ones)
+        self.runs += 1
+        self.models += self.samples
+        if bits == 0:
+            return None
+        self.hits += 1
+        index = (bits & -bits).bit_length() - 1
+        return {name: leaves[name] >> index & 1 == 1 for name in names}
+
+    def reset(self) -> None:
+        """Resets the statistics of the prefilter."""
+        self.runs = self.hits = self.models = 0
+
+    def statistics(self) -> Dict[str, float]:
+        """Summarizes the use of the prefilter.
+
+        Returns:
+            A mapping from the names of the counters of the prefilter to their
+            values, including the fraction of checks that found a model.
+        """
+        return {'samples': self.samples, 'runs': self.runs,
+                'hits': self.hits, 'models': self.models,
+                'hit_rate': self.hits / self.runs if self.runs > 0 else 0.0}
+
+# The process-wide prefilter run by `is_tautology` and `distinguishing_model`
+# before the engine that they choose automatically, but not before an engine
+# that the caller names. Set its `samples` to ``0`` to disable it.
+SIMULATION_PREFILTER = SimulationPrefilter()
+
+# The ways in which `ParallelEvaluator.truth_table` may combine the truth
+# values of a formula in all models: whether it holds in all of them, whether
+# it holds in any of them, or the number of them in which it holds.
+PARALLEL_COMBINERS = ('all', 'any', 'count')
+
+# The largest number of variables left free in each cube of models that a
+# worker process evaluates at once by a packed truth table.
+PARALLEL_CUBE_VARIABLES = 20
+
+# The number of cubes into which `ParallelEvaluator.truth_table` aims to split
+# the models per worker process, so that the work stays balanced and a
+# decided cube cancels the remaining work early.
+PARALLEL_CUBES_PER_PROCESS = 8
+
+def cube_truth_table(nodes: Sequence[FormulaNode], variables: Sequence[str],
+                     prefix: int, cube: int) -> int:
+    """Computes the packed truth table of a formula over a cube of models, by
+    `packed_node_bits` with the fixed variables as constant leaves.
+
+    Parameters:
+        nodes: the nodes of the formula, as returned by
+            `~syntax.formula_nodes`.
+        variables: the variables of the formula, in their order for
+            `all_models`.
+        prefix: the number of first variables whose values are fixed in the
+            cube.
+        cube: the values of the fixed variables, as the index of the model
+            over them in the order of `all_models`.
+
+    Returns:
+        An integer whose `i`-th bit is the truth value of the formula in the
+        `i`-th model of the cube, that is, the model of index ``(cube << m)
+        | i`` in the order of `all_models` over all given variables, where `m`
+        is the number of variables left free in the cube.
+    """
+    count = len(variables) - prefix
+    ones = (1 << (1 << count)) - 1
+    leaves = {}
+    for index, variable in enumerate(variables):
+        if index < prefix:
+            leaves[variable] = ones if cube >> (prefix - 1 - index) & 1 else 0
+        else:
+            leaves[variable] = variable_bits(index - prefix, count)
+    return packed_node_bits(nodes, leaves, ones)
+
+# The event by which the `ParallelEvaluator` that started a worker process
+# cancels the remaining cubes of a decided evaluation, set by
+# `set_cube_cancellation` in each worker process when it starts, and ``None``
+# in all other processes.
+CUBE_CANCELLATION = None
+
+def set_cube_cancellation(cancellation: Event) -> None:
+    """Sets the `CUBE_CANCELLATION` event of a worker process.
+
+    Parameters:
+        cancellation: the event to set.
+    """
+    global CUBE_CANCELLATION
+    CUBE_CANCELLATION = cancellation
+
+def evaluate_cube(task: Tuple[Sequence[FormulaNode], Sequence[str], int, str,
+                              int]) -> Tuple[int, int]:
+    """Combines the truth values of a formula in a cube of models, by
+    `cube_truth_table`.
+
+    Parameters:
+        task: the nodes of the formula, its variables, the number of them
+            fixed in the cube, the combiner from `PARALLEL_COMBINERS`, and the
+            cube, as for `cube_truth_table`.
+
+    Returns:
+        The cube, and for ``'count'``, the number of models of the cube in
+        which the formula holds, or for ``'all'`` or ``'any'``, the index
+        within the cube of the first model in which the formula does not hold,
+        or holds, respectively, or ``-1`` if there is none or if the
+        evaluation has been cancelled.
+    """
+    nodes, variables, prefix, combine, cube = task
+    if CUBE_CANCELLATION is not None and CUBE_CANCELLATION.is_set():
+        return cube, -1
+    bits = cube_truth_table(nodes, variables, prefix, cube)
+    if combine == 'count':
+        return cube, bin(bits).count('1')
+    if combine == 'all':
+        bits ^= (1 << (1 << (len(variables) - prefix))) - 1
+    return cube, (bits & -bits).bit_length() - 1
+
+class ParallelEvaluator:
+    """An exhaustive evaluator of formulae, which splits the models over the
+    variables of each formula into cubes that fix the values of a prefix of
+    the alphabetically sorted variables, and evaluates each cube by a packed
+    truth table in a pool of worker processes.
+
+    The pool, and the event by which it is cancelled, are created by the
+    first evaluation that needs them, and kept for the following ones until
+    `close` is called or the number of processes is changed.
+
+    Attributes:
+        processes (`~typing.Optional`\\[`int`]): the number of worker
+            processes, or ``None`` for the number of processors, which is read
+            by each evaluation. With a single process, the cubes are evaluated
+            in the calling process.
+    """
+
+    def __init__(self, processes: Optional[int] = None) -> None:
+        """Initializes a `ParallelEvaluator`.
+
+        Parameters:
+            processes: the number of worker processes, or ``None`` for the
+                number of processors.
+        """
+        self.processes = processes
+        self._pool = None
+        self._pool_processes = 0
+        self._cancellation = None
+
+    def truth_table(self, formula: Formula, combine: str) -> \
+            Tuple[Union[bool, int], Optional[Model]]:
+        """Combines the truth values of the given formula in all models over
+        its variables.
+
+        Parameters:
+            formula: formula to evaluate.
+            combine: one of `PARALLEL_COMBINERS`.
+
+        Returns:
+            For ``'all'``, whether the formula holds in all models, and if not,
+            a model in which it does not hold. For ``'any'``, whether the
+            formula holds in some model, and if so, such a model. For
+            ``'count'``, the number of models in which the formula holds, and
+            ``None``. As soon as a cube decides ``'all'`` or ``'any'``, the
+            work on all other cubes is cancelled, so the model found is from
+            whichever cube decided first.
+
+        Examples:
+            >>> ParallelEvaluator(2).truth_table(Formula.parse('(p|~q)'),
+            ...                                  'all')
+            (False, {'p': False, 'q': True})
+            >>> ParallelEvaluator(2).truth_table(Formula.parse('(p|~q)'),
+            ...                                  'count')
+            (3, None)
+        """
+        assert combine in PARALLEL_COMBINERS
+        processes = cpu_count() if self.processes is None else self.processes
+        assert processes > 0
+        names = tuple(sorted(formula.variables()))
+        prefix = max(len(names) - PARALLEL_CUBE_VARIABLES,
+                     (processes * PARALLEL_CUBES_PER_PROCESS -
+                      1).bit_length() if processes > 1 else 0)
+        prefix = min(prefix, len(names))
+        count = len(names) - prefix
+        nodes = formula_nodes(formula)
+        tasks = [(nodes, names, prefix, combine, cube)
+                 for cube in range(1 << prefix)]
+        if processes == 1:
+            results = map(evaluate_cube, tasks)
+        else:
+            pool = self._start(processes)
+            self._cancellation.clear()
+            results = pool.imap_unordered(evaluate_cube, tasks)
+        try:
+            if combine == 'count':
+                return sum(result for _, result in results), None
+            for cube, index in results:
+                if index >= 0:
+                    model = dict(BitModel(names, (cube << count) | index))
+                    return combine == 'any', model
+            return combine == 'all', None
+        finally:
+            if processes > 1:
+                # The pool is drained of the cancelled cubes rather than
+                # terminated, so that it stays idle for the next evaluation.
+                self._cancellation.set()
+                for _ in results:
+                    pass
+
+    def close(self) -> None:
+        """Stops the worker processes of the pool, if it has been started."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def _start(self, processes: int) -> Pool:
+        if self._pool is not None and self._pool_processes != processes:
+            self.close()
+        if self._pool is None:
+            if self._cancellation is None:
+                self._cancellation = get_context().Event()
+            self._pool = Pool(processes, set_cube_cancellation,
+                              (self._cancellation,))
+            self._pool_processes = processes
+        return self._pool
+
+# The process-wide evaluator used by the ``'parallel'`` engine of
+# `is_tautology` and its relatives. Set its `processes` to choose the number
+# of worker processes.
+PARALLEL_EVALUATOR = ParallelEvaluator()
 
 def truth_values(formula: Formula, models: Iterable[Model]) -> Iterable[bool]:
     """Calculates the truth value of the given formula in each of the given
@@ -160,11 +1155,75 @@ def truth_values(formula: Formula, models: Iterable[Model]) -> Iterable[bool]:
         each of the given models, in the order of the given models.
     """
     # Task 2.3
+    evaluator = compile_formula(formula)
+    tables = {}
     lst = []
     for model in models:
-        lst.append(evaluate(formula, model))
+        assert is_model(model)
+        if isinstance(model, BitModel) and \
+                len(model.variables) <= MAX_BITWISE_VARIABLES:
+            if model.variables not in tables:
+                tables[model.variables] = \
+                    TRUTH_TABLE_CACHE.lookup(formula, model.variables)
+            lst.append((tables[model.variables] >> model.bits) & 1 == 1)
+        else:
+            lst.append(evaluator(model))
     return lst
 
+# Number of models evaluated at once by `truth_values_batch`.
+BATCH_CHUNK_SIZE = 1 << 16
+
+def truth_values_batch(formula: Formula, models: Any,
+                       variables: Sequence[str],
+                       chunk_size: int = BATCH_CHUNK_SIZE) -> Any:
+    """Calculates the truth value of the given formula in each of the given
+    models, by vectorized NumPy operations over all models at once.
+
+    Parameters:
+        formula: formula to calculate the truth value of.
+        models: two-dimensional boolean NumPy array, each row of which is a
+            model, and each column of which holds the values of a variable.
+        variables: the variables (a superset of those of the given formula)
+            whose values are held in the respective columns of `models`.
+        chunk_size: the maximal number of models to evaluate at once, which
+            bounds the memory used for intermediate results.
+
+    Returns:
+        A one-dimensional boolean NumPy array of the respective truth values of
+        the given formula in each of the given models.
+    """
+    assert numpy is not None, 'truth_values_batch requires NumPy'
+    models = numpy.asarray(models, dtype=bool)
+    assert models.ndim == 2 and models.shape[1] == len(variables)
+    assert formula.variables().issubset(variables)
+    assert chunk_size > 0
+    columns = {variable: index for index, variable in enumerate(variables)}
+    nodes = formula_nodes(formula)
+    last_use = {}
+    for position, (root, first, second) in enumerate(nodes):
+        last_use[first] = last_use[second] = position
+    result = numpy.empty(len(models), dtype=bool)
+    for start in range(0, len(models), chunk_size):
+        chunk = models[start:start + chunk_size]
+        size = len(chunk)
+        values = []
+        for position, (root, first, second) in enumerate(nodes):
+            if is_variable(root):
+                value = chunk[:, columns[root]]
+            elif is_constant(root):
+                value = numpy.full(size, root == 'T')
+            else:
+                value = OPERATOR_FUNCTIONS[root](
+                    values[first], values[second] if second >= 0 else None,
+                    True)
+            values.append(value)
+            # Each intermediate array is freed right after its last use.
+            for operand in (first, second):
+                if operand >= 0 and last_use[operand] == position:
+                    values[operand] = None
+        result[start:start + size] = values[-1]
+    return result
+
 def print_truth_table(formula: Formula) -> None:
     """Prints the truth table of the given formula, with variable-name columns
     sorted alphabetically.
@@ -182,71 +1241,529 @@ def print_truth_table(formula: Formula) -> None:
         | T | T   | F        |
     """
     # Task 2.4
-    names = list(formula.variables())
-    names.sort()
-    models = list(all_models(names))
-    print_this = []
-    for index, model in enumerate(models):
-        evalue = evaluate(formula, model)
-        print_this.append(evalue)
-    for var in names:
-        print("| " + var + " ", end="")
-    print("| " + str(formula) + " |")
-    # top div
-    for var in names:
-        print("|" + len(var)*"-"+"--", end="")
-    print("|" + len(str(formula))*"-"+"--" + "|")
-    for index, model in enumerate(models):
-        for name in names:
-            print("| " + ("T" if model[name] is True else "F")  + len(name)*" " , end="")
-        print("| " + ("T" if print_this[index] is True else "F") + len(str(formula))*" " + "|")
+    write_truth_table(formula, sys.stdout)
+
+# The styles in which `write_truth_table` may write truth tables: the
+# Markdown table of `print_truth_table`, comma-separated values with a header
+# row, or the packed bits of the truth values alone.
+TRUTH_TABLE_STYLES = ('markdown', 'csv', 'packed')
+
+# The number of last variables whose models are written by `write_truth_table`
+# in a single write, so that tables are written in blocks of ``2**10`` rows.
+TRUTH_TABLE_BLOCK_VARIABLES = 10
+
+def write_truth_table(formula: Formula, stream: Any,
+                      style: str = 'markdown') -> None:
+    """Writes the truth table of the given formula to the given stream, with
+    variable-name columns sorted alphabetically, one block of rows at a time.
+
+    The truth values are taken from the packed truth table of the formula
+    where it has at most `MAX_BITWISE_VARIABLES` variables, and are otherwise
+    calculated block by block, so that the models are never all held in
+    memory.
+
+    Parameters:
+        formula: formula to write the truth table of.
+        stream: text or binary stream to write to. Text styles are written
+            to binary streams in ASCII.
+        style: one of `TRUTH_TABLE_STYLES`. The ``'packed'`` style, which
+            requires a binary stream, consists of ``ceil(2**n/8)`` bytes,
+            where `n` is the number of variables of the formula, whose
+            ``i % 8``-th least significant bit of the ``i // 8``-th byte is the
+            truth value of the formula in the `i`-th row.
+
+    Examples:
+        >>> write_truth_table(Formula.parse('(p->q)'), sys.stdout, 'csv')
+        p,q,(p->q)
+        F,F,T
+        F,T,T
+        T,F,F
+        T,T,T
+    """
+    assert style in TRUTH_TABLE_STYLES
+    binary = isinstance(stream, (RawIOBase, BufferedIOBase)) or \
+             'b' in getattr(stream, 'mode', '')
+    assert binary or style != 'packed'
+    names = sorted(formula.variables())
+    count = len(names)
+    low_count = min(count, TRUTH_TABLE_BLOCK_VARIABLES)
+    high_count = count - low_count
+    block_size = 1 << low_count
+
+    def write(text: str) -> None:
+        stream.write(text.encode('ascii') if binary else text)
+
+    if count <= MAX_BITWISE_VARIABLES:
+        data = TRUTH_TABLE_CACHE.lookup(formula, names).to_bytes(
+            ((1 << count) + 7) // 8, 'little')
 
-def is_tautology(formula: Formula) -> bool:
+        def block(high: int) -> int:
+            return int.from_bytes(data[(high << low_count) >> 3:
+                                       ((high + 1) << low_count) + 7 >> 3],
+                                  'little')
+    else:
+        evaluator = compile_formula(formula, tuple(names), True)
+
+        def block(high: int) -> int:
+            bits = 0
+            for low in range(block_size - 1, -1, -1):
+                bits = (bits << 1) | evaluator((high << low_count) | low)
+            return bits
+
+    if style == 'packed':
+        for high in range(1 << high_count):
+            stream.write(block(high).to_bytes((block_size + 7) // 8,
+                                              'little'))
+        return
+
+    def cell(value: bool, width: int) -> str:
+        if style == 'csv':
+            return ('T' if value else 'F') + ','
+        return '| ' + ('T' if value else 'F') + ' ' * width
+
+    def last_cell(value: bool) -> str:
+        if style == 'csv':
+            return ('T' if value else 'F') + '\n'
+        return cell(value, len(title)) + '|\n'
+
+    title = str(formula)
+    if style == 'csv':
+        write(','.join(names + [title]) + '\n')
+    else:
+        write(''.join('| ' + name + ' ' for name in names) +
+              '| ' + title + ' |\n' +
+              ''.join('|' + '-' * (len(name) + 2) for name in names) +
+              '|' + '-' * (len(title) + 2) + '|\n')
+    # The cells of each row from those of the last variables onwards, by the
+    # values of the last variables and of the formula, shared by all blocks.
+    lows = [[''.join(map(cell, values, map(len, names[high_count:]))) +
+             last_cell(value) for value in (False, True)]
+            for values in product((False, True), repeat=low_count)]
+    for high, values in enumerate(product((False, True), repeat=high_count)):
+        prefix = ''.join(map(cell, values, map(len, names)))
+        bits = block(high)
+        write(''.join(prefix + low[(bits >> index) & 1]
+                      for index, low in enumerate(lows)))
+
+# The engines by which `is_satisfiable` and its relatives may decide
+# satisfiability: exhaustive truth tables (bit-parallel where possible), the
+# `~sat.dpll` procedure or the `~sat.CDCLSolver` over the clause form of the
+# formula, a reduced ordered binary decision diagram (`~bdd.BDD`), an
+# enumeration of partial models pruned by three-valued evaluation
+# (`kleene_model`), or exhaustive truth tables split among worker processes
+# (`PARALLEL_EVALUATOR`).
+SATISFIABILITY_ENGINES = ('truth_table', 'dpll', 'cdcl', 'bdd', 'kleene',
+                          'parallel')
+
+# The model search function of each engine that works over clause form.
+CLAUSE_ENGINES = {'dpll': dpll_model, 'cdcl': cdcl_model}
+
+def choose_engine(variable_count: int, engine: Optional[str] = None) -> str:
+    """Chooses the engine by which to decide satisfiability.
+
+    Parameters:
+        variable_count: the number of variables of the decided formulae.
+        engine: the requested engine, or ``None`` to choose automatically.
+
+    Returns:
+        The requested engine if one was given, otherwise ``'truth_table'`` if
+        the truth tables over the given number of variables can be computed
+        bit-parallel, ``'bdd'`` if there are at most `MAX_BDD_VARIABLES`
+        variables, or ``'cdcl'`` if there are more.
+    """
+    if engine is None:
+        if variable_count <= MAX_BITWISE_VARIABLES:
+            return 'truth_table'
+        return 'bdd' if variable_count <= MAX_BDD_VARIABLES else 'cdcl'
+    assert engine in SATISFIABILITY_ENGINES
+    return engine
+
+def satisfying_model(formula: Formula, engine: Optional[str] = None) -> \
+        Optional[Model]:
+    """Searches for a model in which the given formula holds.
+
+    Parameters:
+        formula: formula to find a model for.
+        engine: the engine to search by, from `SATISFIABILITY_ENGINES`, or
+            ``None`` to choose one by `choose_engine`.
+
+    Returns:
+        A model over the variables of the given formula in which it holds, or
+        ``None`` if the formula is unsatisfiable. The truth-table engine
+        returns the first such model in the order of `all_models` over the
+        alphabetically sorted variables.
+    """
+    names = sorted(formula.variables())
+    engine = choose_engine(len(names), engine)
+    if engine in CLAUSE_ENGINES:
+        return CLAUSE_ENGINES[engine](formula)
+    if engine == 'kleene':
+        return kleene_model(formula)[0]
+    if engine == 'parallel':
+        return PARALLEL_EVALUATOR.truth_table(formula, 'any')[1]
+    if engine == 'bdd':
+        manager = BDD(names)
+        model = manager.model(manager.from_formula(formula))
+        if model is None:
+            return None
+        return {name: model.get(name, False) for name in names}
+    if len(names) <= MAX_BITWISE_VARIABLES:
+        bits = TRUTH_TABLE_CACHE.lookup(formula, names)
+        if bits == 0:
+            return None
+        return dict(BitModel(tuple(names), (bits & -bits).bit_length() - 1))
+    evaluator = compile_formula(formula, tuple(names))
+    for values in product((False, True), repeat=len(names)):
+        if evaluator(values):
+            return dict(zip(names, values))
+    return None
+
+def is_tautology(formula: Formula, engine: Optional[str] = None) -> bool:
     """Checks if the given formula is a tautology.
 
     Parameters:
         formula: formula to check.
+        engine: the engine to check by, from `SATISFIABILITY_ENGINES`, or
+            ``None`` to choose one by `choose_engine`.
 
     Returns:
-        ``True`` if the given formula is a tautology, ``False`` otherwise.
+        ``True`` if the given formula is a tautology, ``False`` otherwise. If
+        no engine is given and there are more models over the variables of the
+        formula than `SIMULATION_PREFILTER` samples, a random model in which
+        the formula does not hold is first searched for, before the engine is
+        run.
     """
     # Task 2.5a
-    names = list(formula.variables())
-    models = list(all_models(names))
-    for index, model in enumerate(models):
-        if evaluate(formula, model) is False:
-            return False
-    return True
+    names = sorted(formula.variables())
+    if engine is None and SIMULATION_PREFILTER.applies(len(names)) and \
+            SIMULATION_PREFILTER.satisfying_model(Formula('~', formula)) \
+            is not None:
+        return False
+    if engine == 'parallel':
+        return PARALLEL_EVALUATOR.truth_table(formula, 'all')[0]
+    if choose_engine(len(names), engine) == 'truth_table' and \
+            len(names) <= MAX_BITWISE_VARIABLES:
+        return TRUTH_TABLE_CACHE.lookup(formula, names) == \
+               (1 << (1 << len(names))) - 1
+    return satisfying_model(Formula('~', formula), engine) is None
 
-def is_contradiction(formula: Formula) -> bool:
+def is_contradiction(formula: Formula, engine: Optional[str] = None) -> bool:
     """Checks if the given formula is a contradiction.
 
     Parameters:
         formula: formula to check.
+        engine: the engine to check by, from `SATISFIABILITY_ENGINES`, or
+            ``None`` to choose one by `choose_engine`.
 
     Returns:
         ``True`` if the given formula is a contradiction, ``False`` otherwise.
     """
     # Task 2.5b
-    not_formula = Formula.parse('~' + str(formula))
-    return is_tautology(not_formula)
+    return satisfying_model(formula, engine) is None
 
-def is_satisfiable(formula: Formula) -> bool:
+def is_satisfiable(formula: Formula, engine: Optional[str] = None) -> bool:
     """Checks if the given formula is satisfiable.
 
     Parameters:
         formula: formula to check.
+        engine: the engine to check by, from `SATISFIABILITY_ENGINES`, or
+            ``None`` to choose one by `choose_engine`.
 
     Returns:
         ``True`` if the given formula is satisfiable, ``False`` otherwise.
     """
     # Task 2.5c
-    names = list(formula.variables())
-    models = list(all_models(names))
-    for index, model in enumerate(models):
-        if evaluate(formula, model) is True:
-            return True
-    return False
+    return satisfying_model(formula, engine) is not None
+
+def distinguishing_model(first: Formula, second: Formula,
+                         engine: Optional[str] = None) -> Optional[Model]:
+    """Searches for a model in which the given formulae differ, by deciding the
+    satisfiability of their miter ``(first+second)``.
+
+    Parameters:
+        first: first formula to compare.
+        second: second formula to compare.
+        engine: the engine to search by, from `SATISFIABILITY_ENGINES`, or
+            ``None`` to choose one by `choose_engine` according to the number
+            of variables of both formulae.
+
+    Returns:
+        A model over the variables of both given formulae in which exactly one
+        of them holds, or ``None`` if the formulae are equivalent. The
+        truth-table engine compares the cached packed truth tables of the two
+        formulae, while the clause engines share the clauses of subformulae
+        common to both. If no engine is given and there are more models over
+        the variables of both formulae than `SIMULATION_PREFILTER` samples, a
+        random model in which they differ is first searched for, before the
+        engine is run; it is the same model in every call, unless the seed of
+        the prefilter is ``None``.
+
+    Examples:
+        >>> distinguishing_model(Formula.parse('(p->q)'),
+        ...                      Formula.parse('(~q->~p)'))
+        >>> distinguishing_model(Formula.parse('(p->q)'),
+        ...                      Formula.parse('(q->p)'))
+        {'p': False, 'q': True}
+    """
+    if first == second:
+        return None
+    names = sorted(first.variables() | second.variables())
+    if engine is None and SIMULATION_PREFILTER.applies(len(names)):
+        model = SIMULATION_PREFILTER.satisfying_model(
+            Formula('+', first, second))
+        if model is not None:
+            return model
+    engine = choose_engine(len(names), engine)
+    if engine == 'truth_table' and len(names) <= MAX_BITWISE_VARIABLES:
+        difference = TRUTH_TABLE_CACHE.lookup(first, names) ^ \
+                     TRUTH_TABLE_CACHE.lookup(second, names)
+        if difference == 0:
+            return None
+        return dict(BitModel(tuple(names),
+                             (difference & -difference).bit_length() - 1))
+    return satisfying_model(Formula('+', first, second), engine)
+
+def equivalent(first: Formula, second: Formula,
+               engine: Optional[str] = None) -> bool:
+    """Checks if the given formulae are equivalent.
+
+    Parameters:
+        first: first formula to compare.
+        second: second formula to compare.
+        engine: the engine to check by, as for `distinguishing_model`.
+
+    Returns:
+        ``True`` if the given formulae have the same value in every model,
+        ``False`` otherwise. Use `distinguishing_model` to also find a model
+        in which they differ.
+    """
+    return distinguishing_model(first, second, engine) is None
+
+def count_models(formula: Formula,
+                 variables: Optional[Sequence[str]] = None) -> int:
+    """Counts the models in which the given formula holds.
+
+    Parameters:
+        formula: formula to count the models of.
+        variables: the variables (a superset of those of the given formula)
+            over which to count models. Defaults to the variables of the
+            formula.
+
+    Returns:
+        The number of models over the given variables in which the given
+        formula holds.
+
+    Examples:
+        >>> count_models(Formula.parse('(p|q)'))
+        3
+        >>> count_models(Formula.parse('(p|q)'), ['p', 'q', 'r'])
+        6
+    """
+    names = sorted(formula.variables())
+    extra = 0
+    if variables is not None:
+        assert formula.variables().issubset(variables)
+        extra = len(set(variables)) - len(names)
+    if len(names) <= MAX_BITWISE_VARIABLES:
+        return bin(TRUTH_TABLE_CACHE.lookup(formula, names)).count('1') << \
+               extra
+    clauses, numbers = to_cnf(formula)
+    count = max(abs(literal) for clause in clauses for literal in clause)
+    return count_solutions(clauses, count, len(numbers)) << extra
+
+def cube_value(nodes: Sequence[FormulaNode],
+               cube: Mapping[str, bool]) -> Optional[bool]:
+    """Calculates the truth value of a formula in a partial model, by
+    three-valued (Kleene) evaluation of its nodes.
+
+    Parameters:
+        nodes: the nodes of the formula, as returned by
+            `~syntax.formula_nodes`.
+        cube: model over some (possibly not all) of the variables of the
+            formula.
+
+    Returns:
+        The truth value of the formula in every model that extends the given
+        partial model, or ``None`` if that value depends on the variables that
+        the partial model does not assign.
+    """
+    values = []
+    for root, first, second in nodes:
+        if is_variable(root):
+            values.append(cube.get(root))
+            continue
+        if is_constant(root):
+            values.append(root == 'T')
+            continue
+        a = values[first]
+        if is_unary(root):
+            values.append(None if a is None else not a)
+            continue
+        b = values[second]
+        gate, negated = GATES[root]
+        if gate == '&':
+            value = False if a is False or b is False else \
+                    None if a is None or b is None else True
+        elif gate == '|':
+            value = True if a is True or b is True else \
+                    None if a is None or b is None else False
+        elif gate == '->':
+            value = True if a is False or b is True else \
+                    None if a is None or b is None else False
+        else:
+            value = None if a is None or b is None else a != b
+        values.append(value if value is None or not negated else not value)
+    return values[-1]
+
+def evaluate_kleene(formula: Formula,
+                    partial_model: Mapping[str, bool]) -> Optional[bool]:
+    """Calculates the truth value of the given formula in the given partial
+    model, by three-valued (Kleene) logic, in which a variable that the model
+    does not assign is unknown, and an operator is unknown only if its value
+    depends on an unknown operand.
+
+    Parameters:
+        formula: formula to calculate the truth value of.
+        partial_model: model over some (possibly not all) of the variables of
+            the formula.
+
+    Returns:
+        The truth value of the given formula in every model that extends the
+        given partial model if Kleene logic determines it, or ``None`` if not.
+
+    Examples:
+        >>> evaluate_kleene(Formula.parse('(p|q)'), {'q': True})
+        True
+        >>> evaluate_kleene(Formula.parse('(p|q)'), {'q': False}) is None
+        True
+        >>> evaluate_kleene(Formula.parse('(p+p)'), {}) is None
+        True
+    """
+    return cube_value(formula_nodes(formula), partial_model)
+
+def kleene_model(formula: Formula, value: bool = True) -> \
+        Tuple[Optional[Model], Dict[str, int]]:
+    """Searches for a model in which the given formula has the given truth
+    value, by a depth-first enumeration of the partial models over prefixes
+    of the alphabetically sorted variables of the formula, which backtracks as
+    soon as `evaluate_kleene` determines the truth value of the formula in a
+    partial model, instead of enumerating all of its extensions.
+
+    Parameters:
+        formula: formula to find a model for.
+        value: the truth value that the formula should have in the model.
+
+    Returns:
+        A pair of the first model in the order of `all_models` over the
+        alphabetically sorted variables of the formula in which it has the
+        given truth value, or ``None`` if there is none, and a dictionary of
+        statistics of the search: the number of ``'models'`` over the
+        variables, the number of partial models whose truth value was
+        calculated (``'evaluations'``), the number of full models among them
+        (``'leaves'``), the number of other models whose truth value was
+        determined by a partial model (``'pruned'``), and the number of models
+        left unexplored once the search stopped (``'unexplored'``), which
+        together with the leaves and the pruned models make up all models.
+
+    Examples:
+        >>> model, statistics = kleene_model(Formula.parse('(p&(q|r))'),
+        ...                                  False)
+        >>> model
+        {'p': False, 'q': False, 'r': False}
+        >>> statistics['evaluations'], statistics['pruned']
+        (2, 4)
+    """
+    names = sorted(formula.variables())
+    nodes = formula_nodes(formula)
+    statistics = {'models': 1 << len(names), 'evaluations': 0, 'leaves': 0,
+                  'pruned': 0, 'unexplored': 0}
+    cube = {}
+    model = None
+    # The partial models to evaluate, each given by the number of variables
+    # that it assigns and the value of the last of them.
+    stack = [(0, False)]
+    while len(stack) > 0:
+        depth, assignment = stack.pop()
+        for name in names[max(depth - 1, 0):len(cube)]:
+            del cube[name]
+        if depth > 0:
+            cube[names[depth - 1]] = assignment
+        statistics['evaluations'] += 1
+        result = cube_value(nodes, cube)
+        if depth == len(names):
+            statistics['leaves'] += 1
+        elif result is not None:
+            statistics['pruned'] += 1 << (len(names) - depth)
+        if result is None:
+            stack.append((depth + 1, True))
+            stack.append((depth + 1, False))
+        elif result == value:
+            model = dict(cube)
+            model.update((name, False) for name in names[depth:])
+            break
+    statistics['unexplored'] = statistics['models'] - statistics['leaves'] - \
+                               statistics['pruned']
+    return model, statistics
+
+def iter_models(formula: Formula, limit: Optional[int] = None,
+                partial: bool = False) -> Iterator[Model]:
+    """Enumerates the models in which the given formula holds, without walking
+    all models over its variables.
+
+    Every model found by a `~sat.SolverSession` is first shrunk to a partial
+    model in which the formula holds regardless of the unassigned variables.
+    The enumeration then continues in the disjoint subspaces that do not
+    extend this partial model, so that no model is found twice and memory
+    does not grow with the number of models enumerated.
+
+    Parameters:
+        formula: formula to enumerate the models of.
+        limit: the maximal number of (partial) models to return, or ``None``
+            to return them all.
+        partial: whether to return partial models, each of which stands for
+            all models over the variables of the formula that extend it,
+            rather than only full models.
+
+    Returns:
+        An iterable over models over the variables of the formula (or if
+        `partial`, over subsets of them) in which the given formula holds,
+        which together cover each such model exactly once.
+    """
+    names = sorted(formula.variables())
+    nodes = formula_nodes(formula)
+    session = SolverSession()
+    session.add(formula)
+    positive = {name: Formula(name) for name in names}
+    negative = {name: Formula('~', positive[name]) for name in names}
+    returned = 0
+    prefixes = [{}]
+    while len(prefixes) > 0 and (limit is None or returned < limit):
+        prefix = prefixes.pop()
+        if not session.check([positive[name] if value else negative[name]
+                              for name, value in prefix.items()]):
+            continue
+        model = session.model()
+        cube = {name: model[name] for name in names}
+        for name in names:
+            if name not in prefix:
+                value = cube.pop(name)
+                if cube_value(nodes, cube) is not True:
+                    cube[name] = value
+        branch = dict(prefix)
+        for name in names:
+            if name in cube and name not in prefix:
+                prefixes.append(dict(branch, **{name: not cube[name]}))
+                branch[name] = cube[name]
+        if partial:
+            returned += 1
+            yield cube
+            continue
+        free = [name for name in names if name not in cube]
+        for values in product((False, True), repeat=len(free)):
+            if limit is not None and returned >= limit:
+                return
+            returned += 1
+            yield dict(cube, **dict(zip(free, values)))
 
 def synthesize_for_model(model: Model) -> Formula:
     """Synthesizes a propositional formula in the form of a single clause that
@@ -280,7 +1797,7 @@ def synthesize_for_model(model: Model) -> Formula:
         form = Formula.parse(new_form)
     return form
 
-def synthesize(variables: List[str], values: Iterable[bool]) -> Formula:
+def synthesize(variables: List[str], values: TruthVector) -> Formula:
     """Synthesizes a propositional formula in DNF over the given variables, from
     the given specification of which value the formula should have on each
     possible model over these variables.
@@ -289,10 +1806,13 @@ def synthesize(variables: List[str], values: Iterable[bool]) -> Formula:
         variables: the set of variables for the synthesize formula.
         values: iterable over truth values for the synthesized formula in every
             possible model over the given variables, in the order returned by
-            `all_models`\ ``(``\ `~synthesize.variables`\ ``)``.
+            `all_models`\\ ``(``\\ `~synthesize.variables`\\ ``)``, or any other
+            `~synthesis.TruthVector` of these values.
 
     Returns:
-        The synthesized formula.
+        The synthesized formula, with a term per model in which it holds, and
+        with the terms and the literals of each term combined into trees of
+        logarithmic depth.
 
     Examples:
         >>> formula = synthesize(['p', 'q'], [True, True, True, False])
@@ -305,18 +1825,129 @@ def synthesize(variables: List[str], values: Iterable[bool]) -> Formula:
     """
     assert len(variables) > 0
     # Task 2.7
-    if not (True in values):
-        return Formula.parse("(" + variables[0] + "&~" + variables[0] + ")")
-    else:
-        models = list(all_models(variables))
-        first_true = False
-        for index, val in enumerate(values):
-            if val is True and not first_true:
-                res = str(synthesize_for_model(models[index]))
-                first_true = True
-            if val is True and first_true:
-                res = "(" + res + "|" + str(synthesize_for_model(models[index])) + ")"
-        return Formula.parse(res)
+    count = len(variables)
+    minterms = vector_minterms(truth_vector_bits(values, count))
+    return dnf_formula(variables, [((1 << count) - 1, minterm)
+                                   for minterm in minterms])
+
+def synthesize_shannon(variables: Sequence[str],
+                       values: TruthVector) -> Formula:
+    """Synthesizes a propositional formula over the given variables by Shannon
+    decomposition, from the given specification of which value the formula
+    should have on each possible model over these variables.
+
+    Parameters:
+        variables: the set of variables for the synthesized formula.
+        values: `~synthesis.TruthVector` of the truth values for the
+            synthesized formula in every possible model over the given
+            variables, in the order returned by
+            `all_models`\\ ``(``\\ `~synthesize_shannon.variables`\\ ``)``.
+
+    Returns:
+        The formula computed by `~synthesis.shannon_formula`, whose size
+        follows the number of distinct cofactors of the given values.
+
+    Examples:
+        >>> synthesize_shannon(['p', 'q'], 0b0111)
+        (~p|~q)
+    """
+    return shannon_formula(variables,
+                           truth_vector_bits(values, len(variables)))
+
+def synthesize_minimal(variables: Sequence[str],
+                       values: TruthVector) -> Formula:
+    """Synthesizes a near-minimal propositional formula in DNF over the given
+    variables, from the given specification of which value the formula should
+    have on each possible model over these variables.
+
+    Parameters:
+        variables: the set of variables for the synthesized formula.
+        values: iterable over truth values for the synthesized formula in every
+            possible model over the given variables, in the order returned by
+            `all_models`\\ ``(``\\ `~synthesize_minimal.variables`\\ ``)``, or
+            any other `~synthesis.TruthVector` of these values.
+
+    Returns:
+        The disjunction of a cover of the function by prime implicants, as
+        computed by `~synthesis.minimize_dnf`.
+
+    Examples:
+        >>> synthesize_minimal(['p', 'q'], [True, True, True, False])
+        (~q|~p)
+    """
+    assert len(variables) > 0
+    minterms = vector_minterms(truth_vector_bits(values, len(variables)))
+    return dnf_formula(variables, minimize_dnf(len(variables), minterms))
+
+def synthesize_many(variables: Sequence[str],
+                    tables: Iterable[TruthVector]) -> List[Formula]:
+    """Synthesizes near-minimal propositional formulae in DNF over the given
+    variables, one from each of the given specifications of which value the
+    formula should have on each possible model over these variables, sharing
+    product terms and subformulae between them.
+
+    Parameters:
+        variables: the set of variables for the synthesized formulae.
+        tables: iterable over iterables over truth values, each for one of the
+            synthesized formulae in every possible model over the given
+            variables, in the order returned by
+            `all_models`\\ ``(``\\ `~synthesize_many.variables`\\ ``)``, or any
+            other `~synthesis.TruthVector` of these values.
+
+    Returns:
+        The synthesized formulae, in the order of the given tables, computed
+        by `~synthesis.minimize_dnf_many` and `~synthesis.dnf_formulae`, so
+        that equal subformulae of them are the same objects.
+
+    Examples:
+        >>> first, second = synthesize_many(
+        ...     ['p', 'q', 'r'], [[False, False, False, True,
+        ...                        False, False, True, True],
+        ...                       [False, False, False, True,
+        ...                        False, True, False, True]])
+        >>> first, second
+        (((q&r)|(p&q)), ((q&r)|(p&r)))
+        >>> first.first is second.first
+        True
+    """
+    assert len(variables) > 0
+    minterm_sets = [vector_minterms(truth_vector_bits(values, len(variables)))
+                    for values in tables]
+    return dnf_formulae(variables,
+                        minimize_dnf_many(len(variables), minterm_sets))
+
+def synthesis_report(variables: Sequence[str],
+                     values: TruthVector) -> Dict[str, int]:
+    """Compares the size of the formula synthesized by `synthesize_minimal` to
+    that of the formula with a term per model synthesized by `synthesize`.
+
+    Parameters:
+        variables: the set of variables for the synthesized formulae.
+        values: iterable over truth values for the synthesized formulae in
+            every possible model over the given variables, in the order
+            returned by
+            `all_models`\\ ``(``\\ `~synthesis_report.variables`\\ ``)``,
+            or any other `~synthesis.TruthVector` of these values.
+
+    Returns:
+        The `~synthesis.dnf_statistics` of the minimized formula, together with
+        those of the formula with a term per model under the same keys prefixed
+        by ``'naive_'``.
+
+    Examples:
+        >>> synthesis_report(['p', 'q'], [True, True, True, False])
+        {'terms': 2, 'literals': 2, 'size': 5, 'naive_terms': 3, \
+'naive_literals': 6, 'naive_size': 15}
+    """
+    assert len(variables) > 0
+    count = len(variables)
+    minterms = vector_minterms(truth_vector_bits(values, count))
+    report = dnf_statistics(count, minimize_dnf(count, minterms))
+    naive = dnf_statistics(count, (((1 << count) - 1, minterm)
+                                   for minterm in minterms))
+    for key, value in naive.items():
+        report['naive_' + key] = value
+    return report
 
 
 # Tasks for Chapter 4
@@ -334,32 +1965,131 @@ def evaluate_inference(rule: InferenceRule, model: Model) -> bool:
     """
     assert is_model(model)
     # Task 4.2
-    flag = True
     for assum in rule.assumptions:
         if not(evaluate(assum, model)):
-            flag = False
-            break
-    return evaluate(rule.conclusion, model) is flag
+            return True
+    return evaluate(rule.conclusion, model)
+
+def evaluate_inference_batch(rule: InferenceRule, models: Any,
+                             variables: Sequence[str],
+                             chunk_size: int = BATCH_CHUNK_SIZE) -> Any:
+    """Checks if the given inference rule holds in each of the given models, by
+    vectorized NumPy operations over all models at once.
+
+    Parameters:
+        rule: inference rule to check.
+        models: two-dimensional boolean NumPy array, each row of which is a
+            model, and each column of which holds the values of a variable.
+        variables: the variables (a superset of those of the given rule) whose
+            values are held in the respective columns of `models`.
+        chunk_size: the maximal number of models to check at once, as for
+            `truth_values_batch`.
+
+    Returns:
+        A one-dimensional boolean NumPy array of whether the given rule holds
+        in each of the given models.
+    """
+    return truth_values_batch(inference_formula(rule), models, variables,
+                              chunk_size)
+
+def inference_formula(rule: InferenceRule) -> Formula:
+    """Computes a formula that holds exactly in the models in which the given
+    inference rule holds.
+
+    Parameters:
+        rule: inference rule to compute the formula of.
 
-def is_sound_inference(rule: InferenceRule) -> bool:
+    Returns:
+        The conclusion of the given rule if it has no assumptions, and
+        otherwise the implication from the conjunction of its assumptions to
+        its conclusion.
+    """
+    if len(rule.assumptions) == 0:
+        return rule.conclusion
+    assumptions = rule.assumptions[-1]
+    for assumption in reversed(rule.assumptions[:-1]):
+        assumptions = Formula('&', assumption, assumptions)
+    return Formula('->', assumptions, rule.conclusion)
+
+def inference_counter_model(rule: InferenceRule,
+                            engine: Optional[str] = None) -> Optional[Model]:
+    """Searches for a model in which the given inference rule does not hold,
+    that is, a model of its assumptions in which its conclusion does not hold.
+
+    Parameters:
+        rule: inference rule to check.
+        engine: the engine to search by, from `SATISFIABILITY_ENGINES`, or
+            ``None`` to choose one by `choose_engine`.
+
+    Returns:
+        A model over the variables of the given rule in which all of its
+        assumptions hold but its conclusion does not, or ``None`` if the rule
+        is sound. The truth-table engine intersects the cached packed truth
+        tables of the assumptions with the complement of that of the
+        conclusion, stopping as soon as the intersection is empty, while the
+        other engines decide the satisfiability of the conjunction of the
+        assumptions with the negation of the conclusion.
+
+    Examples:
+        >>> inference_counter_model(InferenceRule(
+        ...     [Formula.parse('(p|q)')], Formula.parse('p')))
+        {'p': False, 'q': True}
+    """
+    names = sorted(rule.variables())
+    engine = choose_engine(len(names), engine)
+    if engine == 'truth_table' and len(names) <= MAX_BITWISE_VARIABLES:
+        counterexamples = TRUTH_TABLE_CACHE.lookup(rule.conclusion, names) ^ \
+                          (1 << (1 << len(names))) - 1
+        for assumption in rule.assumptions:
+            if counterexamples == 0:
+                return None
+            counterexamples &= TRUTH_TABLE_CACHE.lookup(assumption, names)
+        if counterexamples == 0:
+            return None
+        return dict(BitModel(tuple(names),
+                             (counterexamples & -counterexamples).bit_length()
+                             - 1))
+    counterexample = Formula('~', rule.conclusion)
+    for assumption in reversed(rule.assumptions):
+        counterexample = Formula('&', assumption, counterexample)
+    return satisfying_model(counterexample, engine)
+
+def is_sound_inference(rule: InferenceRule,
+                       engine: Optional[str] = None) -> bool:
     """Checks if the given inference rule is sound, i.e., whether its
     conclusion is a semantically correct implication of its assumptions.
 
     Parameters:
         rule: inference rule to check.
+        engine: the engine to check by, from `SATISFIABILITY_ENGINES`, or
+            ``None`` to choose one by `choose_engine`.
 
     Returns:
         ``True`` if the given inference rule is sound, ``False`` otherwise.
+        Use `inference_counter_model` to also find a model in which the rule
+        does not hold.
     """
     # Task 4.3
-    all_vars = list(rule.variables())
-    models = all_models(all_vars)
-    flag = True
-    for model in models:
-        for assum in rule.assumptions:
-            if not(evaluate(assum, model)):
-                flag = False
-        if flag is True and evaluate(rule.conclusion, model) is False:
-            return False
-        flag = True
-    return True
+    return inference_counter_model(rule, engine) is None
+
+def sound_conclusions(assumptions: Iterable[Formula],
+                      conclusions: Iterable[Formula]) -> List[bool]:
+    """Checks, for each of the given conclusions, whether the inference rule
+    from the given assumptions to that conclusion is sound.
+
+    The assumptions are converted to clause form only once, into a
+    `~sat.SolverSession` whose learned clauses carry over from each conclusion
+    to the next, so this is much faster than checking every rule separately.
+
+    Parameters:
+        assumptions: the assumptions shared by all checked rules.
+        conclusions: the conclusions of the checked rules.
+
+    Returns:
+        A list whose entries are ``True`` for the respective conclusions that
+        are implied by the given assumptions, and ``False`` for the others.
+    """
+    session = SolverSession()
+    for assumption in assumptions:
+        session.add(assumption)
+    return [session.entails(conclusion) for conclusion in conclusions]
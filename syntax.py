@@ -6,7 +6,7 @@
 """Syntactic handling of propositional formulae."""
 
 from __future__ import annotations
-from typing import Mapping, Optional, Set, Tuple, Union
+from typing import List, Mapping, Optional, Sequence, Set, Tuple, Union
 
 from logic_utils import frozen
 
@@ -464,3 +464,182 @@ class Formula:
                     old = "(" + str(p) + "|" + str(Formula.parse_prefix(rest[1:])[0].substitute_operators(substitution_map))\
                           + Formula.parse_prefix(rest[1:])[1]
         return Formula.parse(old)
+
+    def restrict(self, partial_model: Mapping[str, bool]) -> Formula:
+        """Substitutes in the current formula the given values of some of its
+        variables, and simplifies the result by propagating the constants
+        through every operator.
+
+        Parameters:
+            partial_model: mapping from some variables, not necessarily all of
+                those of the current formula, to their truth values.
+
+        Returns:
+            A formula over the variables of the current formula that are not
+            assigned by the given partial model, which has the same truth value
+            as the current formula in every model that extends the given one.
+            The result is either a constant, or contains no constants that were
+            introduced by the substitution. Subformulae that contain none of
+            the assigned variables are shared with the current formula rather
+            than copied, and a shared subformula is restricted only once, so
+            this takes time linear in the size of the current formula.
+
+        Examples:
+            >>> Formula.parse('((p&q)->r)').restrict({'p': True})
+            (q->r)
+            >>> Formula.parse('((p&q)->r)').restrict({'p': False})
+            T
+            >>> Formula.parse('((p+q)|r)').restrict({'p': True, 'r': False})
+            ~q
+        """
+        for variable in partial_model:
+            assert is_variable(variable)
+        restricted = {}
+
+        def restrict(formula: Formula) -> Formula:
+            if id(formula) in restricted:
+                return restricted[id(formula)]
+            root = formula.root
+            if is_variable(root):
+                result = formula if root not in partial_model else \
+                         Formula('T' if partial_model[root] else 'F')
+            elif is_constant(root):
+                result = formula
+            elif is_unary(root):
+                first = restrict(formula.first)
+                if is_constant(first.root):
+                    result = negate_formula(first)
+                elif first is formula.first:
+                    result = formula
+                else:
+                    result = Formula(root, first)
+            else:
+                first = restrict(formula.first)
+                second = restrict(formula.second)
+                if is_constant(first.root) or is_constant(second.root):
+                    result = simplify_binary(root, first, second)
+                elif first is formula.first and second is formula.second:
+                    result = formula
+                else:
+                    result = Formula(root, first, second)
+            restricted[id(formula)] = result
+            return result
+
+        return restrict(self)
+
+def negate_formula(formula: Formula) -> Formula:
+    """Negates the given formula, folding constants and double negations.
+
+    Parameters:
+        formula: formula to negate.
+
+    Returns:
+        A formula that is the negation of the given formula: the other
+        constant if it is a constant, its operand if it is a negation, and
+        otherwise its negation.
+    """
+    if is_constant(formula.root):
+        return Formula('F' if formula.root == 'T' else 'T')
+    if is_unary(formula.root):
+        return formula.first
+    return Formula('~', formula)
+
+def simplify_binary(root: str, first: Formula, second: Formula) -> Formula:
+    """Simplifies the application of the given binary operator to the given
+    operands, at least one of which is a constant.
+
+    Parameters:
+        root: binary operator to apply.
+        first: first operand of the operator.
+        second: second operand of the operator.
+
+    Returns:
+        A formula equivalent to the application of the given operator to the
+        given operands, which is a constant, one of the operands, or the
+        negation of one of them, by `negate_formula`.
+    """
+    negated = root in ('-&', '-|')
+    if negated:
+        root = root[1]
+    if root == '->' and not is_constant(first.root):
+        # (x->T) is T and (x->F) is ~x.
+        result = second if second.root == 'T' else negate_formula(first)
+    else:
+        if not is_constant(first.root):
+            # All other operators are commutative.
+            first, second = second, first
+        value = first.root == 'T'
+        if root == '&':
+            result = second if value else first
+        elif root == '|':
+            result = first if value else second
+        elif root == '->':
+            result = second if value else negate_formula(first)
+        elif root == '+':
+            result = negate_formula(second) if value else second
+        else:
+            assert root == '<->'
+            result = second if value else negate_formula(second)
+    return negate_formula(result) if negated else result
+
+# A node of a formula DAG: its root, and the positions of its first and second
+# operands in the node list (-1 if the root has no such operand).
+FormulaNode = Tuple[str, int, int]
+
+def formula_nodes(formula: Formula) -> List[FormulaNode]:
+    """Flattens the given formula into a DAG in which every distinct
+    subformula appears exactly once.
+
+    Parameters:
+        formula: formula to flatten.
+
+    Returns:
+        A list of the distinct subformulae of the given formula, each given as
+        its root and the positions of its operands in the list. Every node
+        appears after its operands, so the last node is the given formula.
+
+    Examples:
+        >>> formula_nodes(Formula.parse('(p&~p)'))
+        [('p', -1, -1), ('~', 0, -1), ('&', 0, 1)]
+    """
+    return formulae_nodes([formula])[0]
+
+def formulae_nodes(formulae: Sequence[Formula]) -> \
+        Tuple[List[FormulaNode], List[int]]:
+    """Flattens the given formulae into a single DAG in which every distinct
+    subformula of any of them appears exactly once.
+
+    Parameters:
+        formulae: formulae to flatten.
+
+    Returns:
+        A pair of a list of the distinct subformulae of the given formulae,
+        each given as its root and the positions of its operands in the list,
+        where every node appears after its operands, and a list of the
+        positions of the given formulae in the former list, in their order.
+
+    Examples:
+        >>> formulae_nodes([Formula.parse('(p&~p)'), Formula.parse('~p')])
+        ([('p', -1, -1), ('~', 0, -1), ('&', 0, 1)], [2, 1])
+    """
+    nodes = []
+    positions = {}
+    visited = {}
+
+    def flatten(node: Formula) -> int:
+        if id(node) in visited:
+            return visited[id(node)]
+        first = second = -1
+        if is_unary(node.root) or is_binary(node.root):
+            first = flatten(node.first)
+        if is_binary(node.root):
+            second = flatten(node.second)
+        key = (node.root, first, second)
+        if key not in positions:
+            positions[key] = len(nodes)
+            nodes.append(key)
+        visited[id(node)] = positions[key]
+        return positions[key]
+
+    roots = [flatten(formula) for formula in formulae]
+    return nodes, roots
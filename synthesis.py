@@ -0,0 +1,576 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/synthesis.py
+
+"""Synthesis of propositional formulae from their truth tables."""
+
+from heapq import heapify, heappop, heappush
+from mmap import mmap
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from syntax import *
+
+# A truth table over `n` variables, as the truth values in all models in the
+# order of `~semantics.all_models`: either an iterable over these values, a
+# NumPy array of them, an integer whose `i`-th bit is the value in the `i`-th
+# model, or the little-endian bytes of such an integer (as written by
+# `~semantics.write_truth_table` in its ``'packed'`` style), for example in a
+# memory-mapped file.
+TruthVector = Union[Iterable[bool], int, bytes, bytearray, memoryview, mmap]
+
+# A product term over `n` variables, as a pair of `n`-bit integers: the mask of
+# the variables that appear in the term, and the values of these variables in
+# the term. As in `~semantics.all_models`, the `j`-th variable corresponds to
+# bit ``n-1-j``, so that the `i`-th model satisfies the term `(mask, value)`
+# exactly when ``i & mask == value``.
+Implicant = Tuple[int, int]
+
+# The largest number of variables for which `minimize_dnf` computes all prime
+# implicants and searches for a minimum cover of them, rather than expanding
+# the minterms one by one into a near-minimal cover.
+MAX_EXACT_VARIABLES = 12
+
+# The largest number of partial covers that `minimum_cover` considers before it
+# settles for the best cover found so far.
+MAX_COVER_BRANCHES = 10000
+
+def truth_vector_bits(values: TruthVector, count: int) -> int:
+    """Packs the given truth table into the bits of an integer.
+
+    Parameters:
+        values: truth table over the given number of variables, which may not
+            be a single truth value.
+        count: the number of variables.
+
+    Returns:
+        The ``2**count``-bit integer whose `i`-th bit is the value of the given
+        table in the `i`-th model.
+
+    Examples:
+        >>> truth_vector_bits([True, True, True, False], 2)
+        7
+        >>> truth_vector_bits(b'\\x07', 2)
+        7
+    """
+    if isinstance(values, int):
+        # A single truth value is not a table, even though bool is an int.
+        assert not isinstance(values, bool)
+        bits = values
+    elif isinstance(values, (bytes, bytearray, memoryview, mmap)):
+        bits = int.from_bytes(values, 'little')
+    elif numpy is not None and isinstance(values, numpy.ndarray):
+        assert values.size == 1 << count
+        bits = int.from_bytes(numpy.packbits(values.astype(bool).ravel(),
+                                             bitorder='little').tobytes(),
+                              'little')
+    else:
+        bits = 0
+        size = 0
+        for size, value in enumerate(values, 1):
+            if value:
+                bits |= 1 << (size - 1)
+        assert size == 1 << count
+    assert 0 <= bits < 1 << (1 << count)
+    return bits
+
+def vector_minterms(bits: int) -> List[int]:
+    """Lists the minterms of the given packed truth table.
+
+    Parameters:
+        bits: truth table as returned by `truth_vector_bits`.
+
+    Returns:
+        The indices of the models in which the given table holds, in ascending
+        order.
+    """
+    digits = bin(bits)[:1:-1]
+    minterms = []
+    index = digits.find('1')
+    while index >= 0:
+        minterms.append(index)
+        index = digits.find('1', index + 1)
+    return minterms
+
+def implicant_minterms(count: int, implicant: Implicant) -> Iterable[int]:
+    """Enumerates the minterms of the given product term.
+
+    Parameters:
+        count: the number of variables.
+        implicant: product term over that number of variables.
+
+    Returns:
+        The indices of the models that satisfy the given term, in ascending
+        order.
+    """
+    mask, value = implicant
+    free = ((1 << count) - 1) & ~mask
+    # Counts through the free bits of the index, the value bits staying fixed.
+    index = 0
+    while True:
+        yield value | index
+        index = (index - free) & free
+        if index == 0:
+            return
+
+def prime_implicants(count: int, minterms: Iterable[int]) -> List[Implicant]:
+    """Computes all prime implicants of the given function, by the
+    Quine-McCluskey procedure of repeatedly merging pairs of product terms that
+    differ in the value of a single variable.
+
+    Parameters:
+        count: the number of variables of the function.
+        minterms: the indices of the models in which the function holds.
+
+    Returns:
+        The product terms that imply the function but no longer term does,
+        sorted.
+    """
+    full = (1 << count) - 1
+    implicants = {(full, minterm) for minterm in minterms}
+    primes = []
+    while len(implicants) > 0:
+        merged = set()
+        combined = set()
+        for mask, value in implicants:
+            bit = mask & ~value
+            while bit != 0:
+                low = bit & -bit
+                bit ^= low
+                partner = (mask, value | low)
+                if partner in implicants:
+                    merged.add((mask & ~low, value))
+                    combined.add((mask, value))
+                    combined.add(partner)
+        primes.extend(implicants - combined)
+        implicants = merged
+    return sorted(primes)
+
+def prime_implicants_many(count: int,
+                          minterm_sets: Sequence[Iterable[int]]) \
+        -> Dict[Implicant, int]:
+    """Computes the prime implicants of each of the given functions, by a
+    single pass of the Quine-McCluskey procedure over product terms tagged
+    with the functions they imply.
+
+    Parameters:
+        count: the number of variables of the functions.
+        minterm_sets: for each function, the indices of the models in which it
+            holds.
+
+    Returns:
+        A mapping from each product term that is a prime implicant of some of
+        the given functions, to the bitmask of those of the functions, by their
+        indices, that it is a prime implicant of.
+    """
+    full = (1 << count) - 1
+    tags = {}
+    for function, minterms in enumerate(minterm_sets):
+        for minterm in minterms:
+            tags[full, minterm] = tags.get((full, minterm), 0) | 1 << function
+    primes = {}
+    while len(tags) > 0:
+        merged = {}
+        # The functions of which each term is not merged into an implicant.
+        remaining = dict(tags)
+        for (mask, value), tag in tags.items():
+            bit = mask & ~value
+            while bit != 0:
+                low = bit & -bit
+                bit ^= low
+                partner = (mask, value | low)
+                common = tag & tags.get(partner, 0)
+                if common != 0:
+                    merged[mask & ~low, value] = common
+                    remaining[mask, value] &= ~common
+                    remaining[partner] &= ~common
+        for implicant, tag in remaining.items():
+            if tag != 0:
+                primes[implicant] = tag
+        tags = merged
+    return primes
+
+def expand_implicants(count: int, minterms: Iterable[int]) -> List[Implicant]:
+    """Computes prime implicants of the given function that together cover it,
+    by greedily expanding each minterm not covered by earlier expansions.
+
+    Parameters:
+        count: the number of variables of the function.
+        minterms: the indices of the models in which the function holds.
+
+    Returns:
+        Prime implicants of the function that cover all of its minterms, in the
+        order of the minterms they were expanded from.
+    """
+    minterms = set(minterms)
+    covered = set()
+    implicants = []
+    for minterm in sorted(minterms):
+        if minterm in covered:
+            continue
+        mask, value = (1 << count) - 1, minterm
+        for position in range(count):
+            bit = 1 << position
+            # Dropping the variable doubles the term, so it remains an
+            # implicant exactly when the flipped half holds as well.
+            if all(index ^ bit in minterms
+                   for index in implicant_minterms(count, (mask, value))):
+                mask ^= bit
+                value &= ~bit
+        implicants.append((mask, value))
+        covered.update(implicant_minterms(count, (mask, value)))
+    return implicants
+
+def minimum_cover(count: int, implicants: Sequence[Implicant],
+                  minterms: Iterable[int], exact: bool = True,
+                  costs: Optional[Sequence[int]] = None) -> List[Implicant]:
+    """Chooses few of the given product terms that together cover the given
+    minterms.
+
+    Parameters:
+        count: the number of variables.
+        implicants: product terms to choose from, whose union covers the given
+            minterms.
+        minterms: indices of the models to cover.
+        exact: whether to search for a cover with the fewest terms, and of
+            those, the least total cost, for up to `MAX_COVER_BRANCHES` partial
+            covers, rather than only choosing greedily.
+        costs: the cost of each of the given terms. Defaults to the number of
+            literals of each term.
+
+    Returns:
+        The chosen terms, in the order of the given terms.
+    """
+    minterms = set(minterms)
+    covers = [minterms.intersection(implicant_minterms(count, implicant))
+              for implicant in implicants]
+    if costs is None:
+        costs = [bin(mask).count('1') for mask, _ in implicants]
+    covering = {minterm: [] for minterm in minterms}
+    for index, cover in enumerate(covers):
+        for minterm in cover:
+            covering[minterm].append(index)
+
+    # Greedily chooses the term covering the most uncovered minterms, lazily
+    # recounting the terms at the top of a heap since counts only decrease,
+    # and then drops terms whose minterms the others have come to cover.
+    best = []
+    uncovered = set(minterms)
+    heap = [(-len(cover), costs[index], index)
+            for index, cover in enumerate(covers)]
+    heapify(heap)
+    while len(uncovered) > 0:
+        _, length, index = heappop(heap)
+        size = len(covers[index] & uncovered)
+        if len(heap) > 0 and (-size, length) > heap[0][:2]:
+            heappush(heap, (-size, length, index))
+            continue
+        best.append(index)
+        uncovered -= covers[index]
+    multiplicity = dict.fromkeys(minterms, 0)
+    for index in best:
+        for minterm in covers[index]:
+            multiplicity[minterm] += 1
+    for index in reversed(list(best)):
+        if all(multiplicity[minterm] > 1 for minterm in covers[index]):
+            best.remove(index)
+            for minterm in covers[index]:
+                multiplicity[minterm] -= 1
+
+    if exact:
+        # Branches on the covers of the uncovered minterm with the fewest of
+        # them, pruning partial covers that cannot beat the best one so far.
+        largest = max((len(cover) for cover in covers), default=1)
+        best_cost = (len(best), sum(costs[index] for index in best))
+        branches = 0
+        stack = [(frozenset(minterms), (), 0)]
+        while len(stack) > 0 and branches < MAX_COVER_BRANCHES:
+            uncovered, chosen, total = stack.pop()
+            branches += 1
+            bound = (len(chosen) + -(-len(uncovered) // largest), total)
+            if bound >= best_cost:
+                continue
+            if len(uncovered) == 0:
+                best, best_cost = list(chosen), bound
+                continue
+            minterm = min(uncovered,
+                          key=lambda minterm: len(covering[minterm]))
+            for index in sorted(covering[minterm],
+                                key=lambda index: (len(covers[index] &
+                                                       uncovered),
+                                                   -costs[index])):
+                stack.append((uncovered - covers[index], chosen + (index,),
+                              total + costs[index]))
+    return [implicants[index] for index in sorted(best)]
+
+def minimize_dnf(count: int, minterms: Iterable[int]) -> List[Implicant]:
+    """Computes a near-minimal disjunctive normal form of the given function:
+    exactly by prime implicants and a minimum cover of them for up to
+    `MAX_EXACT_VARIABLES` variables, and otherwise by greedy expansion of the
+    minterms into prime implicants and an irredundant cover of them.
+
+    Parameters:
+        count: the number of variables of the function.
+        minterms: the indices of the models in which the function holds.
+
+    Returns:
+        Product terms whose disjunction is the given function.
+
+    Examples:
+        >>> minimize_dnf(2, [0, 1, 2])
+        [(1, 0), (2, 0)]
+    """
+    minterms = set(minterms)
+    if len(minterms) == 0:
+        return []
+    if count <= MAX_EXACT_VARIABLES:
+        return minimum_cover(count, prime_implicants(count, minterms),
+                             minterms)
+    return minimum_cover(count, expand_implicants(count, minterms), minterms,
+                         False)
+
+def minimize_dnf_many(count: int, minterm_sets: Iterable[Iterable[int]]) \
+        -> List[List[Implicant]]:
+    """Computes near-minimal disjunctive normal forms of the given functions,
+    as `minimize_dnf` does for each of them, but sharing product terms between
+    them. For up to `MAX_EXACT_VARIABLES` variables, the prime implicants of
+    all functions are computed in a single pass by `prime_implicants_many`.
+    The terms already chosen for earlier functions are offered at no cost to
+    the cover of each later function that they imply, and identical functions
+    are minimized once.
+
+    Parameters:
+        count: the number of variables of the functions.
+        minterm_sets: for each function, the indices of the models in which it
+            holds.
+
+    Returns:
+        For each of the given functions, product terms whose disjunction is the
+        function, sorted.
+    """
+    minterm_sets = [frozenset(minterms) for minterms in minterm_sets]
+    exact = count <= MAX_EXACT_VARIABLES
+    if exact:
+        primes = sorted(prime_implicants_many(count, minterm_sets).items())
+    chosen = set()
+    minimized = {}
+    results = []
+    for function, minterms in enumerate(minterm_sets):
+        if minterms not in minimized:
+            if len(minterms) == 0:
+                implicants = []
+            else:
+                if exact:
+                    candidates = [implicant for implicant, tag in primes
+                                  if tag >> function & 1]
+                else:
+                    candidates = expand_implicants(count, minterms)
+                known = set(candidates)
+                candidates.extend(
+                    implicant for implicant in sorted(chosen)
+                    if implicant not in known and
+                    minterms.issuperset(implicant_minterms(count, implicant)))
+                costs = [0 if (mask, value) in chosen else
+                         bin(mask).count('1') for mask, value in candidates]
+                implicants = sorted(minimum_cover(count, candidates, minterms,
+                                                  exact, costs))
+            chosen.update(implicants)
+            minimized[minterms] = implicants
+        results.append(minimized[minterms])
+    return results
+
+def balanced_formula(operator: str, formulae: Sequence[Formula]) -> Formula:
+    """Combines the given formulae by the given associative operator into a
+    tree of logarithmic depth.
+
+    Parameters:
+        operator: associative binary operator to combine by.
+        formulae: nonempty sequence of formulae to combine.
+
+    Returns:
+        The combination of the given formulae, in their order.
+    """
+    assert len(formulae) > 0
+    if len(formulae) == 1:
+        return formulae[0]
+    middle = len(formulae) // 2
+    return Formula(operator, balanced_formula(operator, formulae[:middle]),
+                   balanced_formula(operator, formulae[middle:]))
+
+def dnf_formula(variables: Sequence[str],
+                implicants: Sequence[Implicant]) -> Formula:
+    """Converts the given product terms into a formula in disjunctive normal
+    form.
+
+    Parameters:
+        variables: nonempty sequence of the variables of the terms.
+        implicants: product terms over the given variables.
+
+    Returns:
+        The disjunction of the conjunctions of the literals of the given terms,
+        each combined as by `balanced_formula`. As in `~semantics.synthesize`,
+        the contradiction is represented by ``(x&~x)`` and the tautology by
+        ``(x|~x)``, where ``x`` is the first variable.
+    """
+    return dnf_formulae(variables, [implicants])[0]
+
+def dnf_formulae(variables: Sequence[str],
+                 implicant_lists: Iterable[Sequence[Implicant]]) \
+        -> List[Formula]:
+    """Converts each of the given lists of product terms into a formula in
+    disjunctive normal form, as `dnf_formula` does, while interning the
+    subformulae, so that the formulae share a single object for each literal,
+    each conjunction of literals, and each disjunction of terms that they have
+    in common.
+
+    Parameters:
+        variables: nonempty sequence of the variables of the terms.
+        implicant_lists: lists of product terms over the given variables.
+
+    Returns:
+        The formula of each of the given lists of terms.
+    """
+    assert len(variables) > 0
+    count = len(variables)
+    literals = {}
+    for position, variable in enumerate(variables):
+        literals[position, True] = Formula(variable)
+        literals[position, False] = Formula('~', literals[position, True])
+    contradiction = Formula('&', literals[0, True], literals[0, False])
+    tautology = Formula('|', literals[0, True], literals[0, False])
+    conjunctions = {}
+    disjunctions = {}
+
+    def conjunction(mask: int, value: int) -> Formula:
+        if (mask, value) not in conjunctions:
+            positions = [position for position in range(count)
+                         if mask >> (count - 1 - position) & 1]
+            if len(positions) == 1:
+                position = positions[0]
+                formula = literals[position,
+                                   value >> (count - 1 - position) & 1 == 1]
+            else:
+                first = 0
+                for position in positions[:len(positions) // 2]:
+                    first |= 1 << (count - 1 - position)
+                formula = Formula('&', conjunction(first, value & first),
+                                  conjunction(mask ^ first, value & ~first))
+            conjunctions[mask, value] = formula
+        return conjunctions[mask, value]
+
+    def disjunction(implicants: Tuple[Implicant, ...]) -> Formula:
+        if implicants not in disjunctions:
+            if len(implicants) == 1:
+                formula = conjunction(*implicants[0])
+            else:
+                middle = len(implicants) // 2
+                formula = Formula('|', disjunction(implicants[:middle]),
+                                  disjunction(implicants[middle:]))
+            disjunctions[implicants] = formula
+        return disjunctions[implicants]
+
+    formulae = []
+    for implicants in implicant_lists:
+        implicants = tuple(implicants)
+        if len(implicants) == 0:
+            formulae.append(contradiction)
+        elif any(mask == 0 for mask, _ in implicants):
+            formulae.append(tautology)
+        else:
+            formulae.append(disjunction(implicants))
+    return formulae
+
+def shannon_formula(variables: Sequence[str], bits: int) -> Formula:
+    """Converts the given packed truth table into a formula by recursive
+    Shannon decomposition on the given variables in order, sharing the formula
+    of each distinct cofactor.
+
+    Parameters:
+        variables: the variables of the truth table.
+        bits: truth table over the given variables as returned by
+            `truth_vector_bits`.
+
+    Returns:
+        A formula of depth proportional to the number of given variables,
+        combining the formulae of the two cofactors of each variable by ``&``,
+        ``|`` and ``~``, or a constant for a constant table. The work and the
+        number of distinct subformulae are proportional to the number of
+        distinct cofactors of the table, rather than to its size.
+
+    Examples:
+        >>> shannon_formula(['p', 'q', 'r'], 0b11101000)
+        ((p&(q|r))|(~p&(q&r)))
+    """
+    count = len(variables)
+    literals = [(Formula(variable), Formula('~', Formula(variable)))
+                for variable in variables]
+    constants = [Formula('F'), Formula('T')]
+    cofactors = {}
+
+    def decompose(level: int, bits: int) -> Formula:
+        # The table over the variables from the given level onwards, whose
+        # first variable splits it into a low and a high half.
+        size = 1 << (count - level)
+        if bits == 0 or bits == (1 << size) - 1:
+            return constants[bits & 1]
+        if (level, bits) in cofactors:
+            return cofactors[level, bits]
+        half = size >> 1
+        low, high = bits & ((1 << half) - 1), bits >> half
+        positive, negative = literals[level]
+        if low == high:
+            formula = decompose(level + 1, low)
+        elif low == 0 and high == (1 << half) - 1:
+            formula = positive
+        elif high == 0 and low == (1 << half) - 1:
+            formula = negative
+        elif low == 0:
+            formula = Formula('&', positive, decompose(level + 1, high))
+        elif high == 0:
+            formula = Formula('&', negative, decompose(level + 1, low))
+        elif high == (1 << half) - 1:
+            formula = Formula('|', positive, decompose(level + 1, low))
+        elif low == (1 << half) - 1:
+            formula = Formula('|', negative, decompose(level + 1, high))
+        else:
+            formula = Formula('|',
+                              Formula('&', positive,
+                                      decompose(level + 1, high)),
+                              Formula('&', negative,
+                                      decompose(level + 1, low)))
+        cofactors[level, bits] = formula
+        return formula
+
+    assert 0 <= bits < 1 << (1 << count)
+    return decompose(0, bits)
+
+def dnf_statistics(count: int, implicants: Iterable[Implicant]) \
+        -> Dict[str, int]:
+    """Measures the formula that `dnf_formula` converts the given product
+    terms into.
+
+    Parameters:
+        count: the number of variables of the terms.
+        implicants: product terms over that number of variables.
+
+    Returns:
+        A dictionary with the number of ``'terms'``, the number of
+        ``'literals'``, and the ``'size'``, that is the number of operators and
+        variable occurrences, of the formula.
+    """
+    terms = literals = size = 0
+    for mask, value in implicants:
+        length = bin(mask).count('1')
+        terms += 1
+        literals += length
+        size += 2 * length - 1 + bin(mask & ~value).count('1')
+    if terms == 0:
+        return {'terms': 1, 'literals': 2, 'size': 4}
+    if literals == 0:
+        return {'terms': 2, 'literals': 2, 'size': 4}
+    return {'terms': terms, 'literals': literals, 'size': size + terms - 1}
@@ -7,12 +7,11 @@
 
 from typing import List, Union
 
-from logic_utils import frozendict
-
 from syntax import *
 from proofs import *
 from deduction import *
 from semantics import *
+from sat import *
 # from propositions.operators import *
 from axiomatic_systems import *
 
@@ -187,7 +186,7 @@ def reduce_assumption(proof_from_affirmation: Proof,
                  AXIOMATIC_SYSTEM,
                  proof_lines + [line_r, line_mp1, line_mp2])
 
-def prove_tautology(tautology: Formula, model: Model = frozendict()) -> Proof:
+def prove_tautology(tautology: Formula, model: Model = FrozenModel()) -> Proof:
     """Proves the given tautology from the formulae that capture the given
     model.
 
@@ -220,9 +219,9 @@ def prove_tautology(tautology: Formula, model: Model = frozendict()) -> Proof:
     for variable in sorted_vars:
         if variable not in model.keys():
             model[variable] = True
-            model_t = model.copy()
+            model_t = FrozenModel(model)
             model[variable] = False
-            model_f = model.copy()
+            model_f = FrozenModel(model)
             proof_t = prove_tautology(tautology, model_t)
             proof_f = prove_tautology(tautology, model_f)
             res_proof = reduce_assumption(proof_t, proof_f)
@@ -325,12 +324,11 @@ def model_or_inconsistency(formulae: List[Formula]) -> Union[Model, Proof]:
         assert formula.operators().issubset({'->', '~'})
     # Task 6.5
     formulae = list(formulae)
-    new_formula = formulae[0]
-    for formula in formulae[1:]:
-        new_formula = Formula('&', new_formula, formula)
-    for model in all_models(list(new_formula.variables())):
-        if evaluate(new_formula, model):
-            return model
+    session = SolverSession()
+    for formula in formulae:
+        session.add(formula)
+    if session.check():
+        return session.model()
     return prove_sound_inference(InferenceRule(formulae, Formula.parse('~(p->p)')))
 
 def prove_in_model_full(formula: Formula, model: Model) -> Proof:
@@ -0,0 +1,92 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/bdd_test.py
+
+"""Tests for the propositions.bdd module."""
+
+from propositions.syntax import *
+from propositions.semantics import *
+from propositions.bdd import *
+
+FORMULAE = ['~(p&q7)', '(x|~x)', '~(x|~x)', '(p->q)', '(T->F)', '(F|T)',
+            '((x->y)&((y->z)&(x&~z)))', '~((x->y)&((y->z)&(x&~z)))',
+            '(x<->~~x)', '(F-&T)', '(x-|x)', '((x-&y)<->(~x|~y))',
+            '((p+q)&((q+r)&(p+r)))', '((p<->(q+r))&~(p-|(r->q)))']
+
+def test_from_formula(debug=False):
+    manager = BDD()
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the diagram of', formula)
+        node = manager.from_formula(formula)
+        variables = sorted(formula.variables())
+        assert (node == BDD.TRUE) == is_tautology(formula)
+        assert (node == BDD.FALSE) == is_contradiction(formula)
+        model = manager.model(node)
+        assert (model is None) == (node == BDD.FALSE)
+        if model is not None:
+            model = {v: model.get(v, False) for v in variables}
+            assert compile_formula(formula)(model)
+        back = manager.to_formula(node)
+        assert back.variables().issubset(formula.variables())
+        assert manager.from_formula(back) == node
+        assert truth_table_bits(back, variables) == \
+               truth_table_bits(formula, variables)
+
+def test_canonicity(debug=False):
+    manager = BDD(['x', 'y', 'z'])
+    for first,second,equivalent in [
+            ['(x->y)', '(~x|y)', True],
+            ['(x-&y)', '(~x|~y)', True],
+            ['(x<->y)', '~(x+y)', True],
+            ['(x-|y)', '(~x&~y)', True],
+            ['((x&y)|(x&z))', '(x&(y|z))', True],
+            ['(x->y)', '(y->x)', False],
+            ['(x+y)', '(x|y)', False]]:
+        if debug:
+            print('Testing whether', first, 'and', second, 'share a node')
+        assert (manager.from_formula(Formula.parse(first)) ==
+                manager.from_formula(Formula.parse(second))) == equivalent
+
+def test_restrict_compose_quantify(debug=False):
+    manager = BDD()
+    node = manager.from_formula(Formula.parse('((x&y)|(~x&z))'))
+    if debug:
+        print('Testing restriction, composition and quantification')
+    assert manager.restrict(node, {'x': True}) == manager.variable('y')
+    assert manager.restrict(node, {'x': False}) == manager.variable('z')
+    assert manager.restrict(node, {'x': True, 'y': False}) == BDD.FALSE
+    assert manager.restrict(node, {'w': True}) == node
+    assert manager.compose(node, 'x', BDD.TRUE) == manager.variable('y')
+    assert manager.compose(node, 'y', manager.variable('z')) == \
+           manager.variable('z')
+    assert manager.compose(node, 'x', manager.variable('y')) == \
+           manager.from_formula(Formula.parse('(y|z)'))
+    assert manager.exists(node, ['x']) == \
+           manager.from_formula(Formula.parse('(y|z)'))
+    assert manager.forall(node, ['x']) == \
+           manager.from_formula(Formula.parse('(y&z)'))
+    assert manager.exists(node, ['x', 'y', 'z']) == BDD.TRUE
+    assert manager.forall(node, ['y', 'z']) == BDD.FALSE
+
+def test_computed_size(debug=False):
+    managers = [BDD(), BDD(computed_size=1), BDD(computed_size=7)]
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the diagram of', formula, 'with small computed',
+                  'tables')
+        nodes = [manager.from_formula(formula) for manager in managers]
+        for manager, node in zip(managers, nodes):
+            assert manager.to_formula(node) == \
+                   managers[0].to_formula(nodes[0])
+    assert [len(manager) for manager in managers[1:]] == \
+           [len(managers[0])] * 2
+
+def test_all(debug=False):
+    test_from_formula(debug)
+    test_canonicity(debug)
+    test_restrict_compose_quantify(debug)
+    test_computed_size(debug)
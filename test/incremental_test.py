@@ -0,0 +1,131 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/incremental_test.py
+
+"""Tests for the propositions.incremental module."""
+
+from random import Random
+
+from propositions.syntax import *
+from propositions.semantics import *
+from propositions.incremental import *
+
+FORMULAE = ['~(p&q7)', '(x|~x)', '~(x|~x)', '(p->q)', '(T->F)', '(F|T)', 'p',
+            '((x->y)&((y->z)&(x&~z)))', '~((x->y)&((y->z)&(x&~z)))',
+            '(x<->~~x)', '(F-&T)', '(x-|x)', '((x-&y)<->(~x|~y))',
+            '((p+q)&((q+r)&(p+r)))', '((p<->(q+r))&~(p-|(r->q)))']
+
+def test_node_parents(debug=False):
+    for infix,parents in [
+            ['p', [[]]],
+            ['(p&p)', [[1], []]],
+            ['((p&q)|~p)', [[2, 3], [2], [4], [4], []]],
+            ['((p|q)->~(p|q))', [[2], [2], [3, 4], [4], []]]]:
+        if debug:
+            print('Testing the parents of the nodes of', infix)
+        assert node_parents(formula_nodes(Formula.parse(infix))) == parents
+
+def test_propagate_flip(debug=False):
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        nodes = formula_nodes(formula)
+        parents = node_parents(nodes)
+        for model in all_models(sorted(formula.variables())):
+            for position, (root, _, _) in enumerate(nodes):
+                if not is_variable(root):
+                    continue
+                if debug:
+                    print('Testing the flip of', root, 'in', formula, 'in',
+                          model)
+                values = node_values(nodes, model)
+                evaluated = propagate_flip(nodes, parents, values, position)
+                assert values == node_values(nodes,
+                                             dict(model, **{root: not
+                                                            model[root]}))
+                cone = {position}
+                for current in range(position + 1, len(nodes)):
+                    if nodes[current][1] in cone or nodes[current][2] in cone:
+                        cone.add(current)
+                assert evaluated <= len(cone) - 1
+
+    # Flipping a variable of one of many clauses re-evaluates only its clause
+    # and the conjunctions above it.
+    clauses = [Formula('|', Formula('x' + str(index)),
+                       Formula('~', Formula('y' + str(index))))
+               for index in range(100)]
+    formula = clauses[0]
+    for clause in clauses[1:]:
+        formula = Formula('&', clause, formula)
+    if debug:
+        print('Testing the flip of a variable in a conjunction of',
+              len(clauses), 'clauses')
+    nodes = formula_nodes(formula)
+    values = node_values(nodes, dict.fromkeys(formula.variables(), True))
+    position = nodes.index(('x99', -1, -1))
+    assert propagate_flip(nodes, node_parents(nodes), values, position) == 2
+    assert not values[-1]
+
+def test_gray_code_truth_values(debug=False):
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        for variables in [sorted(formula.variables()),
+                          sorted(formula.variables() | {'z', 'p1'})]:
+            if debug:
+                print('Testing the Gray-code truth values of', formula,
+                      'over', variables)
+            evaluator = compile_formula(formula)
+            assert list(gray_code_truth_values(formula, variables)) == \
+                   [evaluator(model)
+                    for model in all_models(variables, gray=True)]
+
+def test_incremental_evaluator(debug=False):
+    formulae = [Formula.parse(infix) for infix in FORMULAE]
+    variables = sorted(set().union(*(formula.variables()
+                                     for formula in formulae)))
+    evaluators = [compile_formula(formula) for formula in formulae]
+    generator = Random(0)
+    for initial in [None, {variable: True for variable in variables}]:
+        evaluator = IncrementalEvaluator(formulae, initial)
+        model = initial or dict.fromkeys(variables, False)
+        values = [evaluate(model) for evaluate in evaluators]
+        assert len(evaluator) == len(formulae)
+        assert evaluator.truth_values() == values
+        for _ in range(200):
+            sampled = generator.sample(variables, generator.randint(1, 3))
+            changes = {variable: generator.random() < 0.5
+                       for variable in sampled}
+            if debug:
+                print('Testing the incremental update of', changes)
+            changed = evaluator.update(changes)
+            model.update(changes)
+            previous, values = values, [evaluate(model)
+                                        for evaluate in evaluators]
+            assert evaluator.model == model
+            assert evaluator.truth_values() == values
+            assert [evaluator.value(index) for index in range(len(formulae))] \
+                   == values
+            assert changed == [index for index in range(len(formulae))
+                               if previous[index] != values[index]]
+
+    # Each event re-evaluates only the nodes above the changed variable,
+    # however many other formulae there are.
+    formulae = [Formula('&', Formula('x' + str(index)),
+                        Formula('|', Formula('y'), Formula('x' + str(index))))
+                for index in range(1000)]
+    if debug:
+        print('Testing the cost of updates to', len(formulae), 'formulae')
+    evaluator = IncrementalEvaluator(formulae)
+    assert len(evaluator.nodes) == 3 * len(formulae) + 1
+    assert evaluator.update({'x500': True, 'z': True}) == [500]
+    assert evaluator.evaluations == 2
+    assert evaluator.update({'x500': True}) == []
+    assert evaluator.evaluations == 2
+    assert evaluator.update({'y': True}) == []
+    assert evaluator.evaluations == 2 + 1000 + 999
+
+def test_all(debug=False):
+    test_node_parents(debug)
+    test_propagate_flip(debug)
+    test_gray_code_truth_values(debug)
+    test_incremental_evaluator(debug)
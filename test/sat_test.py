@@ -0,0 +1,228 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/sat_test.py
+
+"""Tests for the propositions.sat module."""
+
+from propositions.syntax import *
+from propositions.semantics import *
+from propositions.sat import *
+
+FORMULAE = ['~(p&q7)', '(x|~x)', '~(x|~x)', '(p->q)', '(T->F)', '(F|T)',
+            '((y1|~y1)&T)', '((x->y)&((y->z)&(x&~z)))',
+            '~((x->y)&((y->z)&(x&~z)))', '(x<->~~x)', '(F-&T)',
+            '((y1+~y1)&T)', '(x-|x)', '((x-&y)<->(~x|~y))',
+            '((p+q)&((q+r)&(p+r)))', '((p<->(q+r))&~(p-|(r->q)))']
+
+def test_to_cnf(debug=False):
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the clause form of', formula)
+        clauses, numbers = to_cnf(formula)
+        assert sorted(numbers) == sorted(formula.variables())
+        assert sorted(numbers.values()) == list(range(1, len(numbers) + 1))
+        # Every model of the formula must extend to exactly one model of the
+        # clauses, and no other model of the variables may extend at all.
+        count = max(abs(literal) for clause in clauses for literal in clause)
+        auxiliary = count - len(numbers)
+        for model in all_models(sorted(numbers)):
+            extensions = 0
+            for extension in all_models(['z' + str(i) for i in
+                                         range(auxiliary)]):
+                values = [None] + [model[v] for v in sorted(numbers,
+                                                key=numbers.get)] + \
+                         list(extension.values())
+                if all(any(values[literal] if literal > 0 else
+                           not values[-literal] for literal in clause)
+                       for clause in clauses):
+                    extensions += 1
+            assert extensions == (1 if compile_formula(formula)(model) else 0)
+
+def test_dpll(debug=False):
+    for clauses,count,satisfiable in [
+            [[], 0, True],
+            [[()], 1, False],
+            [[(1,), (-1,)], 1, False],
+            [[(1, 2), (-1, 2), (1, -2), (-1, -2)], 2, False],
+            [[(1, 2), (-1, 2), (1, -2)], 2, True],
+            [[(1, -2, 3), (-1, 2), (2, -3), (-2, -3)], 3, True]]:
+        if debug:
+            print('Testing DPLL on', clauses)
+        solution = dpll(clauses, count)
+        assert (solution is not None) == satisfiable
+        if solution is not None:
+            assert all(any(solution[literal] if literal > 0 else
+                           not solution[-literal] for literal in clause)
+                       for clause in clauses)
+
+def test_dpll_model(debug=False):
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing DPLL satisfiability of', formula)
+        model = dpll_model(formula)
+        assert (model is not None) == (truth_table_bits(formula) != 0)
+        if model is not None:
+            assert sorted(model) == sorted(formula.variables())
+            assert compile_formula(formula)(model)
+
+def test_count_solutions(debug=False):
+    for clauses,count,solutions in [
+            [[], 0, 1],
+            [[], 3, 8],
+            [[()], 1, 0],
+            [[(1,), (-1,)], 1, 0],
+            [[(1, 2)], 2, 3],
+            [[(1, 2)], 4, 12],
+            [[(1, -1)], 1, 2],
+            [[(1, 2), (3, 4)], 4, 9],
+            [[(1, 2), (-1, 2), (1, -2)], 2, 1],
+            [[(1, -2, 3), (-1, 2), (2, -3), (-2, -3)], 3, 2]]:
+        if debug:
+            print('Testing model counting of', clauses)
+        assert count_solutions(clauses, count) == solutions
+
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing model counting of the clause form of', formula)
+        clauses, numbers = to_cnf(formula)
+        count = max(abs(literal) for clause in clauses for literal in clause)
+        expected = bin(truth_table_bits(formula, sorted(numbers))).count('1')
+        assert count_solutions(clauses, count, len(numbers)) == expected
+        assert count_solutions(clauses, count) == expected
+
+    count = 200
+    if debug:
+        print('Testing model counting of a chain of', count, 'variables')
+    clauses = [(i, i + 1, -(i + 2)) for i in range(1, count - 1)]
+    # The number of models of the first clauses, by the values of their last
+    # two variables.
+    counts = {(first, second): 1 for first in (False, True)
+              for second in (False, True)}
+    for _ in range(count - 2):
+        successors = dict.fromkeys(counts, 0)
+        for (first, second), number in counts.items():
+            for third in (False, True):
+                if first or second or not third:
+                    successors[(second, third)] += number
+        counts = successors
+    assert count_solutions(clauses, count) == sum(counts.values())
+
+def test_luby(debug=False):
+    if debug:
+        print('Testing the Luby sequence')
+    assert [luby(index) for index in range(15)] == \
+           [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+def test_cdcl_solver(debug=False):
+    for clauses,count,satisfiable in [
+            [[], 0, True],
+            [[()], 1, False],
+            [[(1,), (-1,)], 1, False],
+            [[(1, 2), (-1, 2), (1, -2), (-1, -2)], 2, False],
+            [[(1, 2), (-1, 2), (1, -2)], 2, True],
+            [[(1, -2, 3), (-1, 2), (2, -3), (-2, -3)], 3, True]]:
+        if debug:
+            print('Testing CDCL on', clauses)
+        solver = CDCLSolver(clauses, count)
+        assert solver.solve() == satisfiable
+        if satisfiable:
+            assert all(any(solver.model[literal] if literal > 0 else
+                           not solver.model[-literal] for literal in clause)
+                       for clause in clauses)
+
+    # The pigeonhole principle for 6 pigeons and 5 holes requires many
+    # conflicts, restarts and learned-clause deletions to refute.
+    pigeons, holes = 6, 5
+    variable = lambda pigeon, hole: pigeon * holes + hole + 1
+    clauses = [tuple(variable(pigeon, hole) for hole in range(holes))
+               for pigeon in range(pigeons)]
+    for hole in range(holes):
+        for first in range(pigeons):
+            for second in range(first + 1, pigeons):
+                clauses.append((-variable(first, hole),
+                                -variable(second, hole)))
+    solver = CDCLSolver(clauses, pigeons * holes)
+    if debug:
+        print('Testing CDCL on the pigeonhole principle')
+    assert not solver.solve()
+    statistics = solver.statistics()
+    assert statistics['conflicts'] == solver.conflicts > 0
+    assert statistics['propagations'] > 0
+    assert statistics['propagations_per_second'] > 0
+    assert not solver.solve()
+
+    solver = CDCLSolver([(1, 2)], 2)
+    assert solver.solve()
+    assert solver.add_clause((-1,))
+    assert solver.solve() and solver.model[1:] == [False, True]
+    assert not solver.add_clause((-2,))
+    assert not solver.solve()
+
+def test_cdcl_model(debug=False):
+    for infix in FORMULAE:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing CDCL satisfiability of', formula)
+        model = cdcl_model(formula)
+        assert (model is not None) == (truth_table_bits(formula) != 0)
+        if model is not None:
+            assert sorted(model) == sorted(formula.variables())
+            assert compile_formula(formula)(model)
+
+    if debug:
+        print('Testing the statistics of CDCL satisfiability checks')
+    formula = Formula.parse('((p+q)&((q+r)&(p+r)))')
+    assert not is_satisfiable(formula, 'cdcl')
+    clauses, numbers = to_cnf(formula)
+    assert 0 < CDCL_STATISTICS['clauses'] <= len(clauses)
+    assert CDCL_STATISTICS['propagations'] > 0
+    assert is_satisfiable(Formula.parse('(p|q)'), 'cdcl')
+    assert CDCL_STATISTICS['variables'] >= 2
+    assert CDCL_STATISTICS['conflicts'] == 0
+
+def test_solver_session(debug=False):
+    session = SolverSession()
+    assert session.add(Formula.parse('(p->q)'))
+    assert session.add(Formula.parse('(q->r)'))
+    if debug:
+        print('Testing entailment in a solver session')
+    assert session.entails(Formula.parse('(p->r)'))
+    assert not session.entails(Formula.parse('r'))
+    assert not session.model()['r']
+    assert session.check([Formula.parse('p')])
+    assert session.model()['r']
+    assert not session.check([Formula.parse('p'), Formula.parse('~r')])
+    assert session.check()
+
+    if debug:
+        print('Testing scopes of a solver session')
+    session.push()
+    session.add(Formula.parse('p'))
+    assert session.entails(Formula.parse('r'))
+    session.push()
+    session.add(Formula.parse('~q'))
+    assert not session.check()
+    session.pop()
+    assert session.check()
+    assert session.entails(Formula.parse('q'))
+    session.pop()
+    assert not session.entails(Formula.parse('q'))
+    assert session.check([Formula.parse('(F|~r)')])
+    assert not session.check([Formula.parse('(T&F)')])
+
+    assert not session.add(Formula.parse('(p&~p)'))
+    assert not session.check()
+
+def test_all(debug=False):
+    test_to_cnf(debug)
+    test_dpll(debug)
+    test_dpll_model(debug)
+    test_count_solutions(debug)
+    test_luby(debug)
+    test_cdcl_solver(debug)
+    test_cdcl_model(debug)
+    test_solver_session(debug)
@@ -5,6 +5,13 @@
 
 """Tests for the propositions.semantics module."""
 
+from functools import lru_cache
+from io import BytesIO, StringIO
+import json
+from multiprocessing import active_children
+import sys
+import tracemalloc
+
 from logic_utils import frozendict
 
 from propositions.syntax import *
@@ -64,6 +71,32 @@ def test_all_models(debug=False):
             print('Testing all models over', variables)
         assert list(all_models(variables)) == models
 
+def test_all_models_packed(debug=False):
+    for variables in [('p', 'q'), ['x'], ('r1', 'r12', 'p37')]:
+        if debug:
+            print('Testing all packed models over', variables)
+        models = list(all_models(variables))
+        packed = list(all_models(variables, packed=True))
+        assert packed == models
+        for index, model in enumerate(packed):
+            assert type(model) is BitModel
+            assert model.bits == index
+            assert list(model) == list(variables)
+            assert is_model(model)
+        gray = list(all_models(variables, gray=True))
+        assert sorted(gray, key=lambda model: models.index(model)) == models
+        for previous, model in zip(gray, gray[1:]):
+            assert sum(previous[v] != model[v] for v in variables) == 1
+        assert list(all_models(variables, packed=True, gray=True)) == gray
+
+    formula = Formula.parse('((x->y)&(~x->z))')
+    for model in all_models(('z', 'x', 'y'), packed=True):
+        if debug:
+            print('Testing evaluation of formula', formula, 'in packed model',
+                  model)
+        assert evaluate(formula, model) == (model['y'] if model['x'] else
+                                            model['z'])
+
 def test_truth_values(debug=False):
     for infix,variables,values in [
             ['~(p&q7)', ('p', 'q7'), [True, True, True, False]],
@@ -408,6 +441,795 @@ def test_is_tautology_all_operators(debug=False):
             print('Testing whether', formula, 'is a tautology')
         assert is_tautology(formula) == tautology
 
+def test_compile_formula(debug=False):
+    for infix,models_values in [
+            ['~(p&q7)', [({'p': True,  'q7': False}, True),
+                         ({'p': True,  'q7': True},  False)]],
+            ['((x->y)&(~x->z))',
+             [({'x': True,  'y': False, 'z': True},  False),
+              ({'x': False, 'y': False, 'z': True},  True),
+              ({'x': True,  'y': True,  'z': False}, True)]],
+            ['(T&p)', [({'p': True}, True), ({'p': False}, False)]],
+            ['(F|p)', [({'p': True}, True), ({'p': False}, False)]],
+            ['~(p<->q7)', [({'p': True,  'q7': False}, True),
+                           ({'p': False, 'q7': False}, False)]],
+            ['(p+q7)', [({'p': True,  'q7': False}, True),
+                        ({'p': True,  'q7': True},  False)]],
+            ['~((x-&x)-|(y-&y))', [({'x': True,  'y': False}, True),
+                                   ({'x': False, 'y': False}, True),
+                                   ({'x': True,  'y': True},  False)]]]:
+        formula = Formula.parse(infix)
+        variables = tuple(sorted(formula.variables()))
+        for model,value in models_values:
+            if debug:
+                print('Testing compiled evaluation of formula', formula,
+                      'in model', model)
+            assert compile_formula(formula)(frozendict(model)) == value
+            values = tuple(model[v] for v in variables)
+            assert compile_formula(formula, variables)(values) == value
+            assert formula_closure(formula)(frozendict(model)) == value
+
+    deep = Formula.parse('p')
+    for i in range(2 * MAX_COMPILED_SOURCE_DEPTH):
+        deep = Formula('~', deep) if i % 2 == 0 else \
+               Formula('&', Formula('p'), deep)
+    if debug:
+        print('Testing compiled evaluation of a formula of depth',
+              formula_depth(deep))
+    assert compile_formula(deep)(frozendict({'p': True})) is True
+    assert compile_formula(deep, ('p',))((False,)) is False
+
+    if debug:
+        print('Testing short-circuit evaluation of compiled formulae')
+    assert formula_source(Formula.parse('((p&q)|~r)')) == \
+           '((p and q) or (not r))'
+    assert formula_source(Formula.parse('(p->q)')) == '(not p or q)'
+    # The closures must not look up the variables of operands that do not
+    # affect the result, so these models need not assign them at all.
+    assert formula_closure(Formula.parse('(F&x)'))({}) is False
+    assert formula_closure(Formula.parse('(p|x)'))({'p': True}) is True
+    assert formula_closure(Formula.parse('(p->x)'))({'p': False}) is True
+    assert compile_formula(Formula('&', Formula('F'), deep))({}) is False
+
+def test_truth_table_bits(debug=False):
+    for infix,variables,values in [
+            ['~(p&q7)', ('p', 'q7'), [True, True, True, False]],
+            ['(y|~x)',  ('y', 'x'),  [True, False, True, True]],
+            ['(p-|q)',  ('p', 'q'),  [True, False, False, False]],
+            ['(p<->q)', ('q', 'p'),  [True, False, False, True]],
+            ['(p+(q->r))', ('p', 'q', 'r'),
+             [True, True, False, True, False, False, True, False]],
+            ['(T-&F)',  ('p',),      [True, True]]]:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the bit-parallel truth table of', formula,
+                  'over', variables)
+        bits = truth_table_bits(formula, variables)
+        tvals = [bool((bits >> index) & 1) for index in range(len(values))]
+        assert tvals == values, \
+               'Expected ' + str(values) + '; got ' + str(tvals)
+        assert bits >> len(values) == 0
+
+    formula = Formula.parse('p1')
+    for index in range(2, MAX_BITWISE_VARIABLES + 3):
+        formula = Formula('|', formula, Formula('p' + str(index)))
+    if debug:
+        print('Testing whether a formula over', len(formula.variables()),
+              'variables is satisfiable and a tautology')
+    assert is_satisfiable(formula)
+    assert not is_tautology(formula)
+
+    # A chain of 400 gates keeps only a few intermediate tables alive.
+    variables = [Formula('x' + str(index)) for index in range(18)]
+    formula = variables[0]
+    for index in range(200):
+        formula = Formula('&' if index % 2 else '|', formula,
+                          Formula('+', variables[index % 18],
+                                  variables[(7 * index + 3) % 18]))
+    if debug:
+        print('Testing the memory of the truth table of a chain of gates')
+    tracemalloc.start()
+    try:
+        bits = truth_table_bits(formula)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 100 * sys.getsizeof(bits)
+    assert bits == truth_table_bits(formula, sorted(formula.variables()))
+
+def test_truth_values_batch(debug=False):
+    if numpy is None:
+        return
+    variables = ('x', 'z', 'y')
+    models = [model for model in all_models(variables)]
+    matrix = numpy.array([[model[v] for v in variables] for model in models])
+    for infix in ['~(x&y)', '((x->y)&(~x->z))', '(T&(x<->y))', '(F|~z)',
+                  '(x+(y-&(z-|x)))', '((x|y)&~(x|y))']:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the batch evaluation of', formula)
+        expected = [compile_formula(formula)(model) for model in models]
+        for chunk_size in [1, 3, 8]:
+            values = truth_values_batch(formula, matrix, variables, chunk_size)
+            assert values.dtype == bool
+            assert list(values) == expected
+
+def test_satisfiability_engines(debug=False):
+    for infix,tautology,satisfiable in [
+            ['~(p&q7)', False, True], ['(x|~x)', True, True],
+            ['(T->F)', False, False], ['((y1|~y1)&T)', True, True],
+            ['((x->y)&((y->z)&(x&~z)))', False, False],
+            ['(x<->~~x)', True, True], ['((x-&y)<->(~x|~y))', True, True],
+            ['(x-|x)', False, True], ['((p+q)&((q+r)&(p+r)))', False, False]]:
+        formula = Formula.parse(infix)
+        for engine in SATISFIABILITY_ENGINES:
+            if debug:
+                print('Testing', formula, 'with engine', engine)
+            assert is_tautology(formula, engine) == tautology
+            assert is_satisfiable(formula, engine) == satisfiable
+            assert is_contradiction(formula, engine) == (not satisfiable)
+            model = satisfying_model(formula, engine)
+            assert (model is not None) == satisfiable
+            if model is not None:
+                assert compile_formula(formula)(model)
+
+    if debug:
+        print('Testing the automatic choice of engines')
+    assert choose_engine(MAX_BITWISE_VARIABLES) == 'truth_table'
+    assert choose_engine(MAX_BITWISE_VARIABLES + 1) == 'bdd'
+    assert choose_engine(MAX_BDD_VARIABLES) == 'bdd'
+    assert choose_engine(MAX_BDD_VARIABLES + 1) == 'cdcl'
+    assert choose_engine(MAX_BDD_VARIABLES + 1, 'kleene') == 'kleene'
+    variables = [Formula('x' + str(index))
+                 for index in range(MAX_BITWISE_VARIABLES + 6)]
+    formula = variables[0]
+    for first, second in zip(variables, variables[1:]):
+        formula = Formula('&', formula, Formula('<->', first, second))
+    assert satisfying_model(formula) == \
+           dict.fromkeys(formula.variables(), True)
+    assert not is_tautology(formula)
+
+    for assumptions,conclusion,sound in [
+            [[], '(~p|p)', True], [[], '(p|p)', False],
+            [['(~p|q)', 'p'], 'q', True], [['(p|q)', 'p'], 'q', False],
+            [['(p->q)', '(q->r)'], '(p->r)', True], [['x'], '(x&y)', False]]:
+        rule = InferenceRule(
+            [Formula.parse(assumption) for assumption in assumptions],
+            Formula.parse(conclusion))
+        for engine in SATISFIABILITY_ENGINES:
+            if debug:
+                print('Testing whether', rule, 'is sound with engine', engine)
+            assert is_sound_inference(rule, engine) == sound
+
+def test_sound_conclusions(debug=False):
+    assumptions = [Formula.parse(infix) for infix in ['(p->q)', '(q->r)']]
+    conclusions = ['(p->r)', 'r', '(~r->~p)', '(q|~q)', '(r->p)', '(p->(q&r))']
+    if debug:
+        print('Testing the conclusions', conclusions, 'of', assumptions)
+    assert sound_conclusions(assumptions, [Formula.parse(conclusion)
+                                           for conclusion in conclusions]) == \
+           [True, False, True, True, False, True]
+
+def test_count_models(debug=False):
+    for infix,variables,count in [
+            ['(p|q)', None, 3], ['(p|q)', ['p', 'q', 'r'], 6],
+            ['(x&~x)', None, 0], ['(T|p)', None, 2], ['F', None, 0],
+            ['T', None, 1], ['(p+(q+r))', None, 4], ['(p-|q)', ['q', 'p'], 1]]:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the number of models of', formula)
+        assert count_models(formula, variables) == count
+
+    pairs = 3 * MAX_BITWISE_VARIABLES
+    formula = Formula.parse('(x0|y0)')
+    for index in range(1, pairs):
+        formula = Formula('&', formula,
+                          Formula('|', Formula('x' + str(index)),
+                                  Formula('y' + str(index))))
+    if debug:
+        print('Testing the number of models of a formula over',
+              2 * pairs, 'variables')
+    assert count_models(formula) == 3 ** pairs
+    assert count_models(Formula('~', formula)) == 4 ** pairs - 3 ** pairs
+
+def test_cube_value(debug=False):
+    for infix,cube,value in [
+            ['(p&q)', {'p': False}, False], ['(p&q)', {'p': True}, None],
+            ['(p|q)', {'q': True}, True], ['(p->q)', {'p': False}, True],
+            ['(p->q)', {'q': False}, None], ['(p-&q)', {'q': False}, True],
+            ['(p-|q)', {'p': True}, False], ['(p+q)', {'p': True}, None],
+            ['(p<->q)', {'p': True, 'q': False}, False],
+            ['~(p&T)', {}, None], ['(p|~T)', {'p': False}, False],
+            ['((p&q)|(~p&q))', {'q': True}, None]]:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the value of', formula, 'in partial model', cube)
+        assert cube_value(formula_nodes(formula), cube) is value
+
+def test_iter_models(debug=False):
+    for infix in ['~(p&q7)', '(x|~x)', '~(x|~x)', '((x->y)&(~x->z))',
+                  '((p+q)|(r-&s))', '((p<->q)&(q-|r))', 'T', 'F']:
+        formula = Formula.parse(infix)
+        variables = sorted(formula.variables())
+        expected = [model for model in all_models(variables)
+                    if compile_formula(formula)(model)]
+        if debug:
+            print('Testing the enumeration of the models of', formula)
+        models = list(iter_models(formula))
+        assert len(models) == len(expected)
+        for model in models:
+            assert model in expected
+        cubes = list(iter_models(formula, partial=True))
+        assert sum(2 ** (len(variables) - len(cube)) for cube in cubes) == \
+               len(expected)
+        for cube in cubes:
+            assert cube_value(formula_nodes(formula), cube) is True
+        assert len(list(iter_models(formula, limit=1))) == \
+               min(1, len(expected))
+
+    formula = Formula.parse('(z|(x0&y0))')
+    for index in range(1, 40):
+        formula = Formula('&', formula, Formula('|', Formula('x' + str(index)),
+                                                Formula('y' + str(index))))
+    if debug:
+        print('Testing the enumeration of models over', 81, 'variables')
+    models = list(iter_models(formula, limit=100))
+    assert len(models) == 100
+    assert all(compile_formula(formula)(model) for model in models)
+    cube = next(iter(iter_models(formula, partial=True)))
+    assert len(cube) < len(formula.variables())
+
+def test_truth_table_cache(debug=False):
+    cache = TruthTableCache()
+    formulae = [Formula.parse(infix) for infix in
+                ['~(p&q7)', '(y|~x)', '(p+(q->r))']]
+    if debug:
+        print('Testing hits and misses of a truth table cache')
+    for formula in formulae + formulae:
+        variables = sorted(formula.variables())
+        assert cache.lookup(formula, variables) == \
+               truth_table_bits(formula, variables)
+    assert (cache.hits, cache.misses, len(cache)) == (3, 3, 3)
+    assert cache.statistics()['hit_rate'] == 0.5
+    assert cache.lookup(Formula.parse('(p+(q->r))'), ['p', 'q', 'r']) == \
+           truth_table_bits(formulae[2])
+    assert cache.hits == 4
+
+    if debug:
+        print('Testing eviction from a truth table cache')
+    size = cache.size
+    cache.resize(size - 1)
+    assert len(cache) == 2 and cache.evictions == 1 and cache.size < size
+    cache.lookup(formulae[0], ['p', 'q7'])
+    assert cache.misses == 4
+    cache.resize(0)
+    assert len(cache) == 0 and cache.size == 0
+    cache.lookup(formulae[0], ['p', 'q7'])
+    assert len(cache) == 0
+    cache.clear()
+    assert cache.statistics()['hits'] == cache.statistics()['misses'] == 0
+
+    if debug:
+        print('Testing that a truth table cache counts the size of its keys')
+    cache.resize(1 << 20)
+    cache.lookup(formulae[0], ['p', 'q7'])
+    assert cache.size == sys.getsizeof(truth_table_bits(formulae[0])) + \
+           sys.getsizeof(str(formulae[0]))
+    # A formula whose truth table is tiny but whose representation is large
+    # must not fit in a budget that only its table fits in.
+    formula = Formula.parse('p')
+    for _ in range(200):
+        formula = Formula('&', Formula('p'), formula)
+    cache.resize(cache.size + sys.getsizeof(truth_table_bits(formula)))
+    cache.lookup(formula, ['p'])
+    assert len(cache) == 1 and cache.evictions == 0
+
+    formula = Formula.parse('((x->y)&(~x->z))')
+    TRUTH_TABLE_CACHE.clear()
+    is_satisfiable(formula)
+    is_tautology(formula)
+    count_models(formula)
+    assert TRUTH_TABLE_CACHE.misses == 1 and TRUTH_TABLE_CACHE.hits == 2
+    models = list(all_models(('x', 'y', 'z'), packed=True))
+    assert truth_values(formula, models) == \
+           truth_values(formula, [dict(model) for model in models])
+
+def test_write_truth_table(debug=False):
+    formula = Formula.parse('~(p&q76)')
+    if debug:
+        print('Testing Markdown truth table of', formula, 'to text and binary')
+    table = '| p | q76 | ~(p&q76) |\n' \
+            '|---|-----|----------|\n' \
+            '| F | F   | T        |\n' \
+            '| F | T   | T        |\n' \
+            '| T | F   | T        |\n' \
+            '| T | T   | F        |\n'
+    stream = StringIO()
+    write_truth_table(formula, stream)
+    assert stream.getvalue() == table
+    stream = BytesIO()
+    write_truth_table(formula, stream)
+    assert stream.getvalue() == table.encode('ascii')
+
+    for infix in ['(p->q)', 'T', '((x1&~x12)|(x3+(x0->x11)))']:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing CSV and packed truth tables of', formula)
+        variables = sorted(formula.variables())
+        stream = StringIO()
+        write_truth_table(formula, stream, 'csv')
+        rows = stream.getvalue().splitlines()
+        assert rows[0] == ','.join(variables + [infix])
+        assert len(rows) == 1 + 2 ** len(variables)
+        for row, model in zip(rows[1:], all_models(variables)):
+            values = [model[variable] for variable in variables] + \
+                     [evaluate(formula, model)]
+            assert row == ','.join('T' if value else 'F' for value in values)
+        stream = BytesIO()
+        write_truth_table(formula, stream, 'packed')
+        assert int.from_bytes(stream.getvalue(), 'little') == \
+               truth_table_bits(formula)
+
+def test_synthesize_minimal(debug=False):
+    for variables,values,infix in [
+            [['p', 'q'], [True, True, True, False], '(~q|~p)'],
+            [['p', 'q', 'r'], [False, True, False, True,
+                               False, True, True, True], '(r|(p&q))'],
+            [['x'], [False, False], '(x&~x)'],
+            [['x', 'y'], [True] * 4, '(x|~x)']]:
+        if debug:
+            print('Testing minimal synthesis of', values, 'over', variables)
+        formula = synthesize_minimal(variables, values)
+        assert str(formula) == infix
+        assert truth_values(formula, all_models(variables)) == values
+
+    variables = ['x' + str(index) for index in range(14)]
+    values = [index % 3 == 0 or bin(index).count('1') > 10
+              for index in range(1 << 14)]
+    if debug:
+        print('Testing minimal synthesis over', variables)
+    formula = synthesize_minimal(variables, values)
+    assert truth_table_bits(formula, variables) == \
+           sum(1 << index for index, value in enumerate(values) if value)
+    report = synthesis_report(variables, values)
+    assert report['naive_terms'] == values.count(True)
+    assert report['terms'] < report['naive_terms']
+    assert report['size'] < report['naive_size']
+
+def test_synthesize_many(debug=False):
+    variables = ['x0', 'x1', 'y0', 'y1']
+    # The bits of the sum and of the product of two 2-bit numbers.
+    tables = [[((index >> 2) + (index & 3)) >> bit & 1 == 1
+               for index in range(16)] for bit in range(3)] + \
+             [[((index >> 2) * (index & 3)) >> bit & 1 == 1
+               for index in range(16)] for bit in range(4)]
+    if debug:
+        print('Testing synthesis of', len(tables), 'formulae over', variables)
+    formulae = synthesize_many(variables, tables)
+    assert len(formulae) == len(tables)
+    for formula, values in zip(formulae, tables):
+        assert truth_values(formula, all_models(variables)) == values
+
+    def subformulae(formula, seen):
+        if id(formula) not in seen:
+            seen.add(id(formula))
+            for operand in ['first', 'second']:
+                if hasattr(formula, operand):
+                    subformulae(getattr(formula, operand), seen)
+        return seen
+
+    shared = set()
+    for formula in formulae:
+        subformulae(formula, shared)
+    assert len(shared) < sum(len(subformulae(synthesize_minimal(variables,
+                                                                values),
+                                             set()))
+                             for values in tables)
+
+def test_synthesize_packed(debug=False):
+    variables = ['p', 'q', 'r']
+    values = [True, False, True, True, False, False, False, True]
+    for vector in [0b10001101, b'\x8d']:
+        if debug:
+            print('Testing synthesis of', vector, 'over', variables)
+        for formula in [synthesize(variables, vector),
+                        synthesize_minimal(variables, vector),
+                        synthesize_shannon(variables, vector)]:
+            assert truth_values(formula, all_models(variables)) == values
+        assert synthesis_report(variables, vector) == \
+               synthesis_report(variables, values)
+
+    variables = ['x' + str(index) for index in range(18)]
+    formula = Formula.parse('((x1+x17)|((x3&~x10)->(x5<->x16)))')
+    bits = truth_table_bits(formula, variables)
+    if debug:
+        print('Testing Shannon synthesis of', formula, 'over', variables)
+    synthesized = synthesize_shannon(variables, bits)
+    assert truth_table_bits(synthesized, variables) == bits
+    assert synthesized.variables() == formula.variables()
+
+def test_equivalent(debug=False):
+    for first,second,same in [
+            ['(p->q)', '(~q->~p)', True],
+            ['(p->q)', '(q->p)', False],
+            ['(x-&y)', '(~x|~y)', True],
+            ['((x+y)+z)', '(x+(y+z))', True],
+            ['(x|y)', '(x|(y&z))', False],
+            ['(p&~p)', 'F', True],
+            ['T', 'q', False],
+            ['x', 'x', True]]:
+        first, second = Formula.parse(first), Formula.parse(second)
+        for engine in SATISFIABILITY_ENGINES:
+            if debug:
+                print('Testing equivalence of', first, 'and', second,
+                      'by the', engine, 'engine')
+            assert equivalent(first, second, engine) == same
+            model = distinguishing_model(first, second, engine)
+            assert (model is None) == same
+            if model is not None:
+                assert set(model) == first.variables() | second.variables()
+                assert compile_formula(first)(model) != \
+                       compile_formula(second)(model)
+
+    # The conjunction of 40 implications, and its De Morgan dual.
+    variables = [Formula('x' + str(index)) for index in range(41)]
+    first = second = Formula('T')
+    for left, right in zip(variables, variables[1:]):
+        first = Formula('&', first, Formula('->', left, right))
+        second = Formula('~', Formula('|', Formula('~', second),
+                                      Formula('&', left, Formula('~', right))))
+    if debug:
+        print('Testing equivalence of formulae over', len(variables),
+              'variables')
+    assert equivalent(first, second)
+    third = Formula('&', second, Formula('|', variables[0], variables[40]))
+    model = distinguishing_model(first, third)
+    assert compile_formula(first)(model) and \
+           not compile_formula(third)(model)
+
+def test_inference_counter_model(debug=False):
+    for assumptions,conclusion,sound in [
+            [['(p->q)', '(q->r)'], '(p->r)', True],
+            [['(p|q)'], 'p', False],
+            [['p', '~p'], 'q', True],
+            [[], '(x|~x)', True],
+            [[], '(x&y)', False],
+            [['(x+y)', '(y+z)'], '(x+z)', False],
+            [['(x->y)', '~y'], '~x', True]]:
+        rule = InferenceRule([Formula.parse(assumption)
+                              for assumption in assumptions],
+                             Formula.parse(conclusion))
+        for engine in SATISFIABILITY_ENGINES:
+            if debug:
+                print('Testing the counter model of', rule, 'by the', engine,
+                      'engine')
+            model = inference_counter_model(rule, engine)
+            assert (model is None) == sound
+            if model is not None:
+                assert set(model) == rule.variables()
+                assert all(compile_formula(assumption)(model)
+                           for assumption in rule.assumptions)
+                assert not compile_formula(rule.conclusion)(model)
+        assert inference_formula(rule).variables() == rule.variables()
+        assert is_tautology(inference_formula(rule)) == sound
+
+def test_evaluate_inference_batch(debug=False):
+    if numpy is None:
+        return
+    variables = ('p', 'q', 'r')
+    models = list(all_models(variables))
+    matrix = numpy.array([[model[v] for v in variables] for model in models])
+    for assumptions,conclusion in [
+            [['(p->q)', '(q->r)'], '(p->r)'],
+            [['(p|q)'], 'p'],
+            [[], '(p&r)'],
+            [['q', '(p+r)', '~p'], '(r->q)']]:
+        rule = InferenceRule([Formula.parse(assumption)
+                              for assumption in assumptions],
+                             Formula.parse(conclusion))
+        if debug:
+            print('Testing the batch evaluation of', rule)
+        expected = [not all(compile_formula(assumption)(model)
+                            for assumption in rule.assumptions) or
+                    compile_formula(rule.conclusion)(model)
+                    for model in models]
+        assert list(evaluate_inference_batch(rule, matrix, variables, 3)) == \
+               expected
+        assert [evaluate_inference(rule, frozendict(model))
+                for model in models] == expected
+
+def test_model_cursor(debug=False):
+    for variables in [[], ['p'], ['p', 'q', 'r'], ['x' + str(index)
+                                                   for index in range(10)]]:
+        models = list(all_models(variables))
+        total = len(models)
+        if debug:
+            print('Testing the model cursors over', variables)
+        for start, stop in [(0, None), (0, 0), (total // 3, total),
+                            (1 if total > 1 else 0, total - total // 4)]:
+            cursor = all_models(variables, start=start, stop=stop)
+            assert len(cursor) == (total if stop is None else stop) - start
+            assert list(cursor) == models[start:stop]
+            assert len(cursor) == 0
+        for count in [1, 2, 3, 7]:
+            shards = [all_models(variables).shard(index, count)
+                      for index in range(count)]
+            assert sum(len(shard) for shard in shards) == total
+            assert [model for shard in shards for model in shard] == models
+        cursor = all_models(variables, packed=True, start=total // 2)
+        assert [dict(model) for model in cursor] == models[total // 2:]
+        gray = list(all_models(variables, gray=True))
+        assert list(all_models(variables, gray=True, start=total // 2)) == \
+               gray[total // 2:]
+
+    variables = ['p', 'q', 'r', 's']
+    if debug:
+        print('Testing the resumption of a model cursor over', variables)
+    models = list(all_models(variables))
+    cursor = all_models(variables, stop=13)
+    iterator = iter(cursor)
+    prefix = [next(iterator) for _ in range(5)]
+    assert prefix == models[:5] and cursor.position == 5
+    state = json.loads(json.dumps(cursor.state()))
+    assert list(ModelCursor.from_state(state)) == models[5:13]
+    assert list(iterator) == models[5:13]
+    resumed = ModelCursor.from_state(state).shard(1, 2)
+    assert list(resumed) == models[9:13]
+
+def test_kleene(debug=False):
+    for infix in ['~(p&q7)', '(x|~x)', '(T->F)', '((x->y)&((y->z)&(x&~z)))',
+                  '(x<->~~x)', '((x-&y)<->(~x|~y))', '(x-|y)', '(p+q)',
+                  '((p+q)&((q+r)&(p+r)))', '((p->(q-|r))|(r<->~p))']:
+        formula = Formula.parse(infix)
+        variables = sorted(formula.variables())
+        evaluator = compile_formula(formula)
+        models = list(all_models(variables))
+        for count in range(len(variables) + 1):
+            for partial_model in all_models(variables[:count]):
+                if debug:
+                    print('Testing the Kleene value of', formula, 'in',
+                          partial_model)
+                value = evaluate_kleene(formula, partial_model)
+                values = {evaluator(model) for model in models
+                          if partial_model.items() <= model.items()}
+                assert value is None or values == {value}
+                if count == len(variables):
+                    assert value is not None
+        for value in [True, False]:
+            if debug:
+                print('Testing the pruned search for a model in which',
+                      formula, 'is', value)
+            model, statistics = kleene_model(formula, value)
+            expected = [model for model in models
+                        if evaluator(model) == value]
+            assert model == (expected[0] if len(expected) > 0 else None)
+            assert statistics['models'] == len(models)
+            assert statistics['leaves'] + statistics['pruned'] + \
+                   statistics['unexplored'] == len(models)
+            if model is None:
+                assert statistics['unexplored'] == 0
+            else:
+                assert statistics['leaves'] + statistics['pruned'] > \
+                       models.index(model)
+            assert statistics['evaluations'] < 2 * len(models)
+
+    # A chain of 40 implications is falsified along a single branch.
+    variables = [Formula('x' + str(index)) for index in range(40)]
+    formula = variables[0]
+    for left, right in zip(variables, variables[1:]):
+        formula = Formula('&', formula, Formula('->', left, right))
+    if debug:
+        print('Testing the pruned search over', len(variables), 'variables')
+    model, statistics = kleene_model(formula, False)
+    assert model == {variable.root: False for variable in variables}
+    assert statistics['evaluations'] == 2
+    assert statistics['leaves'] == 0
+    assert statistics['pruned'] == statistics['unexplored'] == 1 << 39
+    assert is_satisfiable(formula, 'kleene')
+    assert not is_tautology(formula, 'kleene')
+
+def test_simulation_prefilter(debug=False):
+    for infix in ['(p&(q&r))', '~(p&q7)', '((x->y)&((y->z)&(x&~z)))',
+                  '(x<->~~x)', '((p+q)&((q+r)&(p+r)))']:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the random simulation of', formula)
+        prefilter = SimulationPrefilter(256, 7)
+        model = prefilter.satisfying_model(formula)
+        assert (model is not None) == is_satisfiable(formula)
+        if model is not None:
+            assert set(model) == formula.variables()
+            assert compile_formula(formula)(model)
+            assert SimulationPrefilter(256, 7).satisfying_model(formula) == \
+                   model
+        assert prefilter.statistics() == \
+               {'samples': 256, 'runs': 1, 'hits': int(model is not None),
+                'models': 256, 'hit_rate': float(model is not None)}
+    prefilter = SimulationPrefilter(0)
+    assert not prefilter.applies(100)
+    assert prefilter.satisfying_model(Formula.parse('(p|q)')) is None
+    assert SimulationPrefilter(4096).applies(13)
+    assert not SimulationPrefilter(4096).applies(12)
+
+    # The conjunction of 30 variables and a tautology over 30 variables.
+    variables = [Formula('x' + str(index)) for index in range(30)]
+    conjunction = variables[0]
+    for variable in variables[1:]:
+        conjunction = Formula('&', conjunction, variable)
+    tautology = Formula('|', conjunction, Formula('~', conjunction))
+    if debug:
+        print('Testing the prefilter of checks over', len(variables),
+              'variables')
+    SIMULATION_PREFILTER.reset()
+    assert not is_tautology(conjunction)
+    assert SIMULATION_PREFILTER.statistics()['hits'] == 1
+    assert is_tautology(tautology)
+    assert SIMULATION_PREFILTER.statistics()['hit_rate'] == 0.5
+    model = distinguishing_model(conjunction, tautology)
+    assert SIMULATION_PREFILTER.hits == 2
+    assert set(model) == tautology.variables() and not all(model.values())
+    excluded_middle = Formula('|', variables[0], Formula('~', variables[0]))
+    assert distinguishing_model(tautology, excluded_middle) is None
+    assert SIMULATION_PREFILTER.runs == 4
+    assert distinguishing_model(conjunction, tautology) == model
+
+    if debug:
+        print('Testing that named engines skip the prefilter')
+    for engine in SATISFIABILITY_ENGINES:
+        if engine in ('truth_table', 'kleene', 'bdd'):
+            continue
+        assert not is_tautology(conjunction, engine)
+        model = distinguishing_model(conjunction, tautology, engine)
+        assert not all(model.values())
+    assert SIMULATION_PREFILTER.runs == 5
+    variables = ['x' + str(index) for index in range(14)]
+    formula = Formula.parse('(' * 13 + variables[0] + ''.join(
+        '|' + variable + ')' for variable in variables[1:]))
+    assert distinguishing_model(formula, Formula('F'), 'truth_table') == \
+           dict(dict.fromkeys(variables, False), **{max(variables): True})
+    assert SIMULATION_PREFILTER.runs == 5
+
+def test_frozen_model(debug=False):
+    for model in [{}, {'p': True}, {'q': False, 'p': True},
+                  {'x12': True, 'q': False, 'r': True, 'p': False}]:
+        if debug:
+            print('Testing the frozen model of', model)
+        frozen = FrozenModel(model)
+        assert frozen == model and dict(frozen) == model
+        assert list(frozen) == sorted(model)
+        assert frozen.variables == tuple(sorted(model))
+        assert frozen == FrozenModel(frozen) == \
+               FrozenModel(dict(reversed(list(model.items()))))
+        assert hash(frozen) == hash(FrozenModel(dict(model)))
+        assert is_model(frozen) and variables(frozen) == model.keys()
+        for other in all_models(sorted(model)):
+            assert (FrozenModel(other) == frozen) == (other == model)
+    assert FrozenModel({'p': True}) != FrozenModel({'p': True, 'q': True})
+    assert FrozenModel({'p': True}).variables is \
+           FrozenModel({'p': False}).variables
+
+    for model in [{'a': True}, {'p': 1}, {'p': None}]:
+        if debug:
+            print('Testing the rejection of', model)
+        rejected = False
+        try:
+            FrozenModel(model)
+        except AssertionError:
+            rejected = True
+        assert rejected
+
+    frozen = FrozenModel({'p': True, 'q': False})
+    for attribute in ['bits', 'variables']:
+        try:
+            setattr(frozen, attribute, None)
+            assert False
+        except Exception as error:
+            assert 'immutable' in str(error)
+
+    if debug:
+        print('Testing frozen models as cache keys')
+    calls = []
+
+    @lru_cache(maxsize=None)
+    def cached(model):
+        calls.append(model)
+        return evaluate(Formula.parse('(p->q)'), model)
+
+    models = [FrozenModel(model) for model in all_models(['p', 'q'])]
+    assert [cached(model) for model in models] == [True, True, False, True]
+    assert [cached(FrozenModel(dict(model))) for model in models] == \
+           [True, True, False, True]
+    assert calls == models
+    assert len({model: None for model in models + models}) == 4
+    assert evaluate(Formula.parse('~(x1&q)'),
+                    FrozenModel({'q': True, 'x1': True, 'p': False})) is False
+
+def test_cube_truth_table(debug=False):
+    for infix in ['~(p&q7)', '(x|~x)', '(T->F)', '((x->y)&((y->z)&(x&~z)))',
+                  '(x<->~~x)', '(x-|x)', '((p<->(q+r))&~(p-|(r->q)))']:
+        formula = Formula.parse(infix)
+        variables = sorted(formula.variables())
+        nodes = formula_nodes(formula)
+        bits = truth_table_bits(formula, variables)
+        for prefix in range(len(variables) + 1):
+            if debug:
+                print('Testing the cubes of', formula, 'with', prefix,
+                      'fixed variables')
+            size = 1 << (len(variables) - prefix)
+            for cube in range(1 << prefix):
+                assert cube_truth_table(nodes, variables, prefix, cube) == \
+                       bits >> (cube * size) & ((1 << size) - 1)
+
+def test_parallel_evaluator(debug=False):
+    children = len(active_children())
+    evaluator = ParallelEvaluator()
+    if debug:
+        print('Testing the parallel evaluation by the number of processors')
+    assert evaluator.processes is None
+    assert len(active_children()) == children
+    assert evaluator.truth_table(Formula.parse('(p|~q)'), 'count') == \
+           (3, None)
+    evaluator.close()
+    assert len(active_children()) == children
+
+    for processes in [1, 2]:
+        evaluator = ParallelEvaluator(processes)
+        for infix in ['~(p&q7)', '(x|~x)', '~(x|~x)', '(p->q)', '(F|T)',
+                      '((x->y)&((y->z)&(x&~z)))', '(x<->~~x)',
+                      '((p+q)&((q+r)&(p+r)))', '((p<->(q+r))&~(p-|(r->q)))']:
+            formula = Formula.parse(infix)
+            if debug:
+                print('Testing the parallel evaluation of', formula, 'by',
+                      processes, 'processes')
+            holds, model = evaluator.truth_table(formula, 'all')
+            assert holds == is_tautology(formula)
+            assert (model is None) == holds
+            if model is not None:
+                assert set(model) == formula.variables()
+                assert not compile_formula(formula)(model)
+            holds, model = evaluator.truth_table(formula, 'any')
+            assert holds == is_satisfiable(formula)
+            assert (model is not None) == holds
+            if model is not None:
+                assert compile_formula(formula)(model)
+            assert evaluator.truth_table(formula, 'count') == \
+                   (count_models(formula), None)
+        if debug:
+            print('Testing the reuse of the pool of', processes, 'processes')
+        assert len(active_children()) == \
+               children + (processes if processes > 1 else 0)
+        evaluator.close()
+        assert len(active_children()) == children
+    assert CUBE_CANCELLATION is None
+
+    variables = [Formula('x' + str(index)) for index in range(22)]
+    formula = variables[0]
+    for variable in variables[1:]:
+        formula = Formula('|', formula, variable)
+    if debug:
+        print('Testing the parallel evaluation of the disjunction of',
+              len(variables), 'variables')
+    evaluator = ParallelEvaluator(2)
+    assert evaluator.truth_table(formula, 'count') == ((1 << 22) - 1, None)
+    holds, model = evaluator.truth_table(formula, 'all')
+    assert not holds and not any(model.values())
+    assert evaluator.truth_table(Formula('~', formula), 'any') == \
+           (True, dict.fromkeys(model, False))
+    evaluator.close()
+
+    processes = PARALLEL_EVALUATOR.processes
+    try:
+        PARALLEL_EVALUATOR.processes = 2
+        assert not is_tautology(formula, 'parallel')
+        assert is_tautology(Formula('|', formula, Formula('~', variables[0])),
+                            'parallel')
+        assert is_satisfiable(formula, 'parallel')
+        assert satisfying_model(Formula('~', formula), 'parallel') == \
+               dict.fromkeys(model, False)
+    finally:
+        PARALLEL_EVALUATOR.processes = processes
+        PARALLEL_EVALUATOR.close()
+
 def test_ex2(debug=False):
     test_evaluate(debug)
     test_all_models(debug)
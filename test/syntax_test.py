@@ -8,6 +8,7 @@
 from logic_utils import frozendict
 
 from propositions.syntax import *
+from propositions.semantics import all_models, compile_formula
 
 # Testing for Chapter 1
 
@@ -313,6 +314,82 @@ def test_substitute_operators(debug=False):
         a = str(f.substitute_operators(frozendict(d)))
         assert a == r, "Incorrect answer:"+a
                
+def test_formula_nodes(debug=False):
+    for infix,nodes in [
+            ['p', [('p', -1, -1)]],
+            ['(p&~p)', [('p', -1, -1), ('~', 0, -1), ('&', 0, 1)]],
+            ['((p|q)->~(p|q))', [('p', -1, -1), ('q', -1, -1), ('|', 0, 1),
+                                 ('~', 2, -1), ('->', 2, 3)]]]:
+        formula = Formula.parse(infix)
+        if debug:
+            print('Testing the DAG nodes of', formula)
+        assert formula_nodes(formula) == nodes
+
+    formulae = [Formula.parse(infix) for infix in ['(p&~p)', '~p', 'q', '~p']]
+    if debug:
+        print('Testing the DAG nodes of', formulae)
+    assert formulae_nodes(formulae) == \
+           ([('p', -1, -1), ('~', 0, -1), ('&', 0, 1), ('q', -1, -1)],
+            [2, 1, 3, 1])
+    assert formulae_nodes([]) == ([], [])
+
+def test_restrict(debug=False):
+    for infix in ['p', 'T', '~p', '~~p', '((p&q)->r)', '((p+q)|r)', '(p-&q)',
+                  '(p-|q)', '(p<->~q)', '((p->q)->(q->p))', '~(p+(q<->r))',
+                  '((p-&(q-|r))&(r|~p))', '((p->~q)<->(r+p))']:
+        formula = Formula.parse(infix)
+        variables = sorted(formula.variables())
+        evaluator = compile_formula(formula)
+        for count in range(len(variables) + 1):
+            assigned = variables[:count]
+            for partial_model in all_models(assigned):
+                restricted = formula.restrict(partial_model)
+                if debug:
+                    print('Testing the restriction of', formula, 'to',
+                          partial_model, 'which is', restricted)
+                remaining = sorted(restricted.variables())
+                assert set(remaining).issubset(variables[count:])
+                assert is_constant(restricted.root) or \
+                       restricted.operators().isdisjoint({'T', 'F'})
+                residual = compile_formula(restricted)
+                for model in all_models(variables[count:]):
+                    assert residual(model) == \
+                           evaluator({**partial_model, **model})
+
+    for infix,partial_model,expected in [
+            ['((p&q)->r)', {'p': True}, '(q->r)'],
+            ['((p&q)->r)', {'p': False}, 'T'],
+            ['((p+q)|r)', {'p': True, 'r': False}, '~q'],
+            ['(T&x)', {}, 'x'],
+            ['(F->x)', {}, 'T'],
+            ['(x->F)', {}, '~x'],
+            ['(p-&q)', {'p': True}, '~q'],
+            ['(p-|q)', {'q': False}, '~p'],
+            ['(p<->~q)', {'p': False}, 'q'],
+            ['~~p', {'q': True}, '~~p']]:
+        if debug:
+            print('Testing the restriction of', infix, 'to', partial_model)
+        assert str(Formula.parse(infix).restrict(partial_model)) == expected
+
+    if debug:
+        print('Testing the sharing of untouched subformulae by restriction')
+    formula = Formula.parse('((p&q)|((r->s)&p))')
+    restricted = formula.restrict({'q': True, 'z': False})
+    assert str(restricted) == '(p|((r->s)&p))'
+    assert restricted.first is formula.first.first
+    assert restricted.second is formula.second
+    assert formula.restrict({}) is formula
+
+    # A formula whose tree has 2**64 leaves is restricted node by node.
+    formula = Formula('x0')
+    for index in range(1, 65):
+        formula = Formula('&', formula,
+                          Formula('|', formula, Formula('x' + str(index))))
+    if debug:
+        print('Testing the restriction of a formula with shared subformulae')
+    assert formula.restrict({'x0': False}).root == 'F'
+    assert formula.restrict({'x64': True}) is formula.first
+
 def test_ex1(debug=False):
     test_repr(debug)
     test_variables(debug)
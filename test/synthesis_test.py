@@ -0,0 +1,185 @@
+# (c) This file is part of the course
+# Mathematical Logic through Programming
+# by Gonczarowski and Nisan.
+# File name: propositions/synthesis_test.py
+
+"""Tests for the propositions.synthesis module."""
+
+from propositions.syntax import *
+from propositions.semantics import *
+from propositions.synthesis import *
+
+def test_truth_vector_bits(debug=False):
+    values = [True, False, True, True, False, False, False, True]
+    vectors = [values, iter(values), 0b10001101, b'\x8d', bytearray(b'\x8d'),
+               memoryview(b'\x8d')]
+    if numpy is not None:
+        vectors.append(numpy.array(values))
+        vectors.append(numpy.array(values, dtype=numpy.uint8))
+    for vector in vectors:
+        if debug:
+            print('Testing the packed bits of', vector)
+        assert truth_vector_bits(vector, 3) == 0b10001101
+    assert truth_vector_bits(b'\x02', 1) == 2
+    for value in [False, True]:
+        if debug:
+            print('Testing the rejection of', value)
+        rejected = False
+        try:
+            truth_vector_bits(value, 0)
+        except AssertionError:
+            rejected = True
+        assert rejected
+    assert vector_minterms(0b10001101) == [0, 2, 3, 7]
+    assert vector_minterms(0) == []
+
+def test_implicant_minterms(debug=False):
+    for count,implicant,minterms in [
+            [3, (7, 5), [5]],
+            [3, (4, 4), [4, 5, 6, 7]],
+            [3, (2, 0), [0, 1, 4, 5]],
+            [2, (0, 0), [0, 1, 2, 3]],
+            [0, (0, 0), [0]]]:
+        if debug:
+            print('Testing the minterms of', implicant, 'over', count,
+                  'variables')
+        assert list(implicant_minterms(count, implicant)) == minterms
+
+def test_prime_implicants(debug=False):
+    if debug:
+        print('Testing the prime implicants of all functions of 3 variables')
+    cubes = [(mask, value) for mask in range(8) for value in range(8)
+             if value & ~mask == 0]
+    for table in range(256):
+        minterms = {index for index in range(8) if table >> index & 1}
+        implicants = [cube for cube in cubes
+                      if minterms.issuperset(implicant_minterms(3, cube))]
+        primes = [cube for cube in implicants
+                  if not any(other != cube and other[0] & cube[0] == other[0]
+                             and cube[1] & other[0] == other[1]
+                             for other in implicants)]
+        assert prime_implicants(3, minterms) == sorted(primes)
+
+def test_minimize_dnf(debug=False):
+    if debug:
+        print('Testing the minimized DNF of all functions of 3 variables')
+    for table in range(256):
+        minterms = {index for index in range(8) if table >> index & 1}
+        for implicants in [minimize_dnf(3, minterms),
+                           expand_implicants(3, minterms)]:
+            covered = set()
+            for implicant in implicants:
+                assert minterms.issuperset(implicant_minterms(3, implicant))
+                covered.update(implicant_minterms(3, implicant))
+            assert covered == minterms
+    for count,minterms,expected in [
+            [2, [0, 1, 2], [(1, 0), (2, 0)]],
+            [3, [1, 3, 5, 7], [(1, 1)]],
+            [3, [0, 1, 2, 5, 6, 7], [(3, 1), (5, 0), (6, 6)]],
+            [4, range(16), [(0, 0)]],
+            [4, [], []]]:
+        if debug:
+            print('Testing the minimized DNF of', list(minterms))
+        assert minimize_dnf(count, minterms) == expected
+
+def test_prime_implicants_many(debug=False):
+    if debug:
+        print('Testing the prime implicants of pairs of functions of 3 '
+              'variables')
+    for first in range(0, 256, 7):
+        for second in range(0, 256, 11):
+            minterm_sets = [[index for index in range(8) if table >> index & 1]
+                            for table in [first, second]]
+            primes = prime_implicants_many(3, minterm_sets)
+            for function, minterms in enumerate(minterm_sets):
+                assert sorted(implicant for implicant, tag in primes.items()
+                              if tag >> function & 1) == \
+                       prime_implicants(3, minterms)
+
+def test_minimize_dnf_many(debug=False):
+    # The bits of the sum of two 2-bit numbers, and the first bit again.
+    minterm_sets = [[index for index in range(16)
+                     if ((index >> 2) + (index & 3)) >> bit & 1]
+                    for bit in range(3)]
+    minterm_sets.append(minterm_sets[0])
+    if debug:
+        print('Testing the minimized DNFs of', minterm_sets)
+    results = minimize_dnf_many(4, minterm_sets)
+    assert results[0] is results[3]
+    for minterms, implicants in zip(minterm_sets, results):
+        covered = set()
+        for implicant in implicants:
+            assert set(minterms).issuperset(implicant_minterms(4, implicant))
+            covered.update(implicant_minterms(4, implicant))
+        assert covered == set(minterms)
+        assert len(implicants) == len(minimize_dnf(4, minterms))
+    assert minimize_dnf_many(2, [[0, 1, 2], [3], []]) == \
+           [[(1, 0), (2, 0)], [(3, 3)], []]
+
+def test_dnf_formula(debug=False):
+    variables = ['p', 'q', 'r']
+    for implicants,infix,size in [
+            [[(7, 5)], '(p&(~q&r))', 6],
+            [[(4, 4), (3, 0)], '(p|(~q&~r))', 7],
+            [[(6, 2), (4, 0), (1, 1)], '((~p&q)|(~p|r))', 9],
+            [[], '(p&~p)', 4],
+            [[(0, 0)], '(p|~p)', 4]]:
+        if debug:
+            print('Testing the DNF formula of', implicants)
+        assert str(dnf_formula(variables, implicants)) == infix
+        statistics = dnf_statistics(3, implicants)
+        assert statistics['size'] == size
+        assert statistics['literals'] == sum(1 for c in infix if c.isalpha())
+
+    if debug:
+        print('Testing balanced combinations of formulae')
+    formulae = [Formula(variable) for variable in ['p', 'q', 'r', 's', 't']]
+    assert balanced_formula('&', formulae[:1]) is formulae[0]
+    assert str(balanced_formula('&', formulae)) == '((p&q)&(r&(s&t)))'
+    assert str(balanced_formula('|', formulae[:4])) == '((p|q)|(r|s))'
+
+    if debug:
+        print('Testing the sharing of subformulae between DNF formulae')
+    first, second, third, fourth = dnf_formulae(
+        variables, [[(6, 2), (3, 1)], [(6, 2), (3, 1), (5, 5)], [(3, 1)],
+                    [(6, 2), (3, 1)]])
+    assert str(first) == '((~p&q)|(~q&r))'
+    assert str(second) == '((~p&q)|((~q&r)|(p&r)))'
+    assert third is first.second and third is second.second.first
+    assert fourth is first and first.first is second.first
+    assert first.first.first is second.first.first
+    assert third.first.first is first.first.second
+
+def test_shannon_formula(debug=False):
+    if debug:
+        print('Testing Shannon decomposition of all functions of 3 variables')
+    variables = ['p', 'q', 'r']
+    for bits in range(256):
+        formula = shannon_formula(variables, bits)
+        assert formula.variables().issubset(variables)
+        assert truth_table_bits(formula, variables) == bits
+    assert str(shannon_formula(['p', 'q'], 0b1000)) == '(p&q)'
+    assert str(shannon_formula(['p', 'q'], 0b0110)) == '((p&~q)|(~p&q))'
+    assert str(shannon_formula(['p'], 0)) == 'F'
+
+    # The parity of many variables has two distinct cofactors per variable.
+    variables = ['x' + str(index) for index in range(16)]
+    bits = 0
+    for index in range(1 << 16):
+        if bin(index).count('1') % 2 == 1:
+            bits |= 1 << index
+    if debug:
+        print('Testing Shannon decomposition of the parity of', variables)
+    formula = shannon_formula(variables, bits)
+    assert len(formula_nodes(formula)) < 8 * len(variables)
+    assert truth_table_bits(formula, variables) == bits
+
+def test_all(debug=False):
+    test_truth_vector_bits(debug)
+    test_implicant_minterms(debug)
+    test_prime_implicants(debug)
+    test_minimize_dnf(debug)
+    test_prime_implicants_many(debug)
+    test_minimize_dnf_many(debug)
+    test_dnf_formula(debug)
+    test_shannon_formula(debug)
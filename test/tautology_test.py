@@ -248,6 +248,26 @@ def test_prove_in_model_full(debug=False):
         assert p.rules == AXIOMATIC_SYSTEM_FULL
         assert p.is_valid(), offending_line(p)
            
+def test_frozen_model_proofs(debug=False):
+    for f, m in [('(p->p)', {'p': True}),
+                 ('((~q->~p)->(p->q))', {'q': False, 'p': True}),
+                 ('((~q->~p)->(p->q))', {'p': False}),
+                 ('((~q->~p)->(p->q))', {})]:
+        f = Formula.parse(f)
+        m = FrozenModel(m)
+        if debug:
+            print("Testing the proofs of", f, "from the frozen model", m)
+        assert formulae_capturing_model(m) == \
+               formulae_capturing_model(dict(m))
+        if f.variables().issubset(m.keys()):
+            p = prove_in_model(f, m)
+            assert p.statement == prove_in_model(f, dict(m)).statement
+            assert p.is_valid(), offending_line(p)
+        p = prove_tautology(f, m)
+        assert p.statement.assumptions == tuple(formulae_capturing_model(m))
+        assert p.statement.conclusion == f
+        assert p.is_valid(), offending_line(p)
+
 def test_ex6(debug=False):
     test_formulae_capturing_model(debug)
     test_prove_in_model(debug)